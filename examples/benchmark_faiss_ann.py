@@ -0,0 +1,125 @@
+"""
+Recall vs. latency of the approximate Faiss index types against exact search.
+
+Fills FaissVectorDBStorage with synthetic clustered vectors and queries it
+through the normal query path, once per index type:
+
+    python examples/benchmark_faiss_ann.py --vectors 100000 --dim 768
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg.faiss_impl import FaissVectorDBStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+
+def make_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(n // 100, 1), dim))
+    vectors = centers[rng.integers(len(centers), size=n)] + rng.normal(
+        scale=0.5, size=(n, dim)
+    )
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+async def run(index_type: str, vectors, queries, args) -> dict:
+    # Texts are "v<row>" / "q<row>"; the embedding function looks them up
+    async def embed(texts):
+        return np.array(
+            [(vectors if t[0] == "v" else queries)[int(t[1:])] for t in texts]
+        )
+
+    finalize_share_data()
+    initialize_share_data()
+    with tempfile.TemporaryDirectory() as working_dir:
+        storage = FaissVectorDBStorage(
+            namespace="benchmark",
+            global_config={
+                "working_dir": working_dir,
+                "embedding_batch_num": 1024,
+                "vector_db_storage_cls_kwargs": {
+                    "cosine_better_than_threshold": -1.0,
+                    "index_type": index_type,
+                    "ann_threshold": 1,
+                    "nprobe": args.nprobe,
+                    "ef_search": args.ef_search,
+                },
+            },
+            embedding_func=EmbeddingFunc(
+                embedding_dim=vectors.shape[1], max_token_size=8, func=embed
+            ),
+            meta_fields=set(),
+        )
+        await storage.initialize()
+
+        start = time.perf_counter()
+        for i in range(0, len(vectors), args.batch):
+            await storage.upsert(
+                {
+                    f"v{j}": {"content": f"v{j}"}
+                    for j in range(i, min(i + args.batch, len(vectors)))
+                }
+            )
+        build_seconds = time.perf_counter() - start
+
+        results, latencies = [], []
+        for i in range(len(queries)):
+            start = time.perf_counter()
+            hits = await storage.query(f"q{i}", top_k=args.top_k)
+            latencies.append(time.perf_counter() - start)
+            results.append([int(hit["id"][1:]) for hit in hits])
+
+    return {
+        "results": results,
+        "build_seconds": build_seconds,
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p95_ms": 1000 * float(np.percentile(latencies, 95)),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.vectors, args.dim)
+    queries = make_vectors(args.queries, args.dim, seed=1)
+
+    exact = await run("flat", vectors, queries, args)
+    print(f"{'index':8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}")
+    for index_type in ("flat", "hnsw", "ivf_pq"):
+        stats = (
+            exact
+            if index_type == "flat"
+            else await run(index_type, vectors, queries, args)
+        )
+        recall = np.mean(
+            [
+                len(set(found) & set(truth)) / len(truth)
+                for found, truth in zip(stats["results"], exact["results"])
+            ]
+        )
+        print(
+            f"{index_type:8} {recall:9.3f} {stats['p50_ms']:8.2f} "
+            f"{stats['p95_ms']:8.2f} {stats['build_seconds']:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1020,6 +1020,7 @@ def create_document_routes(
             storages = [
                 rag.text_chunks,
                 rag.full_docs,
+                rag.doc_chunk_index,
                 rag.entities_vdb,
                 rag.relationships_vdb,
                 rag.chunks_vdb,
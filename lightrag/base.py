@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
 from enum import Enum
 import os
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
 from typing import (
     Any,
+    AsyncIterator,
     Literal,
     TypedDict,
     TypeVar,
@@ -205,6 +207,14 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, np.ndarray]:
+        """Get the stored vectors of several IDs, keyed by ID; missing IDs are omitted.
+
+        The default implementation returns no vectors. Backends that keep their
+        vectors where they can be read back should override it.
+        """
+        return {}
+
     @abstractmethod
     async def delete(self, ids: list[str]):
         """Delete vectors with specified IDs
@@ -259,6 +269,15 @@ class BaseKVStorage(StorageNameSpace, ABC):
             None
         """
 
+    async def get_version(self, id: str) -> int | None:
+        """Return how often the record was changed, or None if the backend does not count
+
+        The count grows by one with every upsert or delete of the record, by any
+        process, so callers can tell when something they derived from it (e.g. the
+        semantic cache index of a cache mode) is stale.
+        """
+        return None
+
     async def drop_cache_by_modes(self, modes: list[str] | None = None) -> bool:
         """Delete specific records from storage by cache mode
 
@@ -325,6 +344,85 @@ class BaseGraphStorage(StorageNameSpace, ABC):
            KG-storage-log should be used to avoid data corruption
         """
 
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        """Get several nodes at once, keyed by node id; missing nodes are omitted.
+
+        The default implementation calls get_node for each id. Backends that
+        can fetch many nodes in one query should override it.
+        """
+        nodes = await asyncio.gather(*[self.get_node(n) for n in node_ids])
+        return {n: node for n, node in zip(node_ids, nodes) if node is not None}
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        """Get the degrees of several nodes at once, keyed by node id."""
+        degrees = await asyncio.gather(*[self.node_degree(n) for n in node_ids])
+        return dict(zip(node_ids, degrees))
+
+    async def get_edges_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Get several edges at once, keyed by (source, target); missing edges are omitted."""
+        edges = await asyncio.gather(*[self.get_edge(src, tgt) for src, tgt in pairs])
+        return {pair: edge for pair, edge in zip(pairs, edges) if edge is not None}
+
+    async def edge_degrees_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        """Get the degrees of several edges at once, keyed by (source, target)."""
+        degrees = await asyncio.gather(
+            *[self.edge_degree(src, tgt) for src, tgt in pairs]
+        )
+        return dict(zip(pairs, degrees))
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """Get the edges of several nodes at once, keyed by node id.
+
+        Nodes that do not exist map to an empty list.
+        """
+        edges = await asyncio.gather(*[self.get_node_edges(n) for n in node_ids])
+        return {n: node_edges or [] for n, node_edges in zip(node_ids, edges)}
+
+    async def iter_edges(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[tuple[str, str, dict]]:
+        """Iterate over every edge of the graph once, as (source, target, edge_data).
+
+        The default implementation walks the nodes of get_all_labels in batches and
+        fetches their edges with get_nodes_edges_batch and get_edges_batch, which
+        takes O(nodes + edges) work instead of a has_edge call per pair of nodes.
+        An edge listed under both of its nodes is reported at the first of them.
+        Backends that can scan their edges directly should override it.
+        """
+        labels = await self.get_all_labels()
+        position = {label: i for i, label in enumerate(labels)}
+        for start in range(0, len(labels), batch_size):
+            batch = labels[start : start + batch_size]
+            nodes_edges = await self.get_nodes_edges_batch(batch)
+            pairs: dict[tuple[str, str], None] = {}
+            for node_id in batch:
+                for src, tgt in nodes_edges[node_id]:
+                    other = tgt if src == node_id else src
+                    if position.get(other, len(labels)) >= position[node_id]:
+                        pairs[(src, tgt)] = None
+            edges = await self.get_edges_batch(list(pairs))
+            for src, tgt in pairs:
+                if (src, tgt) in edges:
+                    yield src, tgt, edges[(src, tgt)]
+
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert several nodes at once, given as {node_id: node_data}."""
+        for node_id, node_data in nodes.items():
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(
+        self, edges: dict[tuple[str, str], dict[str, str]]
+    ) -> None:
+        """Upsert several edges at once, given as {(source, target): edge_data}."""
+        for (src, tgt), edge_data in edges.items():
+            await self.upsert_edge(src, tgt, edge_data)
+
     @abstractmethod
     async def delete_node(self, node_id: str) -> None:
         """Embed nodes using an algorithm."""
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+from .utils import compute_mdhash_id, logger
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+# last_used updates of cache hits are written once this many are pending
+_TOUCH_BATCH = 1000
+# Parameters naming the model in the embedding functions of lightrag.llm
+_MODEL_PARAMS = ("model", "embed_model", "model_name")
+
+
+def _encode(vector: np.ndarray, dtype: str) -> bytes:
+    vector = np.asarray(vector, dtype=np.float32)
+    if dtype == "int8":
+        # Per-vector scale so that the largest component maps to +-127
+        scale = float(np.max(np.abs(vector))) or 1.0
+        quantized = np.round(vector / scale * 127).astype(np.int8)
+        return np.float32(scale).tobytes() + quantized.tobytes()
+    return vector.astype(np.float16).tobytes()
+
+
+def _decode(blob: bytes, dtype: str) -> np.ndarray:
+    if dtype == "int8":
+        scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+        quantized = np.frombuffer(blob[4:], dtype=np.int8)
+        return quantized.astype(np.float32) * (scale / 127)
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+
+def embedding_model_identity(func: Callable) -> str:
+    """Best-effort name of the model behind an embedding function.
+
+    Looks through EmbeddingFunc, EmbeddingBatcher, partial and functools.wraps
+    wrappers for a model keyword bound by a partial, then for the default of a
+    model parameter, and falls back to the qualified name of the function.
+    """
+    while True:
+        if isinstance(func, functools.partial):
+            for name in _MODEL_PARAMS:
+                if name in func.keywords:
+                    return str(func.keywords[name])
+        inner = getattr(func, "func", None) or getattr(func, "__wrapped__", None)
+        if inner is None or not callable(inner):
+            break
+        func = inner
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        parameters = {}
+    for name in _MODEL_PARAMS:
+        parameter = parameters.get(name)
+        if parameter is not None and parameter.default is not inspect.Parameter.empty:
+            return str(parameter.default)
+    return (
+        f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    )
+
+
+class EmbeddingCache:
+    """Persistent cache of embeddings keyed by a hash of the text.
+
+    Sits in front of the embedding function of every vector storage, so
+    unchanged chunks, entity and relation descriptions are never embedded
+    twice, not even across restarts. Vectors are stored in SQLite as float16,
+    or as int8 with a per-vector scale, and the least recently used entries
+    are evicted once the cache holds more than max_entries vectors.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        db_path: str,
+        max_entries: int = 200000,
+        dtype: str = "float16",
+        token_tracker: Any | None = None,
+        model_name: str | None = None,
+    ):
+        """
+        Args:
+            func: Embedding function taking a list of texts
+            db_path: SQLite file holding the cache
+            max_entries: Max cached vectors; 0 disables the cache
+            dtype: "float16" or "int8"
+            token_tracker: Optional TokenTracker that also receives hit/miss counts
+            model_name: Embedding model; the cache is cleared when it changes.
+                Derived from func by embedding_model_identity when None
+        """
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.func = func
+        self.embedding_dim = getattr(func, "embedding_dim", None)
+        self.max_token_size = getattr(func, "max_token_size", None)
+        self.model_name = model_name or embedding_model_identity(func)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.token_tracker = token_tracker
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._size = 0
+        # SQLite work runs in worker threads, one at a time
+        self._lock = threading.Lock()
+        # Cache hits whose last_used is not written yet
+        self._touched: dict[str, float] = {}
+
+    def __deepcopy__(self, memo):
+        # Shared by every storage; asdict(LightRAG) must not copy the connection
+        return self
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            # Vectors of another model or encoding are useless, so start over
+            layout = f"{self.model_name}:{self.embedding_dim}:{self.dtype}"
+            row = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if row is None or row[0] != layout:
+                if row is not None:
+                    logger.info(
+                        f"Embedding cache layout changed, clearing {self.db_path}"
+                    )
+                conn.execute("DELETE FROM embeddings")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (layout,)
+                )
+        (self._size,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        self._conn = conn
+        return conn
+
+    def _load(self, keys: list[str]) -> dict[str, np.ndarray]:
+        with self._lock:
+            conn = self._connect()
+            found = {}
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i : i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for key, blob in conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ):
+                    found[key] = _decode(blob, self.dtype)
+            now = time.time()
+            self._touched.update((key, now) for key in found)
+            if len(self._touched) >= _TOUCH_BATCH:
+                with conn:
+                    self._flush_touched(conn)
+            return found
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        """Write the pending last_used updates; call in a transaction"""
+        if self._touched:
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key, now in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _store(self, vectors: dict[str, np.ndarray]) -> None:
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            with conn:
+                # Evict by up-to-date last_used values
+                self._flush_touched(conn)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, _encode(v, self.dtype), now) for key, v in vectors.items()],
+                )
+                self._size += len(vectors)
+                if self._size > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (self._size - self.max_entries,),
+                    )
+                    (self._size,) = conn.execute(
+                        "SELECT COUNT(*) FROM embeddings"
+                    ).fetchone()
+
+    async def __call__(self, texts: list[str], **kwargs) -> np.ndarray:
+        if kwargs or not texts or self.max_entries <= 0:
+            return await self.func(texts, **kwargs)
+
+        keys = [compute_mdhash_id(text, prefix="emb-") for text in texts]
+        cached = await asyncio.to_thread(self._load, list(set(keys)))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        hits = sum(1 for key in keys if key in cached)
+        self._record(hits, len(keys) - hits)
+
+        if missing:
+            embeddings = await self.func(list(missing.values()))
+            new_vectors = dict(zip(missing, np.asarray(embeddings, dtype=np.float32)))
+            await asyncio.to_thread(self._store, new_vectors)
+            cached.update(new_vectors)
+        return np.array([cached[key] for key in keys], dtype=np.float32)
+
+    def _record(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+        if self.token_tracker is not None:
+            self.token_tracker.add_embedding_cache_usage(hits, misses)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and the number of cached vectors"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": self._size,
+            "db_size_bytes": os.path.getsize(self.db_path)
+            if os.path.exists(self.db_path)
+            else 0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._flush_touched(self._conn)
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+from typing import Any
+
+import numpy as np
+import pipmaster as pm
+
+# Rows buffered per Parquet row group
+_PARQUET_BATCH = 1000
+
+
+class TableWriter:
+    """Writes the tables of an export one row at a time.
+
+    aexport_data calls start_table, write_row for each row and end_table once per
+    table, then close. Writers keep at most a bounded number of rows in memory.
+    Tables without rows are reported as empty, or left out where the format has no
+    way to say so.
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self._title = ""
+        self._fieldnames: list[str] = []
+        self._rows = 0
+
+    def start_table(self, title: str, fieldnames: list[str]) -> None:
+        self._title = title
+        self._fieldnames = fieldnames
+        self._rows = 0
+
+    def write_row(self, row: dict[str, Any]) -> None:
+        if self._rows == 0:
+            self._write_header()
+        self._write_row(row)
+        self._rows += 1
+
+    def end_table(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _write_header(self) -> None:
+        pass
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class CsvTableWriter(TableWriter):
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        self._file = open(output_path, "w", newline="", encoding="utf-8")
+        self._writer: csv.DictWriter | None = None
+
+    def _write_header(self) -> None:
+        self._file.write(f"# {self._title.upper()}\n")
+        self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames)
+        self._writer.writeheader()
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        self._writer.writerow(row)
+
+    def end_table(self) -> None:
+        if self._rows:
+            self._file.write("\n\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MarkdownTableWriter(TableWriter):
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("# LightRAG Data Export\n\n")
+
+    def _write_header(self) -> None:
+        self._file.write("| " + " | ".join(self._fieldnames) + " |\n")
+        self._file.write("| " + " | ".join(["---"] * len(self._fieldnames)) + " |\n")
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        self._file.write(
+            "| " + " | ".join(str(row[k]) for k in self._fieldnames) + " |\n"
+        )
+
+    def start_table(self, title: str, fieldnames: list[str]) -> None:
+        super().start_table(title, fieldnames)
+        self._file.write(f"## {title}\n\n")
+
+    def end_table(self) -> None:
+        if self._rows:
+            self._file.write("\n\n")
+        else:
+            self._file.write(f"*No {self._title.lower()} available*\n\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class TextTableWriter(TableWriter):
+    """Fixed width columns; rows are spooled to a temporary file until the
+    widths of all columns are known."""
+
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("LIGHTRAG DATA EXPORT\n")
+        self._file.write("=" * 80 + "\n\n")
+        self._spool = None
+        self._widths: dict[str, int] = {}
+
+    def start_table(self, title: str, fieldnames: list[str]) -> None:
+        super().start_table(title, fieldnames)
+        self._file.write(f"{title.upper()}\n")
+        self._file.write("-" * 80 + "\n")
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._widths = {k: len(k) for k in fieldnames}
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        values = [str(row[k]) for k in self._fieldnames]
+        for k, v in zip(self._fieldnames, values):
+            self._widths[k] = max(self._widths[k], len(v))
+        self._spool.write(json.dumps(values, ensure_ascii=False) + "\n")
+
+    def end_table(self) -> None:
+        if self._rows:
+            header = "  ".join(k.ljust(self._widths[k]) for k in self._fieldnames)
+            self._file.write(header + "\n")
+            self._file.write("-" * len(header) + "\n")
+            self._spool.seek(0)
+            for line in self._spool:
+                values = json.loads(line)
+                self._file.write(
+                    "  ".join(
+                        v.ljust(self._widths[k])
+                        for k, v in zip(self._fieldnames, values)
+                    )
+                    + "\n"
+                )
+            self._file.write("\n\n")
+        else:
+            self._file.write(f"No {self._title.lower()} available\n\n")
+        self._spool.close()
+        self._spool = None
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ExcelTableWriter(TableWriter):
+    """One sheet per table, written by xlsxwriter in constant memory mode"""
+
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        if not pm.is_installed("xlsxwriter"):
+            pm.install("xlsxwriter")
+        import xlsxwriter  # type: ignore
+
+        self._workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True})
+        self._sheet = None
+
+    def _write_header(self) -> None:
+        self._sheet = self._workbook.add_worksheet(self._title)
+        self._sheet.write_row(0, 0, self._fieldnames)
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        self._sheet.write_row(
+            self._rows + 1,
+            0,
+            ["" if row[k] is None else row[k] for k in self._fieldnames],
+        )
+
+    def close(self) -> None:
+        self._workbook.close()
+
+
+class ParquetTableWriter(TableWriter):
+    """One Parquet file per table, named <output_path stem>.<table>.parquet"""
+
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        if not pm.is_installed("pyarrow"):
+            pm.install("pyarrow")
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+        self._batch: list[dict[str, Any]] = []
+
+    def _write_header(self) -> None:
+        pa = self._pa
+        schema = pa.schema(
+            [
+                (k, pa.int64() if k == "vector_index" else pa.string())
+                for k in self._fieldnames
+            ]
+        )
+        self._writer = self._pq.ParquetWriter(
+            table_file_name(self.output_path, self._title, ".parquet"), schema
+        )
+
+    def _write_row(self, row: dict[str, Any]) -> None:
+        self._batch.append(row)
+        if len(self._batch) >= _PARQUET_BATCH:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch:
+            self._writer.write_table(
+                self._pa.Table.from_pylist(self._batch, schema=self._writer.schema)
+            )
+            self._batch = []
+
+    def end_table(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+
+class NpyWriter:
+    """Writes float32 vectors of one dimension as rows of a .npy file.
+
+    The row count is only known at the end, so vectors are spooled to a temporary
+    file and copied behind the .npy header on close.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.count = 0
+        self._dim: int | None = None
+        self._spool = tempfile.TemporaryFile()
+
+    def append(self, vector) -> int:
+        """Add a vector and return its row in the file"""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        if self._dim is None:
+            self._dim = len(vector)
+        elif len(vector) != self._dim:
+            raise ValueError(
+                f"Vector of dimension {len(vector)} does not fit {self.file_name} of dimension {self._dim}"
+            )
+        self._spool.write(vector.tobytes())
+        self.count += 1
+        return self.count - 1
+
+    def close(self) -> None:
+        header = {
+            "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+            "fortran_order": False,
+            "shape": (self.count, self._dim or 0),
+        }
+        with open(self.file_name, "wb") as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, f)
+        self._spool.close()
+
+
+def table_file_name(output_path: str, title: str, extension: str) -> str:
+    """File of one table of a multi-file export, e.g. graph.entities.npy for graph.csv"""
+    return f"{os.path.splitext(output_path)[0]}.{title.lower()}{extension}"
+
+
+TABLE_WRITERS: dict[str, type[TableWriter]] = {
+    "csv": CsvTableWriter,
+    "excel": ExcelTableWriter,
+    "md": MarkdownTableWriter,
+    "txt": TextTableWriter,
+    "parquet": ParquetTableWriter,
+}
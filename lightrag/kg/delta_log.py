@@ -0,0 +1,164 @@
+import json
+import os
+import uuid
+from typing import Any
+
+from lightrag.utils import logger
+
+# Compact once the log grows larger than this fraction of the snapshot...
+_COMPACT_RATIO = 1.0
+# ...but never for logs smaller than this
+_COMPACT_MIN_BYTES = 4 * 1024 * 1024
+
+
+class DeltaLog:
+    """Write-ahead delta log kept next to the snapshot file of an in-memory storage.
+
+    Storages append their upserts and deletes here instead of rewriting the whole
+    snapshot on every index_done_callback, and rewrite the snapshot only once the
+    log outgrows it (see needs_compaction). A process loads the snapshot and then
+    replays the log. A process that sees storage_updated calls read_new to apply
+    only the records other processes appended since its last read.
+
+    The first line of the log names its generation; every compaction starts a new
+    generation, which tells readers that their read position no longer applies
+    and that they need to load the snapshot again. The records themselves are
+    JSON objects whose meaning is up to the storage.
+    """
+
+    def __init__(self, snapshot_file: str):
+        self.snapshot_file = snapshot_file
+        self.file_name = f"{os.path.splitext(snapshot_file)[0]}.delta.jsonl"
+        self._generation: str | None = None
+        # Byte offset up to which this process has read or written the log
+        self._offset = 0
+
+    def _read_header(self, f) -> str | None:
+        line = f.readline()
+        if not line.endswith(b"\n"):
+            return None
+        return json.loads(line)["generation"]
+
+    def _read_records(self, f, truncate: bool = False) -> list[dict[str, Any]]:
+        records = []
+        for line in f:
+            if not line.endswith(b"\n"):
+                # A crash while appending can only leave the last line incomplete
+                if truncate:
+                    logger.warning(
+                        f"Dropping truncated last record of {self.file_name}"
+                    )
+                    f.truncate(self._offset)
+                break
+            records.append(json.loads(line))
+            self._offset += len(line)
+        return records
+
+    def replay(self) -> list[dict[str, Any]]:
+        """Read every record written since the last snapshot.
+
+        Must run under the storage lock, right after the snapshot was loaded.
+        """
+        self._generation, self._offset = None, 0
+        if not os.path.exists(self.file_name):
+            return []
+        with open(self.file_name, "r+b") as f:
+            self._generation = self._read_header(f)
+            if self._generation is None:
+                return []
+            self._offset = f.tell()
+            records = self._read_records(f, truncate=True)
+        if records:
+            logger.info(f"Replayed {len(records)} records from {self.file_name}")
+        return records
+
+    def read_new(self) -> list[dict[str, Any]] | None:
+        """Read the records appended by other processes since the last read or write.
+
+        Returns:
+            The new records, or None if the log was compacted in the meantime and
+            the storage must be loaded from the snapshot again
+        """
+        if not os.path.exists(self.file_name):
+            # Dropped; a log is always there once anything was written
+            return None
+        with open(self.file_name, "rb") as f:
+            if self._read_header(f) != self._generation:
+                return None
+            f.seek(self._offset)
+            return self._read_records(f)
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        """Append records to the log.
+
+        Must run under the storage lock, after the records of other processes
+        were read, so that this process' read position stays at the end of the log.
+        """
+        if not records:
+            return
+        if not os.path.exists(self.file_name):
+            self.reset()
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+        with open(self.file_name, "ab") as f:
+            f.write(lines)
+            f.flush()
+            self._offset = f.tell()
+
+    def needs_compaction(self) -> bool:
+        """Whether the snapshot should be rewritten and the log reset"""
+        if not os.path.exists(self.file_name):
+            return False
+        log_size = os.path.getsize(self.file_name)
+        snapshot_size = (
+            os.path.getsize(self.snapshot_file)
+            if os.path.exists(self.snapshot_file)
+            else 0
+        )
+        return log_size > max(_COMPACT_RATIO * snapshot_size, _COMPACT_MIN_BYTES)
+
+    def reset(self) -> None:
+        """Start a new, empty generation; call after the snapshot was written.
+
+        Replaying the previous generation on top of the new snapshot, should the
+        process die before the log is replaced, yields the same state.
+        """
+        self._generation = uuid.uuid4().hex
+        tmp_file_name = f"{self.file_name}.tmp"
+        with open(tmp_file_name, "wb") as f:
+            f.write(
+                (json.dumps({"generation": self._generation}) + "\n").encode("utf-8")
+            )
+            self._offset = f.tell()
+        os.replace(tmp_file_name, self.file_name)
+
+    def remove(self) -> None:
+        """Delete the log, e.g. when the storage is dropped"""
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+        self._generation, self._offset = None, 0
+
+
+def apply_kv_records(data: dict[str, Any], records: list[dict[str, Any]]) -> None:
+    """Apply KV log records to a plain dict, updating nested records in place
+
+    Records:
+        {"op": "set", "id": id, "value": value}
+        {"op": "set", "id": id, "field": field, "value": value}
+        {"op": "del", "id": id}
+        {"op": "del", "id": id, "field": field}
+    """
+    for record in records:
+        id = record["id"]
+        if "field" not in record:
+            if record["op"] == "set":
+                data[id] = record["value"]
+            else:
+                data.pop(id, None)
+        elif record["op"] == "set":
+            if not isinstance(data.get(id), dict):
+                data[id] = {}
+            data[id][record["field"]] = record["value"]
+        elif isinstance(data.get(id), dict):
+            data[id].pop(record["field"], None)
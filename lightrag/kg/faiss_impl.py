@@ -54,14 +54,29 @@ class FaissVectorDBStorage(BaseVectorStorage):
         # Embedding dimension (e.g. 768) must match your embedding function
         self._dim = self.embedding_func.embedding_dim
 
-        # Create an empty Faiss index for inner product (useful for normalized vectors = cosine similarity).
-        # If you have a large number of vectors, you might want IVF or other indexes.
-        # For demonstration, we use a simple IndexFlatIP.
-        self._index = faiss.IndexFlatIP(self._dim)
-        # Keep a local store for metadata, IDs, etc.
-        # Maps <int faiss_id> → metadata (including your original ID).
-        self._id_to_meta = {}
-
+        # Approximate nearest-neighbour search: "flat" (exact), "hnsw" or "ivf_pq".
+        # Collections smaller than ann_threshold always use the exact index.
+        self._index_type = kwargs.get("index_type", "flat")
+        if self._index_type not in ("flat", "hnsw", "ivf_pq"):
+            raise ValueError(f"Unsupported Faiss index_type: {self._index_type}")
+        self._ann_threshold = kwargs.get("ann_threshold", 10000)
+        self._hnsw_m = kwargs.get("hnsw_m", 32)
+        self._ef_construction = kwargs.get("ef_construction", 80)
+        self._ef_search = kwargs.get("ef_search", 64)
+        self._ivf_nlist = kwargs.get("ivf_nlist")
+        self._pq_m = kwargs.get("pq_m")
+        self._nprobe = kwargs.get("nprobe", 16)
+        # IVF-PQ scores are approximate; this many times top_k candidates are re-scored exactly
+        self._rerank_factor = kwargs.get("rerank_factor", 4)
+        # Size of the collection the IVF centroids were trained on
+        self._trained_size = 0
+        # Deleted vectors are only dropped from the index once they make up this share of it
+        self._max_tombstone_ratio = kwargs.get("max_tombstone_ratio", 0.2)
+        # Bumped whenever the index is reset, so a rebuild of the old one is discarded
+        self._generation = 0
+        self._rebuilding = False
+
+        self._reset_index()
         self._load_faiss_index()
 
     async def initialize(self):
@@ -81,8 +96,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
                     f"Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
                 self._load_faiss_index()
                 self.storage_updated.value = False
         return self._index
@@ -142,29 +156,31 @@ class FaissVectorDBStorage(BaseVectorStorage):
         faiss.normalize_L2(embeddings)
 
         # Upsert logic:
-        # 1. Identify which vectors to remove if they exist
-        # 2. Remove them
-        # 3. Add the new vectors
-        existing_ids_to_remove = []
-        for meta, emb in zip(list_data, embeddings):
-            faiss_internal_id = self._find_faiss_id_by_custom_id(meta["__id__"])
-            if faiss_internal_id is not None:
-                existing_ids_to_remove.append(faiss_internal_id)
-
+        # 1. Tombstone the previous vectors of existing IDs
+        # 2. Add the new vectors under fresh Faiss IDs
+        existing_ids_to_remove = [
+            self._custom_id_to_fid[meta["__id__"]]
+            for meta in list_data
+            if meta["__id__"] in self._custom_id_to_fid
+        ]
         if existing_ids_to_remove:
             await self._remove_faiss_ids(existing_ids_to_remove)
 
-        # Step 2: Add new vectors
-        index = await self._get_index()
-        start_idx = index.ntotal
-        index.add(embeddings)
+        await self._get_index()
+        async with self._storage_lock:
+            fids = np.arange(
+                self._next_fid, self._next_fid + len(list_data), dtype=np.int64
+            )
+            self._next_fid += len(list_data)
+            self._index.add_with_ids(embeddings, fids)
 
-        # Step 3: Store metadata + vector for each new ID
-        for i, meta in enumerate(list_data):
-            fid = start_idx + i
-            # Store the raw vector so we can rebuild if something is removed
-            meta["__vector__"] = embeddings[i].tolist()
-            self._id_to_meta.update({fid: meta})
+            for fid, meta in zip(fids.tolist(), list_data):
+                self._id_to_meta[fid] = meta
+                self._custom_id_to_fid[meta["__id__"]] = fid
+
+            rebuild = self._ann_rebuild_needed()
+        if rebuild:
+            await self._rebuild_index()
 
         logger.info(f"Upserted {len(list_data)} vectors into Faiss index.")
         return [m["__id__"] for m in list_data]
@@ -185,23 +201,30 @@ class FaissVectorDBStorage(BaseVectorStorage):
         )
 
         # Perform the similarity search
-        index = await self._get_index()
-        distances, indices = index.search(embedding, top_k)
-
-        distances = distances[0]
-        indices = indices[0]
+        await self._get_index()
+        async with self._storage_lock:
+            index = self._index
+            if index.ntotal == 0:
+                return []
+            # Tombstoned vectors are skipped by the index itself
+            params, _selectors = self._search_params(index)
+            distances, indices = index.search(
+                embedding, min(top_k, index.ntotal), params=params
+            )
 
         results = []
-        for dist, idx in zip(distances, indices):
-            if idx == -1:
-                # Faiss returns -1 if no neighbor
+        for dist, idx in zip(distances[0], indices[0]):
+            # Faiss returns -1 if no neighbor; deleted vectors have no metadata
+            meta = self._id_to_meta.get(int(idx))
+            if meta is None:
                 continue
+            if len(results) == top_k:
+                break
 
             # Cosine similarity threshold
             if dist < self.cosine_better_than_threshold:
                 continue
 
-            meta = self._id_to_meta.get(idx, {})
             results.append(
                 {
                     **meta,
@@ -228,11 +251,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
            KG-storage-log should be used to avoid data corruption
         """
         logger.info(f"Deleting {len(ids)} vectors from {self.namespace}")
-        to_remove = []
-        for cid in ids:
-            fid = self._find_faiss_id_by_custom_id(cid)
-            if fid is not None:
-                to_remove.append(fid)
+        to_remove = [
+            self._custom_id_to_fid[cid] for cid in ids if cid in self._custom_id_to_fid
+        ]
 
         if to_remove:
             await self._remove_faiss_ids(to_remove)
@@ -273,39 +294,209 @@ class FaissVectorDBStorage(BaseVectorStorage):
     # Internal helper methods
     # --------------------------------------------------------------------------------
 
-    def _find_faiss_id_by_custom_id(self, custom_id: str):
+    def _reset_index(self):
+        """Start with an empty index and no metadata"""
+        self._index = self._build_index(np.empty((0, self._dim), dtype=np.float32), [])
+        # Maps <int faiss_id> → metadata (including your original ID), and back
+        self._id_to_meta = {}
+        self._custom_id_to_fid = {}
+        # Faiss IDs deleted from the metadata but still in the index
+        self._tombstones = set()
+        self._tombstone_selector = None
+        self._next_fid = 0
+        self._generation += 1
+
+    def _build_index(self, vectors: np.ndarray, fids):
         """
-        Return the Faiss internal ID for a given custom ID, or None if not found.
+        Create an IndexIDMap2 holding the given normalized vectors under the given Faiss IDs.
+        The configured ANN index is used once the collection reaches ann_threshold;
+        IVF-PQ also needs at least 256 vectors to train its codebooks, and is wrapped
+        in an IndexRefineFlat that re-scores its candidates exactly.
         """
-        for fid, meta in self._id_to_meta.items():
-            if meta.get("__id__") == custom_id:
-                return fid
-        return None
+        n = len(vectors)
+        if self._index_type == "flat" or n < self._ann_threshold:
+            index = faiss.IndexFlatIP(self._dim)
+        elif self._index_type == "hnsw":
+            logger.info(f"Building HNSW index of {n} vectors for {self.namespace}")
+            index = faiss.IndexHNSWFlat(
+                self._dim, self._hnsw_m, faiss.METRIC_INNER_PRODUCT
+            )
+            index.hnsw.efConstruction = self._ef_construction
+        elif n >= 256:
+            nlist = self._ivf_nlist or max(1, min(int(4 * np.sqrt(n)), n // 39))
+            pq_m = self._pq_m or max(
+                m for m in range(1, min(self._dim, 64) + 1) if self._dim % m == 0
+            )
+            logger.info(
+                f"Training IVF{nlist},PQ{pq_m} index on {n} vectors for {self.namespace}"
+            )
+            quantizer = faiss.IndexFlatIP(self._dim)
+            index = faiss.IndexIVFPQ(
+                quantizer, self._dim, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+            index = faiss.IndexRefineFlat(index)
+        else:
+            index = faiss.IndexFlatIP(self._dim)
+
+        index = faiss.IndexIDMap2(index)
+        if n:
+            index.add_with_ids(vectors, np.asarray(fids, dtype=np.int64))
+        self._set_search_params(index)
+        return index
+
+    @staticmethod
+    def _base_index(index):
+        """The index inside the IndexIDMap2 and IndexRefineFlat wrappers"""
+        while isinstance(index, (faiss.IndexIDMap2, faiss.IndexRefineFlat)):
+            inner = (
+                index.index
+                if isinstance(index, faiss.IndexIDMap2)
+                else index.base_index
+            )
+            index = faiss.downcast_index(inner)
+        return index
+
+    def _set_search_params(self, index) -> None:
+        if isinstance(index, faiss.IndexIDMap2):
+            refine = faiss.downcast_index(index.index)
+            if isinstance(refine, faiss.IndexRefineFlat):
+                refine.k_factor = self._rerank_factor
+        base = self._base_index(index)
+        if isinstance(base, faiss.IndexHNSW):
+            base.hnsw.efSearch = self._ef_search
+        elif isinstance(base, faiss.IndexIVF):
+            base.nprobe = self._nprobe
+
+    def _search_params(self, index):
+        """
+        Search parameters that exclude the tombstoned vectors from the search.
 
-    async def _remove_faiss_ids(self, fid_list):
+        Returns (params, selectors); the selectors must be kept alive for the
+        duration of the search. Both are None without tombstones.
+        """
+        if not self._tombstones:
+            return None, None
+        if self._tombstone_selector is None:
+            ids = np.fromiter(
+                self._tombstones, dtype=np.int64, count=len(self._tombstones)
+            )
+            batch = faiss.IDSelectorBatch(ids)
+            self._tombstone_selector = (batch, faiss.IDSelectorNot(batch))
+        # IndexIDMap2 translates Faiss IDs to positions only for a selector on the
+        # outermost parameters, which IndexRefineFlat does not pass on
+        sel = faiss.IDSelectorTranslated(index.id_map, self._tombstone_selector[1])
+        base = self._base_index(index)
+        if isinstance(base, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(sel=sel, efSearch=self._ef_search)
+        elif isinstance(base, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=sel, nprobe=self._nprobe)
+        else:
+            params = faiss.SearchParameters(sel=sel)
+        base_params = params
+        if isinstance(faiss.downcast_index(index.index), faiss.IndexRefineFlat):
+            params = faiss.IndexRefineSearchParameters(
+                k_factor=self._rerank_factor, base_index_params=base_params
+            )
+        return params, (self._tombstone_selector, sel, base_params)
+
+    def _ann_rebuild_needed(self) -> bool:
         """
-        Remove a list of internal Faiss IDs from the index.
-        Because IndexFlatIP doesn't support 'removals',
-        we rebuild the index excluding those vectors.
+        Whether the collection just passed ann_threshold, or grew enough since the
+        IVF centroids were trained that they should be trained again.
+        HNSW graphs and IVF lists otherwise grow incrementally with each add.
         """
-        keep_fids = [fid for fid in self._id_to_meta if fid not in fid_list]
+        size = len(self._id_to_meta)
+        if self._index_type == "flat" or size < self._ann_threshold:
+            return False
+        base = self._base_index(self._index)
+        if isinstance(base, faiss.IndexFlat):
+            return self._index_type == "hnsw" or size >= 256
+        if isinstance(base, faiss.IndexIVF):
+            return size >= 2 * self._trained_size
+        return False
+
+    async def _rebuild_index(self):
+        """
+        Rebuild the index from the live vectors, dropping all tombstones.
 
-        # Rebuild the index
-        vectors_to_keep = []
-        new_id_to_meta = {}
-        for new_fid, old_fid in enumerate(keep_fids):
-            vec_meta = self._id_to_meta[old_fid]
-            vectors_to_keep.append(vec_meta["__vector__"])  # stored as list
-            new_id_to_meta[new_fid] = vec_meta
+        Building an HNSW graph or training IVF-PQ takes seconds on large
+        collections, so the new index is built in a thread from a snapshot of
+        the vectors, without holding the storage lock. The vectors added and
+        deleted in the meantime are then applied to it under the lock, as it
+        replaces the current index.
+        """
+        async with self._storage_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            generation = self._generation
+            fids = np.fromiter(
+                self._id_to_meta, dtype=np.int64, count=len(self._id_to_meta)
+            )
+            if len(fids):
+                vectors = self._index.reconstruct_batch(fids)
+            else:
+                vectors = np.empty((0, self._dim), dtype=np.float32)
 
+        try:
+            index = await asyncio.to_thread(self._build_index, vectors, fids)
+        finally:
+            self._rebuilding = False
+
+        async with self._storage_lock:
+            if generation != self._generation:
+                # The storage was dropped or reloaded during the build
+                return
+            built = set(fids.tolist())
+            added = [fid for fid in self._id_to_meta if fid not in built]
+            if added:
+                added = np.array(added, dtype=np.int64)
+                index.add_with_ids(self._index.reconstruct_batch(added), added)
+            self._index = index
+            self._tombstones = built - set(self._id_to_meta)
+            self._tombstone_selector = None
+            if isinstance(self._base_index(index), faiss.IndexIVF):
+                self._trained_size = len(fids)
+
+    async def _compact(self):
+        """Drop the tombstoned vectors from the index"""
         async with self._storage_lock:
-            # Re-init index
-            self._index = faiss.IndexFlatIP(self._dim)
-            if vectors_to_keep:
-                arr = np.array(vectors_to_keep, dtype=np.float32)
-                self._index.add(arr)
+            if not self._tombstones or self._rebuilding:
+                return
+            ids = np.fromiter(
+                self._tombstones, dtype=np.int64, count=len(self._tombstones)
+            )
+            try:
+                # Flat and IVF indexes only shift their stored codes
+                self._index.remove_ids(ids)
+                self._tombstones = set()
+                self._tombstone_selector = None
+                return
+            except RuntimeError:
+                # HNSW and refined IVF-PQ indexes cannot remove vectors
+                pass
+        await self._rebuild_index()
 
-            self._id_to_meta = new_id_to_meta
+    async def _remove_faiss_ids(self, fid_list):
+        """
+        Remove a list of internal Faiss IDs.
+        Their metadata is dropped at once, and searches skip their vectors;
+        the vectors are removed from the index in batches, once they make up
+        max_tombstone_ratio of it.
+        """
+        async with self._storage_lock:
+            for fid in fid_list:
+                meta = self._id_to_meta.pop(fid, None)
+                if meta is not None:
+                    self._custom_id_to_fid.pop(meta["__id__"], None)
+                    self._tombstones.add(fid)
+                    self._tombstone_selector = None
+            compact = (
+                len(self._tombstones) > self._max_tombstone_ratio * self._index.ntotal
+            )
+        if compact:
+            await self._compact()
 
     def _save_faiss_index(self):
         """
@@ -314,7 +505,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         faiss.write_index(self._index, self._faiss_index_file)
 
         # Save metadata dict to JSON. Convert all keys to strings for JSON storage.
-        # _id_to_meta is { int: { '__id__': doc_id, '__vector__': [float,...], ... } }
+        # _id_to_meta is { int: { '__id__': doc_id, ... } }
         # We'll keep the int -> dict, but JSON requires string keys.
         serializable_dict = {}
         for fid, meta in self._id_to_meta.items():
@@ -334,16 +525,46 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         try:
             # Load the Faiss index
-            self._index = faiss.read_index(self._faiss_index_file)
+            index = faiss.read_index(self._faiss_index_file)
             # Load metadata
             with open(self._meta_file, "r", encoding="utf-8") as f:
                 stored_dict = json.load(f)
 
             # Convert string keys back to int
             self._id_to_meta = {}
+            old_vectors = {}
             for fid_str, meta in stored_dict.items():
                 fid = int(fid_str)
+                # Older files kept the raw vector in the metadata
+                vector = meta.pop("__vector__", None)
+                if vector is not None:
+                    old_vectors[fid] = vector
                 self._id_to_meta[fid] = meta
+            self._custom_id_to_fid = {
+                meta["__id__"]: fid for fid, meta in self._id_to_meta.items()
+            }
+            self._next_fid = max(self._id_to_meta, default=-1) + 1
+
+            if isinstance(index, faiss.IndexIDMap2):
+                self._index = index
+                self._set_search_params(index)
+                # Vectors without metadata were deleted but not yet compacted away
+                index_fids = set(faiss.vector_to_array(index.id_map).tolist())
+                self._tombstones = index_fids - set(self._id_to_meta)
+                self._tombstone_selector = None
+                self._next_fid = max(self._next_fid, max(index_fids, default=-1) + 1)
+            else:
+                # Index written before Faiss IDs were stable: positions are the IDs
+                fids = sorted(self._id_to_meta)
+                if len(old_vectors) == len(fids):
+                    vectors = [old_vectors[fid] for fid in fids]
+                else:
+                    vectors = index.reconstruct_n(0, index.ntotal)[fids]
+                self._index = self._build_index(
+                    np.array(vectors, dtype=np.float32).reshape(-1, self._dim), fids
+                )
+            if isinstance(self._base_index(self._index), faiss.IndexIVF):
+                self._trained_size = self._index.ntotal
 
             logger.info(
                 f"Faiss index loaded with {self._index.ntotal} vectors from {self._faiss_index_file}"
@@ -351,8 +572,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         except Exception as e:
             logger.error(f"Failed to load Faiss index or metadata: {e}")
             logger.warning("Starting with an empty Faiss index.")
-            self._index = faiss.IndexFlatIP(self._dim)
-            self._id_to_meta = {}
+            self._reset_index()
 
     async def index_done_callback(self) -> None:
         async with self._storage_lock:
@@ -362,11 +582,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"Storage for FAISS {self.namespace} was updated by another process, reloading..."
                 )
-                async with self._storage_lock:
-                    self._index = faiss.IndexFlatIP(self._dim)
-                    self._id_to_meta = {}
-                    self._load_faiss_index()
-                    self.storage_updated.value = False
+                self._reset_index()
+                self._load_faiss_index()
+                self.storage_updated.value = False
                 return False  # Return error
 
         # Acquire lock and perform persistence
@@ -415,7 +633,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
             The vector data if found, or None if not found
         """
         # Find the Faiss internal ID for the custom ID
-        fid = self._find_faiss_id_by_custom_id(id)
+        fid = self._custom_id_to_fid.get(id)
         if fid is None:
             return None
 
@@ -440,7 +658,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         results = []
         for id in ids:
-            fid = self._find_faiss_id_by_custom_id(id)
+            fid = self._custom_id_to_fid.get(id)
             if fid is not None:
                 metadata = self._id_to_meta.get(fid, {})
                 if metadata:
@@ -448,6 +666,21 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         return results
 
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, np.ndarray]:
+        await self._get_index()
+        async with self._storage_lock:
+            found = [
+                (id, self._custom_id_to_fid[id])
+                for id in ids
+                if id in self._custom_id_to_fid
+            ]
+            if not found:
+                return {}
+            vectors = self._index.reconstruct_batch(
+                np.array([fid for _, fid in found], dtype=np.int64)
+            )
+        return {id: vector for (id, _), vector in zip(found, vectors)}
+
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
 
@@ -467,8 +700,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         try:
             async with self._storage_lock:
                 # Reset the index
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
 
                 # Remove storage files if they exist
                 if os.path.exists(self._faiss_index_file):
@@ -476,9 +708,6 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 if os.path.exists(self._meta_file):
                     os.remove(self._meta_file)
 
-                self._id_to_meta = {}
-                self._load_faiss_index()
-
                 # Notify other processes
                 await set_all_update_flags(self.namespace)
                 self.storage_updated.value = False
@@ -12,28 +12,44 @@ from lightrag.utils import (
     logger,
     write_json,
 )
+from .delta_log import DeltaLog, apply_kv_records
 from .shared_storage import (
     get_namespace_data,
     get_storage_lock,
     get_data_init_lock,
     get_update_flag,
     set_all_update_flags,
-    clear_all_update_flags,
     try_initialize_namespace,
 )
 
 
+def _status_key(record: dict[str, Any]) -> str:
+    status = record.get("status")
+    return status.value if isinstance(status, DocStatus) else status
+
+
 @final
 @dataclass
 class JsonDocStatusStorage(DocStatusStorage):
-    """JSON implementation of document status storage"""
+    """JSON implementation of document status storage
+
+    Each process keeps an index of document ids per status next to the shared
+    records, so status counts and status queries cost O(result). The index is
+    rebuilt when storage_updated shows that another process changed the records.
+
+    The full document content lives in full_docs; it is not kept in the status
+    records (see upsert).
+    """
 
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         self._file_name = os.path.join(working_dir, f"kv_store_{self.namespace}.json")
+        self._delta_log = DeltaLog(self._file_name)
         self._data = None
         self._storage_lock = None
         self.storage_updated = None
+        # status -> ids of the documents in that status, in insertion order
+        self._status_index: dict[str, dict[str, None]] = {}
 
     async def initialize(self):
         """Initialize storage data"""
@@ -44,12 +60,47 @@ class JsonDocStatusStorage(DocStatusStorage):
             need_init = await try_initialize_namespace(self.namespace)
             self._data = await get_namespace_data(self.namespace)
             if need_init:
-                loaded_data = load_json(self._file_name) or {}
                 async with self._storage_lock:
+                    # Read snapshot and log under the lock, so no compaction runs in between
+                    loaded_data = load_json(self._file_name) or {}
+                    apply_kv_records(loaded_data, self._delta_log.replay())
+                    # Older versions kept the content here too; processed
+                    # documents are guaranteed to have it in full_docs
+                    for record in loaded_data.values():
+                        if _status_key(record) == DocStatus.PROCESSED.value:
+                            record.pop("content", None)
                     self._data.update(loaded_data)
                     logger.info(
                         f"Process {os.getpid()} doc status load {self.namespace} with {len(loaded_data)} records"
                     )
+        async with self._storage_lock:
+            self._rebuild_status_index()
+
+    def _rebuild_status_index(self) -> None:
+        """Index all records; call under the storage lock"""
+        self._status_index = {}
+        for doc_id, record in self._data.items():
+            self._status_index.setdefault(_status_key(record), {})[doc_id] = None
+        self.storage_updated.value = False
+
+    def _get_status_index(self) -> dict[str, dict[str, None]]:
+        """The status index, rebuilt if another process changed the records;
+        call under the storage lock
+        """
+        if self.storage_updated.value:
+            self._rebuild_status_index()
+        return self._status_index
+
+    def _unindex(self, doc_id: str, record: dict[str, Any] | None) -> None:
+        if record is not None:
+            ids = self._status_index.get(_status_key(record))
+            if ids is not None:
+                ids.pop(doc_id, None)
+
+    async def _notify_update(self) -> None:
+        # Other processes rebuild their status index; this one is up to date
+        await set_all_update_flags(self.namespace)
+        self.storage_updated.value = False
 
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Return keys that should be processed (not in storage or not successfully processed)"""
@@ -69,8 +120,8 @@ class JsonDocStatusStorage(DocStatusStorage):
         """Get counts of documents in each status"""
         counts = {status.value: 0 for status in DocStatus}
         async with self._storage_lock:
-            for doc in self._data.values():
-                counts[doc["status"]] += 1
+            for status, ids in self._get_status_index().items():
+                counts[status] = len(ids)
         return counts
 
     async def get_docs_by_status(
@@ -79,47 +130,65 @@ class JsonDocStatusStorage(DocStatusStorage):
         """Get all documents with a specific status"""
         result = {}
         async with self._storage_lock:
-            for k, v in self._data.items():
-                if v["status"] == status.value:
-                    try:
-                        # Make a copy of the data to avoid modifying the original
-                        data = v.copy()
-                        # If content is missing, use content_summary as content
-                        if "content" not in data and "content_summary" in data:
-                            data["content"] = data["content_summary"]
-                        # If file_path is not in data, use document id as file path
-                        if "file_path" not in data:
-                            data["file_path"] = "no-file-path"
-                        result[k] = DocProcessingStatus(**data)
-                    except KeyError as e:
-                        logger.error(f"Missing required field for document {k}: {e}")
-                        continue
+            ids = list(self._get_status_index().get(status.value, ()))
+            for k in ids:
+                v = self._data.get(k)
+                if v is None:
+                    continue
+                try:
+                    # Make a copy of the data to avoid modifying the original
+                    data = v.copy()
+                    # If content is missing, use content_summary as content
+                    if "content" not in data and "content_summary" in data:
+                        data["content"] = data["content_summary"]
+                    # If file_path is not in data, use document id as file path
+                    if "file_path" not in data:
+                        data["file_path"] = "no-file-path"
+                    result[k] = DocProcessingStatus(**data)
+                except KeyError as e:
+                    logger.error(f"Missing required field for document {k}: {e}")
+                    continue
         return result
 
+    def _write_snapshot(self) -> None:
+        data_dict = dict(self._data) if hasattr(self._data, "_getvalue") else self._data
+        logger.info(
+            f"Process {os.getpid()} doc status writting {len(data_dict)} records to {self.namespace}"
+        )
+        write_json(data_dict, self._file_name)
+        self._delta_log.reset()
+
     async def index_done_callback(self) -> None:
+        """Rewrite the snapshot once the delta log has outgrown it"""
         async with self._storage_lock:
-            if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
-                logger.info(
-                    f"Process {os.getpid()} doc status writting {len(data_dict)} records to {self.namespace}"
-                )
-                write_json(data_dict, self._file_name)
-                await clear_all_update_flags(self.namespace)
+            if self._delta_log.needs_compaction():
+                self._write_snapshot()
 
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
         Importance notes for in-memory storage:
-        1. Changes will be persisted to disk during the next index_done_callback
-        2. update flags to notify other processes that data persistence is needed
+        1. Changes are appended to the delta log under the storage lock, in the
+           order in which they are applied to the shared data
+        2. update flags to notify other processes that their status index is stale
+        3. The "content" field is not stored, read the content from full_docs
         """
         if not data:
             return
         logger.debug(f"Inserting {len(data)} records to {self.namespace}")
+        data = {
+            id: {k: v for k, v in record.items() if k != "content"}
+            for id, record in data.items()
+        }
         async with self._storage_lock:
+            status_index = self._get_status_index()
+            for id, record in data.items():
+                self._unindex(id, self._data.get(id))
+                status_index.setdefault(_status_key(record), {})[id] = None
             self._data.update(data)
-            await set_all_update_flags(self.namespace)
+            self._delta_log.append(
+                [{"op": "set", "id": id, "value": value} for id, value in data.items()]
+            )
+            await self._notify_update()
 
         await self.index_done_callback()
 
@@ -131,8 +200,9 @@ class JsonDocStatusStorage(DocStatusStorage):
         """Delete specific records from storage by their IDs
 
         Importance notes for in-memory storage:
-        1. Changes will be persisted to disk during the next index_done_callback
-        2. update flags to notify other processes that data persistence is needed
+        1. Changes are appended to the delta log under the storage lock, in the
+           order in which they are applied to the shared data
+        2. update flags to notify other processes that their status index is stale
 
         Args:
             ids (list[str]): List of document IDs to be deleted from storage
@@ -141,14 +211,17 @@ class JsonDocStatusStorage(DocStatusStorage):
             None
         """
         async with self._storage_lock:
-            any_deleted = False
+            self._get_status_index()
+            records = []
             for doc_id in doc_ids:
                 result = self._data.pop(doc_id, None)
                 if result is not None:
-                    any_deleted = True
+                    self._unindex(doc_id, result)
+                    records.append({"op": "del", "id": doc_id})
 
-            if any_deleted:
-                await set_all_update_flags(self.namespace)
+            if records:
+                self._delta_log.append(records)
+                await self._notify_update()
 
     async def drop(self) -> dict[str, str]:
         """Drop all document status data from storage and clean up resources
@@ -156,7 +229,7 @@ class JsonDocStatusStorage(DocStatusStorage):
         This method will:
         1. Clear all document status data from memory
         2. Update flags to notify other processes
-        3. Trigger index_done_callback to save the empty state
+        3. Save the empty state as a new snapshot
 
         Returns:
             dict[str, str]: Operation status and message
@@ -166,9 +239,10 @@ class JsonDocStatusStorage(DocStatusStorage):
         try:
             async with self._storage_lock:
                 self._data.clear()
-                await set_all_update_flags(self.namespace)
+                self._status_index = {}
+                self._write_snapshot()
+                await self._notify_update()
 
-            await self.index_done_callback()
             logger.info(f"Process {os.getpid()} drop {self.namespace}")
             return {"status": "success", "message": "data dropped"}
         except Exception as e:
@@ -10,6 +10,7 @@ from lightrag.utils import (
     logger,
     write_json,
 )
+from .delta_log import DeltaLog, apply_kv_records
 from .shared_storage import (
     get_namespace_data,
     get_storage_lock,
@@ -21,16 +22,34 @@ from .shared_storage import (
 )
 
 
+_MISSING = object()
+
+
 @final
 @dataclass
 class JsonKVStorage(BaseKVStorage):
+    """JSON implementation of KV storage
+
+    Records are shared between processes. Each change is appended to a delta
+    log as it is applied, and the log is compacted into the JSON snapshot. A
+    shared change counter per record backs get_version.
+    """
+
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         self._file_name = os.path.join(working_dir, f"kv_store_{self.namespace}.json")
+        self._delta_log = DeltaLog(self._file_name)
         self._data = None
+        # record id -> number of changes, shared by all processes
+        self._versions = None
         self._storage_lock = None
         self.storage_updated = None
 
+    @property
+    def _field_level(self) -> bool:
+        # Cache records are dicts of cache entries per mode, log single entries
+        return self.namespace.endswith("cache")
+
     async def initialize(self):
         """Initialize storage data"""
         self._storage_lock = get_storage_lock()
@@ -39,9 +58,12 @@ class JsonKVStorage(BaseKVStorage):
             # check need_init must before get_namespace_data
             need_init = await try_initialize_namespace(self.namespace)
             self._data = await get_namespace_data(self.namespace)
+            self._versions = await get_namespace_data(f"{self.namespace}_versions")
             if need_init:
-                loaded_data = load_json(self._file_name) or {}
                 async with self._storage_lock:
+                    # Read snapshot and log under the lock, so no compaction runs in between
+                    loaded_data = load_json(self._file_name) or {}
+                    apply_kv_records(loaded_data, self._delta_log.replay())
                     self._data.update(loaded_data)
 
                     # Calculate data count based on namespace
@@ -60,30 +82,67 @@ class JsonKVStorage(BaseKVStorage):
                         f"Process {os.getpid()} KV load {self.namespace} with {data_count} records"
                     )
 
+    def _set_records(self, id: str, old: Any, value: Any) -> list[dict[str, Any]]:
+        """Log records that turn the stored value old of a record into value"""
+        if (
+            not self._field_level
+            or old is value
+            or not isinstance(old, dict)
+            or not isinstance(value, dict)
+        ):
+            return [{"op": "set", "id": id, "value": value}]
+        records = []
+        for field_name, field_value in value.items():
+            old_value = old.get(field_name, _MISSING)
+            # Shared Manager dicts hand out copies, so compare by value too
+            if old_value is not field_value and old_value != field_value:
+                records.append(
+                    {"op": "set", "id": id, "field": field_name, "value": field_value}
+                )
+        for field_name in old.keys() - value.keys():
+            records.append({"op": "del", "id": id, "field": field_name})
+        return records
+        if self._field_level:
+            if isinstance(value, dict):
+                self._logged_fields[id] = dict(value)
+            else:
+                self._logged_fields.pop(id, None)
+
+    def _write_snapshot(self) -> None:
+        data_dict = dict(self._data) if hasattr(self._data, "_getvalue") else self._data
+
+        # Calculate data count based on namespace
+        if self.namespace.endswith("cache"):
+            # # For cache namespaces, sum the cache entries across all cache types
+            data_count = sum(
+                len(first_level_dict)
+                for first_level_dict in data_dict.values()
+                if isinstance(first_level_dict, dict)
+            )
+        else:
+            # For non-cache namespaces, use the original count method
+            data_count = len(data_dict)
+
+        logger.info(
+            f"Process {os.getpid()} KV writting {data_count} records to {self.namespace}"
+        )
+        write_json(data_dict, self._file_name)
+        self._delta_log.reset()
+
     async def index_done_callback(self) -> None:
+        """Rewrite the snapshot once the delta log has outgrown it"""
         async with self._storage_lock:
-            if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
+            if self._delta_log.needs_compaction():
+                self._write_snapshot()
+            await clear_all_update_flags(self.namespace)
 
-                # Calculate data count based on namespace
-                if self.namespace.endswith("cache"):
-                    # # For cache namespaces, sum the cache entries across all cache types
-                    data_count = sum(
-                        len(first_level_dict)
-                        for first_level_dict in data_dict.values()
-                        if isinstance(first_level_dict, dict)
-                    )
-                else:
-                    # For non-cache namespaces, use the original count method
-                    data_count = len(data_dict)
+    def _count_changes(self, ids) -> None:
+        for id in ids:
+            self._versions[id] = self._versions.get(id, 0) + 1
 
-                logger.info(
-                    f"Process {os.getpid()} KV writting {data_count} records to {self.namespace}"
-                )
-                write_json(data_dict, self._file_name)
-                await clear_all_update_flags(self.namespace)
+    async def get_version(self, id: str) -> int | None:
+        async with self._storage_lock:
+            return self._versions.get(id, 0)
 
     async def get_all(self) -> dict[str, Any]:
         """Get all data from storage
@@ -96,7 +155,9 @@ class JsonKVStorage(BaseKVStorage):
 
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
         async with self._storage_lock:
-            return self._data.get(id)
+            value = self._data.get(id)
+            # A copy, so that changes only reach the store (and the log) by upsert
+            return dict(value) if isinstance(value, dict) else value
 
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
         async with self._storage_lock:
@@ -116,21 +177,28 @@ class JsonKVStorage(BaseKVStorage):
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
         Importance notes for in-memory storage:
-        1. Changes will be persisted to disk during the next index_done_callback
+        1. Changes are appended to the delta log under the storage lock, in the
+           order in which they are applied to the shared data
         2. update flags to notify other processes that data persistence is needed
         """
         if not data:
             return
         logger.debug(f"Inserting {len(data)} records to {self.namespace}")
         async with self._storage_lock:
+            records = []
+            for id, value in data.items():
+                records.extend(self._set_records(id, self._data.get(id), value))
             self._data.update(data)
+            self._delta_log.append(records)
+            self._count_changes(data)
             await set_all_update_flags(self.namespace)
 
     async def delete(self, ids: list[str]) -> None:
         """Delete specific records from storage by their IDs
 
         Importance notes for in-memory storage:
-        1. Changes will be persisted to disk during the next index_done_callback
+        1. Changes are appended to the delta log under the storage lock, in the
+           order in which they are applied to the shared data
         2. update flags to notify other processes that data persistence is needed
 
         Args:
@@ -140,13 +208,15 @@ class JsonKVStorage(BaseKVStorage):
             None
         """
         async with self._storage_lock:
-            any_deleted = False
+            records = []
             for doc_id in ids:
                 result = self._data.pop(doc_id, None)
                 if result is not None:
-                    any_deleted = True
+                    records.append({"op": "del", "id": doc_id})
 
-            if any_deleted:
+            if records:
+                self._delta_log.append(records)
+                self._count_changes(record["id"] for record in records)
                 await set_all_update_flags(self.namespace)
 
     async def drop_cache_by_modes(self, modes: list[str] | None = None) -> bool:
@@ -179,7 +249,7 @@ class JsonKVStorage(BaseKVStorage):
         This method will:
         1. Clear all data from memory
         2. Update flags to notify other processes
-        3. Trigger index_done_callback to save the empty state
+        3. Save the empty state as a new snapshot
 
         Returns:
             dict[str, str]: Operation status and message
@@ -188,10 +258,11 @@ class JsonKVStorage(BaseKVStorage):
         """
         try:
             async with self._storage_lock:
+                self._count_changes(list(self._data.keys()))
                 self._data.clear()
-                await set_all_update_flags(self.namespace)
+                self._write_snapshot()
+                await clear_all_update_flags(self.namespace)
 
-            await self.index_done_callback()
             logger.info(f"Process {os.getpid()} drop {self.namespace}")
             return {"status": "success", "message": "data dropped"}
         except Exception as e:
@@ -0,0 +1,546 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Any, final
+
+import numpy as np
+
+from lightrag.utils import (
+    logger,
+    compute_mdhash_id,
+)
+from lightrag.base import BaseVectorStorage
+from .shared_storage import (
+    get_storage_lock,
+    get_update_flag,
+    set_all_update_flags,
+)
+
+# Rows scored per step of a query, to bound the memory of the float32 copy
+_QUERY_CHUNK = 65536
+# Segments are merged into one once there are more than this...
+_MAX_SEGMENTS = 32
+# ...or once this share of the stored rows is deleted
+_MAX_DELETED_RATIO = 0.3
+
+
+@dataclass
+class _Segment:
+    """A batch of rows: vectors, ids, lazily loaded metadata columns and tombstones"""
+
+    name: str | None  # None until written to disk
+    vectors: np.ndarray
+    ids: list[str]
+    deleted: np.ndarray
+    meta: dict[str, list] | None = None
+    deleted_dirty: bool = False
+    _dir: str = field(default="", repr=False)
+
+    def columns(self) -> dict[str, list]:
+        if self.meta is None:
+            with open(
+                os.path.join(self._dir, f"{self.name}.meta.json"), encoding="utf-8"
+            ) as f:
+                self.meta = json.load(f)
+        return self.meta
+
+    def row(self, i: int) -> dict[str, Any]:
+        record = {
+            name: values[i]
+            for name, values in self.columns().items()
+            if values[i] is not None
+        }
+        record["__id__"] = self.ids[i]
+        return record
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), _QUERY_CHUNK):
+            chunk = self.vectors[start : start + _QUERY_CHUNK]
+            scores[start : start + len(chunk)] = chunk.astype(np.float32) @ query
+        return scores
+
+
+@final
+@dataclass
+class MemmapVectorDBStorage(BaseVectorStorage):
+    """Local vector storage that memory-maps its embeddings.
+
+    Vectors are normalized and stored as float32 or float16 .npy segments
+    under memmap_vdb_<namespace>/, opened with np.memmap so start-up only
+    reads the ids and queries are served from the page cache. Metadata is
+    kept per segment as JSON columns, loaded on first use. Upserts append a
+    new segment on the next index_done_callback, deletes only write
+    tombstone masks, and segments are merged once there are too many of
+    them or too many deleted rows.
+
+    Set vector_db_storage_cls_kwargs["vector_dtype"] to "float16" to halve
+    the size of the vector files.
+    """
+
+    def __post_init__(self):
+        kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
+        cosine_threshold = kwargs.get("cosine_better_than_threshold")
+        if cosine_threshold is None:
+            raise ValueError(
+                "cosine_better_than_threshold must be specified in vector_db_storage_cls_kwargs"
+            )
+        self.cosine_better_than_threshold = cosine_threshold
+        self._dtype = np.dtype(kwargs.get("vector_dtype", "float32"))
+        if self._dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported vector_dtype: {self._dtype}")
+
+        self._dir = os.path.join(
+            self.global_config["working_dir"], f"memmap_vdb_{self.namespace}"
+        )
+        self._manifest_file = os.path.join(self._dir, "manifest.json")
+        self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._dim = self.embedding_func.embedding_dim
+
+        self._storage_lock = None
+        self.storage_updated = None
+        self._load()
+
+    async def initialize(self):
+        """Initialize storage data"""
+        # Get the update flag for cross-process update notification
+        self.storage_updated = await get_update_flag(self.namespace)
+        # Get the storage lock for use in other methods
+        self._storage_lock = get_storage_lock(enable_logging=False)
+
+    # --------------------------------------------------------------------------------
+    # Segment files
+    # --------------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Open the segments listed in the manifest"""
+        self._segments: list[_Segment] = []
+        self._locations: dict[str, tuple[_Segment, int]] = {}
+        self._next_segment = 0
+        if not os.path.exists(self._manifest_file):
+            return
+
+        with open(self._manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["dim"] != self._dim or manifest["dtype"] != self._dtype.name:
+            logger.warning(
+                f"Memmap vector storage {self.namespace} has dim/dtype "
+                f"{manifest['dim']}/{manifest['dtype']}, expected {self._dim}/{self._dtype.name}; starting fresh"
+            )
+            return
+
+        self._next_segment = manifest["next_segment"]
+        for name in manifest["segments"]:
+            path = os.path.join(self._dir, name)
+            with open(f"{path}.ids.json", encoding="utf-8") as f:
+                ids = json.load(f)
+            deleted_file = f"{path}.deleted.npy"
+            segment = _Segment(
+                name=name,
+                vectors=np.load(f"{path}.npy", mmap_mode="r"),
+                ids=ids,
+                deleted=np.load(deleted_file)
+                if os.path.exists(deleted_file)
+                else np.zeros(len(ids), dtype=bool),
+                _dir=self._dir,
+            )
+            self._add_segment(segment)
+        logger.info(
+            f"Memmap vector storage {self.namespace} opened with {len(self._locations)} vectors in {len(self._segments)} segments"
+        )
+
+    def _add_segment(self, segment: _Segment) -> None:
+        """Append a segment; its rows replace older rows with the same id"""
+        self._segments.append(segment)
+        for row, id in enumerate(segment.ids):
+            if not segment.deleted[row]:
+                self._tombstone([id])
+                self._locations[id] = (segment, row)
+
+    def _write_segment(self, parts: list[tuple[_Segment, np.ndarray]]) -> _Segment:
+        """Write the given rows of existing segments as a new segment file"""
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        path = os.path.join(self._dir, name)
+
+        vectors = np.concatenate(
+            [segment.vectors[rows] for segment, rows in parts]
+        ).astype(self._dtype, copy=False)
+        ids = [segment.ids[row] for segment, rows in parts for row in rows]
+        names = sorted({column for segment, _ in parts for column in segment.columns()})
+        columns = {column: [] for column in names}
+        for segment, rows in parts:
+            segment_columns = segment.columns()
+            for column in names:
+                values = segment_columns.get(column)
+                columns[column].extend(
+                    values[row] if values is not None else None for row in rows
+                )
+
+        with open(f"{path}.npy", "wb") as f:
+            np.save(f, vectors)
+        with open(f"{path}.ids.json", "w", encoding="utf-8") as f:
+            json.dump(ids, f, ensure_ascii=False)
+        with open(f"{path}.meta.json", "w", encoding="utf-8") as f:
+            json.dump(columns, f, ensure_ascii=False)
+
+        return _Segment(
+            name=name,
+            vectors=np.load(f"{path}.npy", mmap_mode="r"),
+            ids=ids,
+            deleted=np.zeros(len(ids), dtype=bool),
+            meta=columns,
+            _dir=self._dir,
+        )
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "dim": self._dim,
+            "dtype": self._dtype.name,
+            "next_segment": self._next_segment,
+            "segments": [segment.name for segment in self._segments],
+        }
+        tmp_file = f"{self._manifest_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_file, self._manifest_file)
+
+    def _remove_segment_files(self, names: list[str]) -> None:
+        for name in names:
+            for suffix in (".npy", ".ids.json", ".meta.json", ".deleted.npy"):
+                path = os.path.join(self._dir, name + suffix)
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    # Still mapped by another process on some platforms
+                    logger.debug(f"Could not remove {path}: {e}")
+
+    def _persist(self) -> None:
+        """Write new rows as one segment, tombstones, and merge if needed"""
+        os.makedirs(self._dir, exist_ok=True)
+        saved = [s for s in self._segments if s.name is not None]
+        unsaved = [s for s in self._segments if s.name is None]
+
+        total_rows = sum(len(s.ids) for s in saved)
+        deleted_rows = sum(int(s.deleted.sum()) for s in saved)
+        merge = len(saved) + 1 > _MAX_SEGMENTS or (
+            total_rows and deleted_rows / total_rows > _MAX_DELETED_RATIO
+        )
+        sources = self._segments if merge else unsaved
+        parts = [
+            (segment, np.flatnonzero(~segment.deleted))
+            for segment in sources
+            if not segment.deleted.all()
+        ]
+
+        new_segments = [] if merge else saved
+        if parts:
+            new_segments = new_segments + [self._write_segment(parts)]
+
+        self._segments = []
+        self._locations = {}
+        for segment in new_segments:
+            self._add_segment(segment)
+        self._write_manifest()
+
+        # Written after the manifest: after a crash in between, replaced rows
+        # are shadowed by their newer copy when the segments are opened again
+        if not merge:
+            for segment in saved:
+                if segment.deleted_dirty:
+                    np.save(
+                        os.path.join(self._dir, f"{segment.name}.deleted.npy"),
+                        segment.deleted,
+                    )
+                    segment.deleted_dirty = False
+        else:
+            logger.info(
+                f"Merged {len(saved)} segments of {self.namespace} into {len(self._segments)}"
+            )
+            self._remove_segment_files([s.name for s in saved])
+
+    async def _get_segments(self) -> list[_Segment]:
+        """Check if the storage should be reloaded"""
+        async with self._storage_lock:
+            if self.storage_updated.value:
+                logger.info(
+                    f"Process {os.getpid()} reloading {self.namespace} due to update by another process"
+                )
+                self._load()
+                self.storage_updated.value = False
+            return self._segments
+
+    def _tombstone(self, ids: list[str]) -> int:
+        deleted = 0
+        for id in ids:
+            location = self._locations.pop(id, None)
+            if location is not None:
+                segment, row = location
+                segment.deleted[row] = True
+                segment.deleted_dirty = True
+                deleted += 1
+        return deleted
+
+    # --------------------------------------------------------------------------------
+    # BaseVectorStorage
+    # --------------------------------------------------------------------------------
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        logger.debug(f"Inserting {len(data)} to {self.namespace}")
+        if not data:
+            return
+
+        current_time = time.time()
+        contents = [v["content"] for v in data.values()]
+        batches = [
+            contents[i : i + self._max_batch_size]
+            for i in range(0, len(contents), self._max_batch_size)
+        ]
+        # Execute embedding outside of lock to avoid long lock times
+        embeddings_list = await asyncio.gather(
+            *[self.embedding_func(batch) for batch in batches]
+        )
+        embeddings = np.concatenate(embeddings_list).astype(np.float32)
+        if len(embeddings) != len(data):
+            # sometimes the embedding is not returned correctly. just log it.
+            logger.error(
+                f"embedding is not 1-1 with data, {len(embeddings)} != {len(data)}"
+            )
+            return
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+
+        ids = list(data)
+        columns = {"__created_at__": [current_time] * len(ids)}
+        for name in self.meta_fields:
+            if any(name in v for v in data.values()):
+                columns[name] = [v.get(name) for v in data.values()]
+
+        await self._get_segments()
+        async with self._storage_lock:
+            self._add_segment(
+                _Segment(
+                    name=None,
+                    vectors=embeddings.astype(self._dtype),
+                    ids=ids,
+                    deleted=np.zeros(len(ids), dtype=bool),
+                    meta=columns,
+                )
+            )
+
+    async def query(
+        self, query: str, top_k: int, ids: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        # Execute embedding outside of lock to avoid long lock times
+        embedding = await self.embedding_func([query])
+        embedding = np.asarray(embedding[0], dtype=np.float32)
+        embedding /= np.linalg.norm(embedding) or 1
+
+        candidates = []
+        for segment in await self._get_segments():
+            scores = segment.scores(embedding)
+            scores[segment.deleted] = -np.inf
+            if top_k < len(scores):
+                rows = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                rows = np.arange(len(scores))
+            candidates.extend(
+                (float(scores[row]), segment, int(row))
+                for row in rows
+                if scores[row] >= self.cosine_better_than_threshold
+            )
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        results = []
+        for score, segment, row in candidates[:top_k]:
+            record = segment.row(row)
+            results.append(
+                {
+                    **record,
+                    "id": record["__id__"],
+                    "distance": score,
+                    "created_at": record.get("__created_at__"),
+                }
+            )
+        return results
+
+    @property
+    async def client_storage(self):
+        await self._get_segments()
+        return {"data": [segment.row(row) for segment, row in self._locations.values()]}
+
+    async def delete(self, ids: list[str]):
+        """Delete vectors with specified IDs
+
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+
+        Args:
+            ids: List of vector IDs to be deleted
+        """
+        await self._get_segments()
+        async with self._storage_lock:
+            deleted = self._tombstone(ids)
+        logger.debug(f"Successfully deleted {deleted} vectors from {self.namespace}")
+
+    async def delete_entity(self, entity_name: str) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        entity_id = compute_mdhash_id(entity_name, prefix="ent-")
+        logger.debug(f"Attempting to delete entity {entity_name} with ID {entity_id}")
+        await self.delete([entity_id])
+
+    async def delete_entity_relation(self, entity_name: str) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        ids_to_delete = []
+        for segment in await self._get_segments():
+            columns = segment.columns()
+            src_ids = columns.get("src_id", [])
+            tgt_ids = columns.get("tgt_id", [])
+            for row, (src, tgt) in enumerate(zip(src_ids, tgt_ids)):
+                if not segment.deleted[row] and entity_name in (src, tgt):
+                    ids_to_delete.append(segment.ids[row])
+
+        logger.debug(f"Found {len(ids_to_delete)} relations for entity {entity_name}")
+        if ids_to_delete:
+            await self.delete(ids_to_delete)
+
+    async def index_done_callback(self) -> bool:
+        """Save new segments and tombstones to disk"""
+        async with self._storage_lock:
+            # Check if storage was updated by another process
+            if self.storage_updated.value:
+                logger.warning(
+                    f"Storage for {self.namespace} was updated by another process, reloading..."
+                )
+                self._load()
+                self.storage_updated.value = False
+                return False  # Return error
+
+            if not any(s.name is None or s.deleted_dirty for s in self._segments):
+                return True
+
+            try:
+                self._persist()
+                # Notify other processes that data has been updated
+                await set_all_update_flags(self.namespace)
+                # Reset own update flag to avoid self-reloading
+                self.storage_updated.value = False
+                return True
+            except Exception as e:
+                logger.error(f"Error saving data for {self.namespace}: {e}")
+                return False
+
+    async def search_by_prefix(self, prefix: str) -> list[dict[str, Any]]:
+        """Search for records with IDs starting with a specific prefix.
+
+        Args:
+            prefix: The prefix to search for in record IDs
+
+        Returns:
+            List of records with matching ID prefixes
+        """
+        await self._get_segments()
+        matching_records = []
+        for id, (segment, row) in self._locations.items():
+            if id.startswith(prefix):
+                matching_records.append({**segment.row(row), "id": id})
+
+        logger.debug(f"Found {len(matching_records)} records with prefix '{prefix}'")
+        return matching_records
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        """Get vector data by its ID
+
+        Args:
+            id: The unique identifier of the vector
+
+        Returns:
+            The vector data if found, or None if not found
+        """
+        await self._get_segments()
+        location = self._locations.get(id)
+        if location is None:
+            return None
+        return {**location[0].row(location[1]), "id": id}
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        """Get multiple vector data by their IDs
+
+        Args:
+            ids: List of unique identifiers
+
+        Returns:
+            List of vector data objects that were found
+        """
+        if not ids:
+            return []
+
+        await self._get_segments()
+        return [
+            {**self._locations[id][0].row(self._locations[id][1]), "id": id}
+            for id in ids
+            if id in self._locations
+        ]
+
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, np.ndarray]:
+        await self._get_segments()
+        return {
+            id: np.asarray(self._locations[id][0].vectors[self._locations[id][1]])
+            for id in ids
+            if id in self._locations
+        }
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all vector data from storage and clean up resources
+
+        This method will:
+        1. Remove the segment directory if it exists
+        2. Reset the in-memory state
+        3. Update flags to notify other processes
+        4. Changes is persisted to disk immediately
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+            async with self._storage_lock:
+                self._segments = []
+                self._locations = {}
+                if os.path.exists(self._dir):
+                    shutil.rmtree(self._dir)
+                self._load()
+
+                # Notify other processes that data has been updated
+                await set_all_update_flags(self.namespace)
+                # Reset own update flag to avoid self-reloading
+                self.storage_updated.value = False
+
+                logger.info(f"Process {os.getpid()} drop {self.namespace}")
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
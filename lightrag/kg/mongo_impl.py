@@ -30,7 +30,7 @@ from motor.motor_asyncio import (  # type: ignore
     AsyncIOMotorDatabase,
     AsyncIOMotorCollection,
 )
-from pymongo.operations import SearchIndexModel  # type: ignore
+from pymongo.operations import SearchIndexModel, UpdateOne  # type: ignore
 from pymongo.errors import PyMongoError  # type: ignore
 
 config = configparser.ConfigParser()
@@ -609,6 +609,88 @@ class MongoGraphStorage(BaseGraphStorage):
         edges = result[0].get("edges", [])
         return [(source_node_id, e["target"]) for e in edges]
 
+    #
+    # -------------------------------------------------------------------------
+    # BATCH GETTERS
+    # -------------------------------------------------------------------------
+    #
+
+    async def _edges_of(self, source_node_ids: list[str]) -> dict[str, list[dict]]:
+        """
+        Fetch the outbound edges arrays of several nodes with one find().
+        """
+        cursor = self.collection.find(
+            {"_id": {"$in": list(set(source_node_ids))}}, {"edges": 1}
+        )
+        return {doc["_id"]: doc.get("edges", []) async for doc in cursor}
+
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        """
+        Return the full node documents of several nodes with one find().
+        """
+        cursor = self.collection.find({"_id": {"$in": list(node_ids)}})
+        return {doc["_id"]: doc async for doc in cursor}
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        """
+        Same counts as node_degree, with one find() for outbound edges and
+        one aggregation for inbound edges of all nodes.
+        """
+        outbound = await self._edges_of(node_ids)
+        inbound_pipeline = [
+            {"$match": {"edges.target": {"$in": list(node_ids)}}},
+            {"$unwind": "$edges"},
+            {"$match": {"edges.target": {"$in": list(node_ids)}}},
+            {"$group": {"_id": "$edges.target", "totalInbound": {"$sum": 1}}},
+        ]
+        cursor = self.collection.aggregate(inbound_pipeline)
+        inbound = {doc["_id"]: doc["totalInbound"] async for doc in cursor}
+        return {
+            node_id: len(outbound[node_id]) + inbound.get(node_id, 0)
+            if node_id in outbound
+            else 0
+            for node_id in node_ids
+        }
+
+    async def edge_degrees_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        """
+        Same counts as edge_degree, reading every source node once.
+        """
+        edges = await self._edges_of([src for src, _ in pairs])
+        return {
+            (src, tgt): sum(1 for e in edges.get(src, []) if e.get("target") == tgt)
+            for src, tgt in pairs
+        }
+
+    async def get_edges_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """
+        Same lookup as get_edge, reading every source node once.
+        """
+        edges = await self._edges_of([src for src, _ in pairs])
+        result = {}
+        for src, tgt in pairs:
+            for e in edges.get(src, []):
+                if e.get("target") == tgt:
+                    result[(src, tgt)] = e
+                    break
+        return result
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """
+        Same as get_node_edges for several nodes, with one find().
+        """
+        edges = await self._edges_of(node_ids)
+        return {
+            node_id: [(node_id, e["target"]) for e in edges.get(node_id, [])]
+            for node_id in node_ids
+        }
+
     #
     # -------------------------------------------------------------------------
     # UPSERTS
@@ -646,6 +728,51 @@ class MongoGraphStorage(BaseGraphStorage):
             {"_id": source_node_id}, {"$push": {"edges": new_edge}}
         )
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """
+        Same as upsert_node for several nodes, in one bulk write.
+        """
+        if not nodes:
+            return
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": node_id},
+                    {"$set": {**node_data}, "$setOnInsert": {"edges": []}},
+                    upsert=True,
+                )
+                for node_id, node_data in nodes.items()
+            ]
+        )
+
+    async def upsert_edges_batch(
+        self, edges: dict[tuple[str, str], dict[str, str]]
+    ) -> None:
+        """
+        Same as upsert_edge for several edges, in one ordered bulk write.
+        """
+        if not edges:
+            return
+        operations = []
+        for (source_node_id, target_node_id), edge_data in edges.items():
+            new_edge = {"target": target_node_id}
+            new_edge.update(edge_data)
+            operations += [
+                # Ensure source node exists
+                UpdateOne(
+                    {"_id": source_node_id},
+                    {"$setOnInsert": {"edges": []}},
+                    upsert=True,
+                ),
+                # Replace existing edge (if any)
+                UpdateOne(
+                    {"_id": source_node_id},
+                    {"$pull": {"edges": {"target": target_node_id}}},
+                ),
+                UpdateOne({"_id": source_node_id}, {"$push": {"edges": new_edge}}),
+            ]
+        await self.collection.bulk_write(operations, ordered=True)
+
     #
     # -------------------------------------------------------------------------
     # DELETION
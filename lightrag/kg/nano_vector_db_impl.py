@@ -1,4 +1,5 @@
 import asyncio
+import base64
 import os
 from typing import Any, final
 from dataclasses import dataclass
@@ -16,6 +17,7 @@ if not pm.is_installed("nano-vectordb"):
     pm.install("nano-vectordb")
 
 from nano_vectordb import NanoVectorDB
+from .delta_log import DeltaLog
 from .shared_storage import (
     get_storage_lock,
     get_update_flag,
@@ -45,11 +47,9 @@ class NanoVectorDBStorage(BaseVectorStorage):
             self.global_config["working_dir"], f"vdb_{self.namespace}.json"
         )
         self._max_batch_size = self.global_config["embedding_batch_num"]
-
-        self._client = NanoVectorDB(
-            self.embedding_func.embedding_dim,
-            storage_file=self._client_file_name,
-        )
+        self._delta_log = DeltaLog(self._client_file_name)
+        # Delta log records not yet written to disk
+        self._pending: list[dict[str, Any]] = []
 
     async def initialize(self):
         """Initialize storage data"""
@@ -57,6 +57,61 @@ class NanoVectorDBStorage(BaseVectorStorage):
         self.storage_updated = await get_update_flag(self.namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock(enable_logging=False)
+        async with self._storage_lock:
+            self._load_client()
+
+    def _load_client(self):
+        """Load the snapshot and replay the delta log; call under the storage lock"""
+        self._client = NanoVectorDB(
+            self.embedding_func.embedding_dim,
+            storage_file=self._client_file_name,
+        )
+        self._apply_records(self._delta_log.replay())
+
+    def _apply_records(self, records: list[dict[str, Any]]) -> None:
+        for record in records:
+            if record["op"] == "upsert":
+                self._client.upsert(
+                    datas=[
+                        {
+                            **d,
+                            "__vector__": np.frombuffer(
+                                base64.b64decode(d["__vector__"]), dtype=np.float32
+                            ),
+                        }
+                        for d in record["data"]
+                    ]
+                )
+            else:
+                self._client.delete(record["ids"])
+
+    def _log_upsert(self, list_data: list[dict[str, Any]]) -> None:
+        self._pending.append(
+            {
+                "op": "upsert",
+                "data": [
+                    {
+                        **d,
+                        "__vector__": base64.b64encode(
+                            np.asarray(d["__vector__"], dtype=np.float32).tobytes()
+                        ).decode(),
+                    }
+                    for d in list_data
+                ],
+            }
+        )
+
+    def _sync(self) -> None:
+        """Apply the changes of other processes; call under the storage lock"""
+        records = self._delta_log.read_new()
+        if records is None:
+            # The log was compacted since the last read. The snapshot lacks the
+            # changes of this process that are not written yet, redo them
+            self._load_client()
+            self._apply_records(self._pending)
+        else:
+            self._apply_records(records)
+        self.storage_updated.value = False
 
     async def _get_client(self):
         """Check if the storage should be reloaded"""
@@ -65,15 +120,9 @@ class NanoVectorDBStorage(BaseVectorStorage):
             # Check if data needs to be reloaded
             if self.storage_updated.value:
                 logger.info(
-                    f"Process {os.getpid()} reloading {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
+                    f"Process {os.getpid()} applying changes to {self.namespace} made by another process"
                 )
-                # Reset update flag
-                self.storage_updated.value = False
+                self._sync()
 
             return self._client
 
@@ -113,6 +162,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             for i, d in enumerate(list_data):
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
+            self._log_upsert(list_data)
             results = client.upsert(datas=list_data)
             return results
         else:
@@ -164,6 +214,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
         try:
             client = await self._get_client()
             client.delete(ids)
+            self._pending.append({"op": "delete", "ids": list(ids)})
             logger.debug(
                 f"Successfully deleted {len(ids)} vectors from {self.namespace}"
             )
@@ -188,6 +239,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             client = await self._get_client()
             if client.get([entity_id]):
                 client.delete([entity_id])
+                self._pending.append({"op": "delete", "ids": [entity_id]})
                 logger.debug(f"Successfully deleted entity {entity_name}")
             else:
                 logger.debug(f"Entity {entity_name} not found in storage")
@@ -216,6 +268,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             if ids_to_delete:
                 client = await self._get_client()
                 client.delete(ids_to_delete)
+                self._pending.append({"op": "delete", "ids": ids_to_delete})
                 logger.debug(
                     f"Deleted {len(ids_to_delete)} relations for {entity_name}"
                 )
@@ -225,27 +278,25 @@ class NanoVectorDBStorage(BaseVectorStorage):
             logger.error(f"Error deleting relations for {entity_name}: {e}")
 
     async def index_done_callback(self) -> bool:
-        """Save data to disk"""
+        """Append changes to the delta log, and rewrite the snapshot once the log has outgrown it"""
         async with self._storage_lock:
             # Check if storage was updated by another process
             if self.storage_updated.value:
-                # Storage was updated by another process, reload data instead of saving
+                # Storage was updated by another process, apply its changes before ours
                 logger.warning(
-                    f"Storage for {self.namespace} was updated by another process, reloading..."
-                )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
+                    f"Storage for {self.namespace} was updated by another process, applying its changes..."
                 )
-                # Reset update flag
-                self.storage_updated.value = False
-                return False  # Return error
+                self._sync()
+            if not self._pending:
+                return True
 
-        # Acquire lock and perform persistence
-        async with self._storage_lock:
             try:
-                # Save data to disk
-                self._client.save()
+                self._delta_log.append(self._pending)
+                self._pending = []
+                if self._delta_log.needs_compaction():
+                    # Save data to disk
+                    self._client.save()
+                    self._delta_log.reset()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace)
                 # Reset own update flag to avoid self-reloading
@@ -305,13 +356,26 @@ class NanoVectorDBStorage(BaseVectorStorage):
             return []
 
         client = await self._get_client()
-        return client.get(ids)
+        # NanoVectorDB.get tests each record against the list of ids
+        wanted = set(ids)
+        storage = getattr(client, "_NanoVectorDB__storage")
+        return [dp for dp in storage["data"] if dp["__id__"] in wanted]
+
+    async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, np.ndarray]:
+        wanted = set(ids)
+        client = await self._get_client()
+        storage = getattr(client, "_NanoVectorDB__storage")
+        return {
+            dp["__id__"]: storage["matrix"][i]
+            for i, dp in enumerate(storage["data"])
+            if dp["__id__"] in wanted
+        }
 
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
 
         This method will:
-        1. Remove the vector database storage file if it exists
+        1. Remove the vector database storage file and its delta log if they exist
         2. Reinitialize the vector database client
         3. Update flags to notify other processes
         4. Changes is persisted to disk immediately
@@ -328,6 +392,8 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 # delete _client_file_name
                 if os.path.exists(self._client_file_name):
                     os.remove(self._client_file_name)
+                self._delta_log.remove()
+                self._pending = []
 
                 self._client = NanoVectorDB(
                     self.embedding_func.embedding_dim,
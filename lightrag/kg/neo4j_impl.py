@@ -523,6 +523,174 @@ class Neo4JStorage(BaseGraphStorage):
             logger.error(f"Error in get_node_edges for {source_node_id}: {str(e)}")
             raise
 
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        """Get several nodes with one UNWIND query
+
+        Args:
+            node_ids: Labels of the nodes to look up
+
+        Returns:
+            dict: Node properties keyed by node label; missing nodes are omitted
+        """
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ"
+        ) as session:
+            query = """
+                UNWIND $node_ids AS id
+                MATCH (n:base {entity_id: id})
+                RETURN id AS entity_id, n
+            """
+            result = await session.run(query, node_ids=list(node_ids))
+            try:
+                nodes = {}
+                async for record in result:
+                    entity_id = record["entity_id"]
+                    if entity_id in nodes:
+                        logger.warning(
+                            f"Multiple nodes found with label '{entity_id}'. Using first node."
+                        )
+                        continue
+                    node_dict = dict(record["n"])
+                    # Remove base label from labels list if it exists
+                    if "labels" in node_dict:
+                        node_dict["labels"] = [
+                            label for label in node_dict["labels"] if label != "base"
+                        ]
+                    nodes[entity_id] = node_dict
+                return nodes
+            except Exception as e:
+                logger.error(f"Error getting nodes in batch: {str(e)}")
+                raise
+            finally:
+                await result.consume()  # Ensure result is fully consumed
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        """Get the degrees of several nodes with one UNWIND query
+
+        Args:
+            node_ids: Labels of the nodes
+
+        Returns:
+            dict: Degree keyed by node label, 0 for missing nodes
+        """
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ"
+        ) as session:
+            query = """
+                UNWIND $node_ids AS id
+                MATCH (n:base {entity_id: id})
+                OPTIONAL MATCH (n)-[r]-()
+                RETURN id AS entity_id, COUNT(r) AS degree
+            """
+            result = await session.run(query, node_ids=list(node_ids))
+            try:
+                degrees = {node_id: 0 for node_id in node_ids}
+                async for record in result:
+                    degrees[record["entity_id"]] = record["degree"]
+                return degrees
+            except Exception as e:
+                logger.error(f"Error getting node degrees in batch: {str(e)}")
+                raise
+            finally:
+                await result.consume()  # Ensure result is fully consumed
+
+    async def edge_degrees_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        """Get the total degrees of several node pairs with one degree query
+
+        Args:
+            pairs: (source label, target label) tuples
+
+        Returns:
+            dict: Sum of both node degrees keyed by (source, target)
+        """
+        node_ids = list({node_id for pair in pairs for node_id in pair})
+        degrees = await self.node_degrees_batch(node_ids)
+        return {(src, tgt): degrees[src] + degrees[tgt] for src, tgt in pairs}
+
+    async def get_edges_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Get the properties of several edges with one UNWIND query
+
+        Args:
+            pairs: (source label, target label) tuples
+
+        Returns:
+            dict: Edge properties keyed by (source, target); missing edges are omitted
+        """
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ"
+        ) as session:
+            query = """
+                UNWIND $pairs AS pair
+                MATCH (start:base {entity_id: pair.src})-[r]-(end:base {entity_id: pair.tgt})
+                RETURN pair.src AS src, pair.tgt AS tgt, properties(r) AS edge_properties
+            """
+            result = await session.run(
+                query, pairs=[{"src": src, "tgt": tgt} for src, tgt in pairs]
+            )
+            try:
+                edges = {}
+                async for record in result:
+                    pair = (record["src"], record["tgt"])
+                    if pair in edges:
+                        continue
+                    edge_result = dict(record["edge_properties"])
+                    # Ensure required keys exist with defaults
+                    for key, default_value in {
+                        "weight": 0.0,
+                        "source_id": None,
+                        "description": None,
+                        "keywords": None,
+                    }.items():
+                        edge_result.setdefault(key, default_value)
+                    edges[pair] = edge_result
+                return edges
+            except Exception as e:
+                logger.error(f"Error getting edges in batch: {str(e)}")
+                raise
+            finally:
+                await result.consume()  # Ensure result is fully consumed
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """Get the edges of several nodes with one UNWIND query
+
+        Args:
+            node_ids: Labels of the nodes
+
+        Returns:
+            dict: (source label, target label) tuples keyed by node label
+        """
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ"
+        ) as session:
+            query = """
+                UNWIND $node_ids AS id
+                MATCH (n:base {entity_id: id})
+                OPTIONAL MATCH (n)-[r]-(connected:base)
+                WHERE connected.entity_id IS NOT NULL
+                RETURN id AS entity_id, collect(connected.entity_id) AS connected_ids
+            """
+            result = await session.run(query, node_ids=list(node_ids))
+            try:
+                edges = {node_id: [] for node_id in node_ids}
+                async for record in result:
+                    entity_id = record["entity_id"]
+                    edges[entity_id] = [
+                        (entity_id, connected_id)
+                        for connected_id in record["connected_ids"]
+                    ]
+                return edges
+            except Exception as e:
+                logger.error(f"Error getting node edges in batch: {str(e)}")
+                raise
+            finally:
+                await result.consume()  # Ensure result is fully consumed
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -635,6 +803,106 @@ class Neo4JStorage(BaseGraphStorage):
             logger.error(f"Error during edge upsert: {str(e)}")
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+                neo4jExceptions.ClientError,
+            )
+        ),
+    )
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """
+        Upsert several nodes in one transaction, one UNWIND query per entity type.
+
+        Args:
+            nodes: Node properties keyed by node label
+        """
+        # Labels cannot be parameters, so nodes are grouped by their entity type
+        by_type: dict[str, list[dict]] = {}
+        for node_id, properties in nodes.items():
+            if "entity_id" not in properties:
+                raise ValueError(
+                    "Neo4j: node properties must contain an 'entity_id' field"
+                )
+            by_type.setdefault(properties.get("entity_type", "UNKNOWN"), []).append(
+                {"entity_id": node_id, "properties": properties}
+            )
+
+        try:
+            async with self._driver.session(database=self._DATABASE) as session:
+
+                async def execute_upsert(tx: AsyncManagedTransaction):
+                    for entity_type, rows in by_type.items():
+                        query = (
+                            """
+                        UNWIND $rows AS row
+                        MERGE (n:base {entity_id: row.entity_id})
+                        SET n += row.properties
+                        SET n:`%s`
+                        """
+                            % entity_type
+                        )
+                        result = await tx.run(query, rows=rows)
+                        await result.consume()  # Ensure result is fully consumed
+                    logger.debug(f"Upserted {len(nodes)} nodes in batch")
+
+                await session.execute_write(execute_upsert)
+        except Exception as e:
+            logger.error(f"Error during batch upsert: {str(e)}")
+            raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+                neo4jExceptions.ClientError,
+            )
+        ),
+    )
+    async def upsert_edges_batch(
+        self, edges: dict[tuple[str, str], dict[str, str]]
+    ) -> None:
+        """
+        Upsert several edges in one UNWIND query. Edges whose source or target
+        node does not exist are skipped, as in upsert_edge.
+
+        Args:
+            edges: Edge properties keyed by (source label, target label)
+        """
+        rows = [
+            {"src": src, "tgt": tgt, "properties": properties}
+            for (src, tgt), properties in edges.items()
+        ]
+        try:
+            async with self._driver.session(database=self._DATABASE) as session:
+
+                async def execute_upsert(tx: AsyncManagedTransaction):
+                    query = """
+                    UNWIND $rows AS row
+                    MATCH (source:base {entity_id: row.src})
+                    WITH source, row
+                    MATCH (target:base {entity_id: row.tgt})
+                    MERGE (source)-[r:DIRECTED]-(target)
+                    SET r += row.properties
+                    """
+                    result = await tx.run(query, rows=rows)
+                    await result.consume()  # Ensure result is consumed
+                    logger.debug(f"Upserted {len(rows)} edges in batch")
+
+                await session.execute_write(execute_upsert)
+        except Exception as e:
+            logger.error(f"Error during batch edge upsert: {str(e)}")
+            raise
+
     async def _node2vec_embed(self):
         print("Implemented but never called.")
 
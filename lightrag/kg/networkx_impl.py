@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import Any, final
+from typing import Any, AsyncIterator, final
 import numpy as np
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -15,8 +15,13 @@ if not pm.is_installed("networkx"):
 if not pm.is_installed("graspologic"):
     pm.install("graspologic")
 
+if not pm.is_installed("msgpack"):
+    pm.install("msgpack")
+
+import msgpack
 import networkx as nx
 from graspologic import embed
+from .delta_log import DeltaLog
 from .shared_storage import (
     get_storage_lock,
     get_update_flag,
@@ -25,22 +30,117 @@ from .shared_storage import (
 
 MAX_GRAPH_NODES = int(os.getenv("MAX_GRAPH_NODES", 1000))
 
+GRAPH_FORMAT_VERSION = 1
+
+
+class _StringTable:
+    """Interns strings, so node ids and repeated attribute values are stored once"""
+
+    def __init__(self):
+        self.strings: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def _encode_columns(records: list[dict], intern: _StringTable) -> dict[str, list]:
+    """Attribute dicts as one column per key; all-string columns are interned"""
+    keys = sorted({key for record in records for key in record})
+    columns = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        if all(isinstance(v, str) or v is None for v in values):
+            columns[key] = [
+                "s",
+                [intern(v) if v is not None else None for v in values],
+            ]
+        else:
+            columns[key] = ["v", values]
+    return columns
+
+
+def _decode_columns(columns: dict, strings: list[str], count: int) -> list[dict]:
+    records = [{} for _ in range(count)]
+    for key, (kind, values) in columns.items():
+        for record, value in zip(records, values):
+            if value is not None:
+                record[key] = strings[value] if kind == "s" else value
+    return records
+
+
+def _encode_graph(graph: nx.Graph) -> bytes:
+    intern = _StringTable()
+    nodes = list(graph.nodes(data=True))
+    edges = list(graph.edges(data=True))
+    payload = {
+        "version": GRAPH_FORMAT_VERSION,
+        "directed": graph.is_directed(),
+        "nodes": [intern(str(node)) for node, _ in nodes],
+        "node_columns": _encode_columns([data for _, data in nodes], intern),
+        "sources": [intern(str(src)) for src, _, _ in edges],
+        "targets": [intern(str(tgt)) for _, tgt, _ in edges],
+        "edge_columns": _encode_columns([data for _, _, data in edges], intern),
+        # Written last: every string above has been interned by now
+        "strings": intern.strings,
+    }
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _decode_graph(data: bytes) -> nx.Graph:
+    payload = msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if payload["version"] > GRAPH_FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph file version {payload['version']}")
+    strings = payload["strings"]
+    graph = nx.DiGraph() if payload["directed"] else nx.Graph()
+    nodes = [strings[i] for i in payload["nodes"]]
+    graph.add_nodes_from(
+        zip(nodes, _decode_columns(payload["node_columns"], strings, len(nodes)))
+    )
+    sources = payload["sources"]
+    graph.add_edges_from(
+        (strings[src], strings[tgt], data)
+        for src, tgt, data in zip(
+            sources,
+            payload["targets"],
+            _decode_columns(payload["edge_columns"], strings, len(sources)),
+        )
+    )
+    return graph
+
 
 @final
 @dataclass
 class NetworkXStorage(BaseGraphStorage):
     @staticmethod
     def load_nx_graph(file_name) -> nx.Graph:
-        if os.path.exists(file_name):
+        """Read a graph from a .graphml file, or from the binary msgpack format"""
+        if not os.path.exists(file_name):
+            return None
+        if file_name.endswith(".graphml"):
             return nx.read_graphml(file_name)
-        return None
+        with open(file_name, "rb") as f:
+            return _decode_graph(f.read())
 
     @staticmethod
     def write_nx_graph(graph: nx.Graph, file_name):
+        """Write a graph as .graphml, or in the binary msgpack format.
+        The file is replaced atomically, so readers never see a partial graph.
+        """
         logger.info(
             f"Writing graph with {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges"
         )
-        nx.write_graphml(graph, file_name)
+        tmp_file_name = f"{file_name}.tmp"
+        if file_name.endswith(".graphml"):
+            nx.write_graphml(graph, tmp_file_name)
+        else:
+            with open(tmp_file_name, "wb") as f:
+                f.write(_encode_graph(graph))
+        os.replace(tmp_file_name, file_name)
 
     # TODO：deprecated, remove later
     @staticmethod
@@ -77,22 +177,19 @@ class NetworkXStorage(BaseGraphStorage):
         return fixed_graph
 
     def __post_init__(self):
+        self._graph_file = os.path.join(
+            self.global_config["working_dir"], f"graph_{self.namespace}.msgpack"
+        )
+        # Only read to migrate graphs saved before the binary format; see export_graphml
         self._graphml_xml_file = os.path.join(
             self.global_config["working_dir"], f"graph_{self.namespace}.graphml"
         )
+        self._delta_log = DeltaLog(self._graph_file)
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
-
-        # Load initial graph
-        preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
-        if preloaded_graph is not None:
-            logger.info(
-                f"Loaded graph from {self._graphml_xml_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
-            )
-        else:
-            logger.info("Created new empty graph")
-        self._graph = preloaded_graph or nx.Graph()
+        # Delta log records not yet written to disk
+        self._pending: list[dict[str, Any]] = []
 
         self._node_embed_algorithms = {
             "node2vec": self._node2vec_embed,
@@ -104,6 +201,65 @@ class NetworkXStorage(BaseGraphStorage):
         self.storage_updated = await get_update_flag(self.namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock()
+        async with self._storage_lock:
+            self._load_graph()
+
+    def _load_graph(self):
+        """Load the snapshot and replay the delta log; call under the storage lock"""
+        graph_file = self._graph_file
+        if not os.path.exists(graph_file) and os.path.exists(self._graphml_xml_file):
+            graph_file = self._graphml_xml_file
+        preloaded_graph = NetworkXStorage.load_nx_graph(graph_file)
+        if preloaded_graph is not None:
+            logger.info(
+                f"Loaded graph from {graph_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
+            )
+        else:
+            logger.info("Created new empty graph")
+        self._graph = preloaded_graph or nx.Graph()
+        self._apply_records(self._delta_log.replay())
+
+    def _apply_records(self, records: list[dict[str, Any]]) -> None:
+        graph = self._graph
+        for record in records:
+            op = record["op"]
+            if op == "node":
+                graph.add_node(record["id"], **record["data"])
+            elif op == "edge":
+                graph.add_edge(record["src"], record["tgt"], **record["data"])
+            elif op == "del_node":
+                if graph.has_node(record["id"]):
+                    graph.remove_node(record["id"])
+            elif graph.has_edge(record["src"], record["tgt"]):
+                graph.remove_edge(record["src"], record["tgt"])
+
+    def _log_nodes(self, node_ids) -> None:
+        # The attribute dicts are serialized when the log is written, so each
+        # record holds the latest state of its node
+        nodes = self._graph.nodes
+        self._pending.extend(
+            {"op": "node", "id": node_id, "data": nodes[node_id]}
+            for node_id in node_ids
+        )
+
+    def _log_edges(self, pairs) -> None:
+        edges = self._graph.edges
+        self._pending.extend(
+            {"op": "edge", "src": src, "tgt": tgt, "data": edges[src, tgt]}
+            for src, tgt in pairs
+        )
+
+    def _sync(self) -> None:
+        """Apply the changes of other processes; call under the storage lock"""
+        records = self._delta_log.read_new()
+        if records is None:
+            # The log was compacted since the last read. The snapshot lacks the
+            # changes of this process that are not written yet, redo them
+            self._load_graph()
+            self._apply_records(self._pending)
+        else:
+            self._apply_records(records)
+        self.storage_updated.value = False
 
     async def _get_graph(self):
         """Check if the storage should be reloaded"""
@@ -112,14 +268,9 @@ class NetworkXStorage(BaseGraphStorage):
             # Check if data needs to be reloaded
             if self.storage_updated.value:
                 logger.info(
-                    f"Process {os.getpid()} reloading graph {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
+                    f"Process {os.getpid()} applying changes to graph {self.namespace} made by another process"
                 )
-                # Reset update flag
-                self.storage_updated.value = False
+                self._sync()
 
             return self._graph
 
@@ -155,6 +306,45 @@ class NetworkXStorage(BaseGraphStorage):
             return list(graph.edges(source_node_id))
         return None
 
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        graph = await self._get_graph()
+        nodes = graph.nodes
+        return {n: nodes[n] for n in node_ids if n in nodes}
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        graph = await self._get_graph()
+        return {n: graph.degree(n) if n in graph else 0 for n in node_ids}
+
+    async def get_edges_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        graph = await self._get_graph()
+        edges = graph.edges
+        return {pair: edges[pair] for pair in pairs if graph.has_edge(*pair)}
+
+    async def edge_degrees_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        graph = await self._get_graph()
+        degree = {
+            n: graph.degree(n) if n in graph else 0 for pair in pairs for n in pair
+        }
+        return {(src, tgt): degree[src] + degree[tgt] for src, tgt in pairs}
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        graph = await self._get_graph()
+        return {n: list(graph.edges(n)) if n in graph else [] for n in node_ids}
+
+    async def iter_edges(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[tuple[str, str, dict]]:
+        graph = await self._get_graph()
+        # Take the edge list up front, the graph may change while the caller awaits
+        for src, tgt, edge_data in list(graph.edges(data=True)):
+            yield src, tgt, edge_data
+
     async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
         """
         Importance notes:
@@ -164,6 +354,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_node(node_id, **node_data)
+        self._log_nodes([node_id])
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -176,6 +367,31 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._log_edges([(source_node_id, target_node_id)])
+
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        graph = await self._get_graph()
+        graph.add_nodes_from(nodes.items())
+        self._log_nodes(nodes)
+
+    async def upsert_edges_batch(
+        self, edges: dict[tuple[str, str], dict[str, str]]
+    ) -> None:
+        """
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback,
+           KG-storage-log should be used to avoid data corruption
+        """
+        graph = await self._get_graph()
+        graph.add_edges_from((src, tgt, data) for (src, tgt), data in edges.items())
+        self._log_edges(edges)
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -187,6 +403,7 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         if graph.has_node(node_id):
             graph.remove_node(node_id)
+            self._pending.append({"op": "del_node", "id": node_id})
             logger.debug(f"Node {node_id} deleted from the graph.")
         else:
             logger.warning(f"Node {node_id} not found in the graph for deletion.")
@@ -224,6 +441,7 @@ class NetworkXStorage(BaseGraphStorage):
         for node in nodes:
             if graph.has_node(node):
                 graph.remove_node(node)
+                self._pending.append({"op": "del_node", "id": node})
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -240,6 +458,7 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                self._pending.append({"op": "del_edge", "src": source, "tgt": target})
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -387,26 +606,25 @@ class NetworkXStorage(BaseGraphStorage):
         return result
 
     async def index_done_callback(self) -> bool:
-        """Save data to disk"""
+        """Append changes to the delta log, and rewrite the snapshot once the log has outgrown it"""
         async with self._storage_lock:
             # Check if storage was updated by another process
             if self.storage_updated.value:
-                # Storage was updated by another process, reload data instead of saving
+                # Storage was updated by another process, apply its changes before ours
                 logger.info(
-                    f"Graph for {self.namespace} was updated by another process, reloading..."
+                    f"Graph for {self.namespace} was updated by another process, applying its changes..."
                 )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
-                # Reset update flag
-                self.storage_updated.value = False
-                return False  # Return error
+                self._sync()
+            if not self._pending:
+                return True
 
-        # Acquire lock and perform persistence
-        async with self._storage_lock:
             try:
-                # Save data to disk
-                NetworkXStorage.write_nx_graph(self._graph, self._graphml_xml_file)
+                self._delta_log.append(self._pending)
+                self._pending = []
+                if self._delta_log.needs_compaction():
+                    # Save data to disk
+                    NetworkXStorage.write_nx_graph(self._graph, self._graph_file)
+                    self._delta_log.reset()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace)
                 # Reset own update flag to avoid self-reloading
@@ -418,11 +636,25 @@ class NetworkXStorage(BaseGraphStorage):
 
         return True
 
+    async def export_graphml(self, file_name: str | None = None) -> str:
+        """Write the graph as GraphML, e.g. for Gephi or the graph visualizer
+
+        Args:
+            file_name: Target file, graph_<namespace>.graphml in the working directory by default
+
+        Returns:
+            The path of the written file
+        """
+        file_name = file_name or self._graphml_xml_file
+        graph = await self._get_graph()
+        NetworkXStorage.write_nx_graph(graph, file_name)
+        return file_name
+
     async def drop(self) -> dict[str, str]:
         """Drop all graph data from storage and clean up resources
 
         This method will:
-        1. Remove the graph storage file if it exists
+        1. Remove the graph storage file and its delta log if they exist
         2. Reset the graph to an empty state
         3. Update flags to notify other processes
         4. Changes is persisted to disk immediately
@@ -435,15 +667,18 @@ class NetworkXStorage(BaseGraphStorage):
         try:
             async with self._storage_lock:
                 # delete _client_file_name
-                if os.path.exists(self._graphml_xml_file):
-                    os.remove(self._graphml_xml_file)
+                for file_name in (self._graph_file, self._graphml_xml_file):
+                    if os.path.exists(file_name):
+                        os.remove(file_name)
+                self._delta_log.remove()
+                self._pending = []
                 self._graph = nx.Graph()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace)
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
                 logger.info(
-                    f"Process {os.getpid()} drop graph {self.namespace} (file:{self._graphml_xml_file})"
+                    f"Process {os.getpid()} drop graph {self.namespace} (file:{self._graph_file})"
                 )
             return {"status": "success", "message": "data dropped"}
         except Exception as e:
@@ -295,6 +295,10 @@ class PGKVStorage(BaseKVStorage):
             return res if res else None
         else:
             response = await self.db.query(sql, params)
+            if response and is_namespace(
+                self.namespace, NameSpace.KV_STORE_DOC_CHUNK_INDEX
+            ):
+                response["chunks"] = json.loads(response["chunks"])
             return response if response else None
 
     async def get_by_mode_and_id(self, mode: str, id: str) -> Union[dict, None]:
@@ -329,6 +333,11 @@ class PGKVStorage(BaseKVStorage):
             for row in array_res:
                 dict_res[row["mode"]][row["id"]] = row
             return [{k: v} for k, v in dict_res.items()]
+        elif is_namespace(self.namespace, NameSpace.KV_STORE_DOC_CHUNK_INDEX):
+            array_res = await self.db.query(sql, params, multirows=True)
+            for row in array_res:
+                row["chunks"] = json.loads(row["chunks"])
+            return array_res
         else:
             return await self.db.query(sql, params, multirows=True)
 
@@ -389,6 +398,15 @@ class PGKVStorage(BaseKVStorage):
                     }
 
                     await self.db.execute(upsert_sql, _data)
+        elif is_namespace(self.namespace, NameSpace.KV_STORE_DOC_CHUNK_INDEX):
+            for k, v in data.items():
+                upsert_sql = SQL_TEMPLATES["upsert_doc_chunk_index"]
+                _data = {
+                    "workspace": self.db.workspace,
+                    "id": k,
+                    "chunks": json.dumps(v["chunks"]),
+                }
+                await self.db.execute(upsert_sql, _data)
 
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
@@ -1315,19 +1333,117 @@ class PGGraphStorage(BaseGraphStorage):
 
         return edges
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((PGGraphQueryException,)),
-    )
-    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
-        """
-        Upsert a node in the Neo4j database.
+    @staticmethod
+    def _label_list(node_ids: list[str]) -> str:
+        """Format node labels as a cypher list literal"""
+        return ", ".join(json.dumps(node_id.strip('"')) for node_id in node_ids)
+
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        """Get several nodes with one query, keyed by node label"""
+        if not node_ids:
+            return {}
+        query = """SELECT * FROM cypher('%s', $$
+                     MATCH (n:base)
+                     WHERE n.entity_id IN [%s]
+                     RETURN n
+                   $$) AS (n agtype)""" % (self.graph_name, self._label_list(node_ids))
+        nodes = {}
+        for record in await self._query(query):
+            properties = record["n"]["properties"]
+            nodes.setdefault(properties["entity_id"], properties)
+        return nodes
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        """Get the degrees of several nodes with one query, 0 for missing nodes"""
+        degrees = {node_id: 0 for node_id in node_ids}
+        if not node_ids:
+            return degrees
+        query = """SELECT * FROM cypher('%s', $$
+                     MATCH (n:base)
+                     WHERE n.entity_id IN [%s]
+                     OPTIONAL MATCH (n)-[]-(x)
+                     RETURN n, count(x) AS total_edge_count
+                   $$) AS (n agtype, total_edge_count integer)""" % (
+            self.graph_name,
+            self._label_list(node_ids),
+        )
+        for record in await self._query(query):
+            entity_id = record["n"]["properties"]["entity_id"]
+            degrees[entity_id] = int(record["total_edge_count"])
+        return degrees
 
-        Args:
-            node_id: The unique identifier for the node (used as label)
-            node_data: Dictionary of node properties
+    async def edge_degrees_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        """Get the total degrees of several node pairs with one degree query"""
+        node_ids = list({node_id for pair in pairs for node_id in pair})
+        degrees = await self.node_degrees_batch(node_ids)
+        return {(src, tgt): degrees[src] + degrees[tgt] for src, tgt in pairs}
+
+    async def get_edges_batch(
+        self, pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], dict]:
+        """Get the properties of several edges with one query
+
+        The query matches every source/target combination of the requested
+        labels; only the requested pairs are kept.
         """
+        if not pairs:
+            return {}
+        query = """SELECT * FROM cypher('%s', $$
+                     MATCH (a:base)-[r]->(b:base)
+                     WHERE a.entity_id IN [%s] AND b.entity_id IN [%s]
+                     RETURN a, b, properties(r) as edge_properties
+                   $$) AS (a agtype, b agtype, edge_properties agtype)""" % (
+            self.graph_name,
+            self._label_list(list({src for src, _ in pairs})),
+            self._label_list(list({tgt for _, tgt in pairs})),
+        )
+        wanted = set(pairs)
+        edges = {}
+        for record in await self._query(query):
+            pair = (
+                record["a"]["properties"]["entity_id"],
+                record["b"]["properties"]["entity_id"],
+            )
+            if pair in wanted and record["edge_properties"]:
+                edges.setdefault(pair, record["edge_properties"])
+        return edges
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """Get the edges of several nodes with one query, keyed by node label"""
+        edges = {node_id: [] for node_id in node_ids}
+        if not node_ids:
+            return edges
+        query = """SELECT * FROM cypher('%s', $$
+                      MATCH (n:base)
+                      WHERE n.entity_id IN [%s]
+                      OPTIONAL MATCH (n)-[]-(connected:base)
+                      RETURN n, connected
+                    $$) AS (n agtype, connected agtype)""" % (
+            self.graph_name,
+            self._label_list(node_ids),
+        )
+        for record in await self._query(query):
+            source_node = record["n"]
+            connected_node = record["connected"]
+            if (
+                source_node
+                and connected_node
+                and "properties" in source_node
+                and "properties" in connected_node
+            ):
+                source_label = source_node["properties"].get("entity_id")
+                target_label = connected_node["properties"].get("entity_id")
+                if source_label and target_label:
+                    edges.setdefault(source_label, []).append(
+                        (source_label, target_label)
+                    )
+        return edges
+
+    def _upsert_node_query(self, node_id: str, node_data: dict[str, str]) -> str:
         if "entity_id" not in node_data:
             raise ValueError(
                 "PostgreSQL: node properties must contain an 'entity_id' field"
@@ -1336,7 +1452,7 @@ class PGGraphStorage(BaseGraphStorage):
         label = node_id.strip('"')
         properties = self._format_properties(node_data)
 
-        query = """SELECT * FROM cypher('%s', $$
+        return """SELECT * FROM cypher('%s', $$
                      MERGE (n:base {entity_id: "%s"})
                      SET n += %s
                      RETURN n
@@ -1346,6 +1462,42 @@ class PGGraphStorage(BaseGraphStorage):
             properties,
         )
 
+    def _upsert_edge_query(
+        self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
+    ) -> str:
+        src_label = source_node_id.strip('"')
+        tgt_label = target_node_id.strip('"')
+        edge_properties = self._format_properties(edge_data)
+
+        return """SELECT * FROM cypher('%s', $$
+                     MATCH (source:base {entity_id: "%s"})
+                     WITH source
+                     MATCH (target:base {entity_id: "%s"})
+                     MERGE (source)-[r:DIRECTED]->(target)
+                     SET r += %s
+                     RETURN r
+                   $$) AS (r agtype)""" % (
+            self.graph_name,
+            src_label,
+            tgt_label,
+            edge_properties,
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
+        """
+        Upsert a node in the Neo4j database.
+
+        Args:
+            node_id: The unique identifier for the node (used as label)
+            node_data: Dictionary of node properties
+        """
+        query = self._upsert_node_query(node_id, node_data)
+
         try:
             await self._query(query, readonly=False, upsert=True)
 
@@ -1369,23 +1521,7 @@ class PGGraphStorage(BaseGraphStorage):
             target_node_id (str): Label of the target node (used as identifier)
             edge_data (dict): dictionary of properties to set on the edge
         """
-        src_label = source_node_id.strip('"')
-        tgt_label = target_node_id.strip('"')
-        edge_properties = self._format_properties(edge_data)
-
-        query = """SELECT * FROM cypher('%s', $$
-                     MATCH (source:base {entity_id: "%s"})
-                     WITH source
-                     MATCH (target:base {entity_id: "%s"})
-                     MERGE (source)-[r:DIRECTED]->(target)
-                     SET r += %s
-                     RETURN r
-                   $$) AS (r agtype)""" % (
-            self.graph_name,
-            src_label,
-            tgt_label,
-            edge_properties,
-        )
+        query = self._upsert_edge_query(source_node_id, target_node_id, edge_data)
 
         try:
             await self._query(query, readonly=False, upsert=True)
@@ -1396,6 +1532,63 @@ class PGGraphStorage(BaseGraphStorage):
             )
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """
+        Upsert several nodes in one round trip.
+
+        The per-node cypher statements are sent as one multi-statement query,
+        which PostgreSQL runs in a single implicit transaction.
+
+        Args:
+            nodes: Node properties keyed by node label
+        """
+        if not nodes:
+            return
+        query = ";\n".join(
+            self._upsert_node_query(node_id, node_data)
+            for node_id, node_data in nodes.items()
+        )
+
+        try:
+            await self._query(query, readonly=False, upsert=True)
+
+        except Exception:
+            logger.error(f"POSTGRES, upsert_nodes_batch error on {len(nodes)} nodes")
+            raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_edges_batch(
+        self, edges: dict[tuple[str, str], dict[str, str]]
+    ) -> None:
+        """
+        Upsert several edges in one round trip, like upsert_nodes_batch.
+
+        Args:
+            edges: Edge properties keyed by (source label, target label)
+        """
+        if not edges:
+            return
+        query = ";\n".join(
+            self._upsert_edge_query(src, tgt, edge_data)
+            for (src, tgt), edge_data in edges.items()
+        )
+
+        try:
+            await self._query(query, readonly=False, upsert=True)
+
+        except Exception:
+            logger.error(f"POSTGRES, upsert_edges_batch error on {len(edges)} edges")
+            raise
+
     async def _node2vec_embed(self):
         print("Implemented but never called.")
 
@@ -1643,6 +1836,7 @@ NAMESPACE_TABLE_MAP = {
     NameSpace.VECTOR_STORE_RELATIONSHIPS: "LIGHTRAG_VDB_RELATION",
     NameSpace.DOC_STATUS: "LIGHTRAG_DOC_STATUS",
     NameSpace.KV_STORE_LLM_RESPONSE_CACHE: "LIGHTRAG_LLM_CACHE",
+    NameSpace.KV_STORE_DOC_CHUNK_INDEX: "LIGHTRAG_DOC_CHUNK_INDEX",
 }
 
 
@@ -1721,6 +1915,16 @@ TABLES = {
 	                CONSTRAINT LIGHTRAG_LLM_CACHE_PK PRIMARY KEY (workspace, mode, id)
                     )"""
     },
+    "LIGHTRAG_DOC_CHUNK_INDEX": {
+        "ddl": """CREATE TABLE LIGHTRAG_DOC_CHUNK_INDEX (
+                    id VARCHAR(255),
+                    workspace VARCHAR(255),
+                    chunks JSONB,
+                    create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    update_time TIMESTAMP,
+	                CONSTRAINT LIGHTRAG_DOC_CHUNK_INDEX_PK PRIMARY KEY (workspace, id)
+                    )"""
+    },
     "LIGHTRAG_DOC_STATUS": {
         "ddl": """CREATE TABLE LIGHTRAG_DOC_STATUS (
 	               workspace varchar(255) NOT NULL,
@@ -1764,12 +1968,23 @@ SQL_TEMPLATES = {
     "get_by_ids_llm_response_cache": """SELECT id, original_prompt, COALESCE(return_value, '') as "return", mode
                                  FROM LIGHTRAG_LLM_CACHE WHERE workspace=$1 AND mode= IN ({ids})
                                 """,
+    "get_by_id_doc_chunk_index": """SELECT id, chunks::text as chunks
+                                FROM LIGHTRAG_DOC_CHUNK_INDEX WHERE workspace=$1 AND id=$2
+                            """,
+    "get_by_ids_doc_chunk_index": """SELECT id, chunks::text as chunks
+                                 FROM LIGHTRAG_DOC_CHUNK_INDEX WHERE workspace=$1 AND id IN ({ids})
+                            """,
     "filter_keys": "SELECT id FROM {table_name} WHERE workspace=$1 AND id IN ({ids})",
     "upsert_doc_full": """INSERT INTO LIGHTRAG_DOC_FULL (id, content, workspace)
                         VALUES ($1, $2, $3)
                         ON CONFLICT (workspace,id) DO UPDATE
                            SET content = $2, update_time = CURRENT_TIMESTAMP
                        """,
+    "upsert_doc_chunk_index": """INSERT INTO LIGHTRAG_DOC_CHUNK_INDEX (workspace, id, chunks)
+                        VALUES ($1, $2, $3::jsonb)
+                        ON CONFLICT (workspace,id) DO UPDATE
+                           SET chunks = EXCLUDED.chunks, update_time = CURRENT_TIMESTAMP
+                       """,
     "upsert_llm_response_cache": """INSERT INTO LIGHTRAG_LLM_CACHE(workspace,id,original_prompt,return_value,mode)
                                       VALUES ($1, $2, $3, $4, $5)
                                       ON CONFLICT (workspace,mode,id) DO UPDATE
@@ -44,6 +44,9 @@ _data_init_lock: Optional[LockType] = None
 # async locks for coroutine synchronization in multiprocess mode
 _async_locks: Optional[Dict[str, asyncio.Lock]] = None
 
+# per-key graph locks in single-process mode: key -> [lock, holders and waiters]
+_graph_db_key_locks: Dict[str, list] = {}
+
 
 class UnifiedLock(Generic[T]):
     """Provide a unified lock interface type for asyncio.Lock and multiprocessing.Lock"""
@@ -264,6 +267,64 @@ def get_graph_db_lock(enable_logging: bool = False) -> UnifiedLock:
     )
 
 
+class _GraphDBKeyLock:
+    """Async context manager holding the per-key graph locks of several keys.
+
+    Locks are always taken in sorted key order so overlapping key sets cannot
+    deadlock, and a key's lock is dropped once nobody holds or waits for it.
+    """
+
+    def __init__(self, keys: list[str]):
+        self._keys = sorted(set(keys))
+        self._held: list[str] = []
+
+    async def __aenter__(self) -> "_GraphDBKeyLock":
+        try:
+            for key in self._keys:
+                entry = _graph_db_key_locks.setdefault(key, [asyncio.Lock(), 0])
+                entry[1] += 1
+                try:
+                    await entry[0].acquire()
+                except BaseException:
+                    self._unref(key)
+                    raise
+                self._held.append(key)
+        except BaseException:
+            self._release_held()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._release_held()
+
+    def _release_held(self) -> None:
+        for key in reversed(self._held):
+            _graph_db_key_locks[key][0].release()
+            self._unref(key)
+        self._held = []
+
+    @staticmethod
+    def _unref(key: str) -> None:
+        entry = _graph_db_key_locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _graph_db_key_locks[key]
+
+
+def get_graph_db_key_lock(
+    keys: list[str], enable_logging: bool = False
+) -> Union[_GraphDBKeyLock, UnifiedLock]:
+    """return a lock guarding only the given graph keys (entity names, edges)
+
+    Merges of unrelated entities can then run concurrently. Per-key locks only
+    exist within one process, so in multi-process mode this falls back to the
+    global graph database lock.
+    """
+    if _is_multiprocess:
+        return get_graph_db_lock(enable_logging)
+    return _GraphDBKeyLock(keys)
+
+
 def get_data_init_lock(enable_logging: bool = False) -> UnifiedLock:
     """return unified data initialization lock for ensuring atomic data initialization"""
     async_lock = _async_locks.get("data_init_lock") if _is_multiprocess else None
@@ -3,15 +3,13 @@ from __future__ import annotations
 import asyncio
 import configparser
 import os
-import csv
+import time
 import warnings
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Any, AsyncIterator, Callable, Iterator, cast, final, Literal
-import pandas as pd
-
-
 from lightrag.kg import (
     STORAGES,
     verify_storage_implementation,
@@ -37,8 +35,11 @@ from .operate import (
     naive_query,
     query_with_keywords,
 )
+from .embedding_cache import EmbeddingCache, embedding_model_identity
+from .export import TABLE_WRITERS, NpyWriter, table_file_name
 from .prompt import GRAPH_FIELD_SEP, PROMPTS
 from .utils import (
+    EmbeddingBatcher,
     EmbeddingFunc,
     always_get_an_event_loop,
     compute_mdhash_id,
@@ -123,6 +124,9 @@ class LightRAG:
     tiktoken_model_name: str = field(default="gpt-4o-mini")
     """Model name used for tokenization when chunking text."""
 
+    chunking_max_workers: int = field(default=int(os.getenv("CHUNKING_MAX_WORKERS", 4)))
+    """Maximum number of worker threads that chunk documents off the event loop."""
+
     """Maximum number of tokens used for summarizing extracted entities."""
 
     chunking_func: Callable[
@@ -186,6 +190,9 @@ class LightRAG:
     embedding_func: EmbeddingFunc | None = field(default=None)
     """Function for computing text embeddings. Must be set before use."""
 
+    embedding_model_name: str | None = field(default=None)
+    """Name of the embedding model, used to invalidate the persistent embedding cache when the model changes. Derived from embedding_func when None."""
+
     embedding_batch_num: int = field(default=int(os.getenv("EMBEDDING_BATCH_NUM", 32)))
     """Batch size for embedding computations."""
 
@@ -194,17 +201,39 @@ class LightRAG:
     )
     """Maximum number of concurrent embedding function calls."""
 
+    embedding_batch_max_wait: float = field(
+        default=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT", 0.005))
+    )
+    """Seconds concurrent small embedding calls wait to be coalesced into one batch of up to embedding_batch_num texts."""
+
+    embedding_vector_cache_max_entries: int = field(
+        default=int(os.getenv("EMBEDDING_VECTOR_CACHE_MAX_ENTRIES", 200000))
+    )
+    """Max embeddings kept in the persistent cache in working_dir, least recently used evicted first; 0 disables it."""
+
+    embedding_vector_cache_dtype: str = field(
+        default=os.getenv("EMBEDDING_VECTOR_CACHE_DTYPE", "float16")
+    )
+    """Storage format of cached embeddings: 'float16' or 'int8' (with a per-vector scale)."""
+
     embedding_cache_config: dict[str, Any] = field(
         default_factory=lambda: {
             "enabled": False,
             "similarity_threshold": 0.95,
             "use_llm_check": False,
+            "max_entries": 10000,
+            "ttl": None,
+            "index_refresh_interval": 60,
         }
     )
     """Configuration for embedding cache.
     - enabled: If True, enables caching to avoid redundant computations.
     - similarity_threshold: Minimum similarity score to use cached embeddings.
     - use_llm_check: If True, validates cached embeddings using an LLM.
+    - max_entries: Max cached responses per mode, least recently used evicted first.
+    - ttl: Seconds after which a cached response expires; None keeps them forever.
+    - index_refresh_interval: Seconds after which the lookup index reloads responses
+      cached by other workers, for KV storages that do not report versions.
     """
 
     # LLM Configuration
@@ -241,12 +270,25 @@ class LightRAG:
     enable_llm_cache_for_entity_extract: bool = field(default=True)
     """If True, enables caching for entity extraction steps to reduce LLM costs."""
 
+    llm_cache_flush_interval: float = field(
+        default=float(os.getenv("LLM_CACHE_FLUSH_INTERVAL", 1.0))
+    )
+    """Min seconds between LLM cache flushes after queries; later flushes are deferred and coalesced."""
+
     # Extensions
     # ---
 
     max_parallel_insert: int = field(default=int(os.getenv("MAX_PARALLEL_INSERT", 2)))
     """Maximum number of parallel insert operations."""
 
+    insert_persist_docs: int = field(default=int(os.getenv("INSERT_PERSIST_DOCS", 10)))
+    """Persist storages after this many documents have finished since the last save."""
+
+    insert_persist_interval: float = field(
+        default=float(os.getenv("INSERT_PERSIST_INTERVAL", 60))
+    )
+    """Maximum seconds between saves while processed documents are unsaved."""
+
     addon_params: dict[str, Any] = field(
         default_factory=lambda: {
             "language": os.getenv("SUMMARY_LANGUAGE", PROMPTS["DEFAULT_LANGUAGE"])
@@ -282,6 +324,13 @@ class LightRAG:
             initialize_share_data,
         )
 
+        # Created on first use; kept out of the dataclass fields so asdict(self)
+        # never tries to copy it
+        self._chunking_executor: ThreadPoolExecutor | None = None
+        # Debounced LLM cache flush of the query path
+        self._last_query_flush = 0.0
+        self._query_flush_task: asyncio.Task | None = None
+
         # Handle deprecated parameters
         if self.log_level is not None:
             warnings.warn(
@@ -334,8 +383,19 @@ class LightRAG:
         logger.debug(f"LightRAG init with param:\n  {_print_config}\n")
 
         # Init LLM
-        self.embedding_func = limit_async_func_call(self.embedding_func_max_async)(  # type: ignore
-            self.embedding_func
+        self.embedding_func = EmbeddingCache(  # type: ignore
+            EmbeddingBatcher(
+                limit_async_func_call(self.embedding_func_max_async)(
+                    self.embedding_func
+                ),
+                max_batch_size=self.embedding_batch_num,
+                max_wait=self.embedding_batch_max_wait,
+            ),
+            db_path=os.path.join(self.working_dir, "embedding_cache.sqlite3"),
+            max_entries=self.embedding_vector_cache_max_entries,
+            dtype=self.embedding_vector_cache_dtype,
+            model_name=self.embedding_model_name
+            or embedding_model_identity(self.embedding_func),
         )
 
         # Initialize all storages
@@ -383,6 +443,14 @@ class LightRAG:
             ),
             embedding_func=self.embedding_func,
         )
+        # doc_id -> {"chunks": {chunk_id: {"entities": [...], "relations": [[src, tgt], ...]}}},
+        # lets adelete_by_doc_id find what a document contributed without scanning
+        self.doc_chunk_index: BaseKVStorage = self.key_string_value_json_storage_cls(  # type: ignore
+            namespace=make_namespace(
+                self.namespace_prefix, NameSpace.KV_STORE_DOC_CHUNK_INDEX
+            ),
+            embedding_func=self.embedding_func,
+        )
         self.chunk_entity_relation_graph: BaseGraphStorage = self.graph_storage_cls(  # type: ignore
             namespace=make_namespace(
                 self.namespace_prefix, NameSpace.GRAPH_STORE_CHUNK_ENTITY_RELATION
@@ -466,6 +534,7 @@ class LightRAG:
             for storage in (
                 self.full_docs,
                 self.text_chunks,
+                self.doc_chunk_index,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
@@ -478,17 +547,32 @@ class LightRAG:
 
             await asyncio.gather(*tasks)
 
+            # Pooled LLM/embedding clients live until the last instance finalizes
+            from lightrag.llm.client_registry import client_registry
+
+            client_registry.acquire()
+
             self._storages_status = StoragesStatus.INITIALIZED
             logger.debug("Initialized Storages")
 
     async def finalize_storages(self):
         """Asynchronously finalize the storages"""
         if self._storages_status == StoragesStatus.INITIALIZED:
+            # Write out LLM cache entries of a deferred query flush
+            task, self._query_flush_task = self._query_flush_task, None
+            if task is not None and not task.done():
+                if not task.get_loop().is_closed():
+                    task.cancel()
+                if task.get_loop() is asyncio.get_running_loop():
+                    await asyncio.gather(task, return_exceptions=True)
+                await self.llm_response_cache.index_done_callback()
+
             tasks = []
 
             for storage in (
                 self.full_docs,
                 self.text_chunks,
+                self.doc_chunk_index,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
@@ -501,6 +585,17 @@ class LightRAG:
 
             await asyncio.gather(*tasks)
 
+            if self._chunking_executor is not None:
+                self._chunking_executor.shutdown(wait=False)
+                self._chunking_executor = None
+
+            from lightrag.llm.client_registry import client_registry
+
+            await client_registry.release()
+
+            if isinstance(self.embedding_func, EmbeddingCache):
+                self.embedding_func.close()
+
             self._storages_status = StoragesStatus.FINALIZED
             logger.debug("Finalized Storages")
 
@@ -785,10 +880,42 @@ class LightRAG:
             logger.info("No new unique documents were found.")
             return
 
-        # 5. Store status document
+        # 5. Store the full documents, then their status. The content is read
+        # back from full_docs when the document is processed, so doc status
+        # storages need not keep a second copy
+        await self.full_docs.upsert(
+            {doc_id: {"content": contents[doc_id]["content"]} for doc_id in new_docs}
+        )
+        await self.full_docs.index_done_callback()
         await self.doc_status.upsert(new_docs)
         logger.info(f"Stored {len(new_docs)} new unique documents")
 
+    async def _run_chunking(
+        self,
+        content: str,
+        split_by_character: str | None,
+        split_by_character_only: bool,
+    ) -> list[dict[str, Any]]:
+        """Run chunking_func on the chunking thread pool"""
+        if self._chunking_executor is None:
+            self._chunking_executor = ThreadPoolExecutor(
+                max_workers=self.chunking_max_workers,
+                thread_name_prefix="lightrag-chunking",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._chunking_executor,
+            partial(
+                self.chunking_func,
+                content,
+                split_by_character,
+                split_by_character_only,
+                self.chunk_overlap_token_size,
+                self.chunk_token_size,
+                self.tiktoken_model_name,
+            ),
+        )
+
     async def apipeline_process_enqueue_documents(
         self,
         split_by_character: str | None = None,
@@ -865,17 +992,15 @@ class LightRAG:
                     break
 
                 # 2. split docs into chunks, insert chunks, update doc status
-                docs_batches = [
-                    list(to_process_docs.items())[i : i + self.max_parallel_insert]
-                    for i in range(0, len(to_process_docs), self.max_parallel_insert)
-                ]
-
-                log_message = f"Processing {len(to_process_docs)} document(s) in {len(docs_batches)} batches"
+                workers_count = min(self.max_parallel_insert, len(to_process_docs))
+                log_message = f"Processing {len(to_process_docs)} document(s) with {workers_count} workers"
                 logger.info(log_message)
 
-                # Update pipeline status with current batch information
+                # Documents are no longer grouped into batches; batchs/cur_batch
+                # report total and finished documents instead
                 pipeline_status["docs"] = len(to_process_docs)
-                pipeline_status["batchs"] = len(docs_batches)
+                pipeline_status["batchs"] = len(to_process_docs)
+                pipeline_status["cur_batch"] = 0
                 pipeline_status["latest_message"] = log_message
                 pipeline_status["history_messages"].append(log_message)
 
@@ -898,24 +1023,28 @@ class LightRAG:
                     pipeline_status_lock: asyncio.Lock,
                 ) -> None:
                     """Process single document"""
+                    # Get file path from status document
+                    file_path = getattr(status_doc, "file_path", "unknown_source")
+                    # Documents enqueued by older versions may only have their
+                    # content in the status document
+                    content = status_doc.content
                     try:
-                        # Get file path from status document
-                        file_path = getattr(status_doc, "file_path", "unknown_source")
+                        full_doc = await self.full_docs.get_by_id(doc_id)
+                        if full_doc:
+                            content = full_doc["content"]
 
-                        # Generate chunks from document
+                        # Generate chunks from document; tokenization runs in a
+                        # worker thread so it does not stall concurrent LLM calls
                         chunks: dict[str, Any] = {
                             compute_mdhash_id(dp["content"], prefix="chunk-"): {
                                 **dp,
                                 "full_doc_id": doc_id,
                                 "file_path": file_path,  # Add file path to each chunk
                             }
-                            for dp in self.chunking_func(
-                                status_doc.content,
+                            for dp in await self._run_chunking(
+                                content,
                                 split_by_character,
                                 split_by_character_only,
-                                self.chunk_overlap_token_size,
-                                self.chunk_token_size,
-                                self.tiktoken_model_name,
                             )
                         }
 
@@ -927,7 +1056,7 @@ class LightRAG:
                                     doc_id: {
                                         "status": DocStatus.PROCESSING,
                                         "chunks_count": len(chunks),
-                                        "content": status_doc.content,
+                                        "content": content,
                                         "content_summary": status_doc.content_summary,
                                         "content_length": status_doc.content_length,
                                         "created_at": status_doc.created_at,
@@ -946,9 +1075,7 @@ class LightRAG:
                             )
                         )
                         full_docs_task = asyncio.create_task(
-                            self.full_docs.upsert(
-                                {doc_id: {"content": status_doc.content}}
-                            )
+                            self.full_docs.upsert({doc_id: {"content": content}})
                         )
                         text_chunks_task = asyncio.create_task(
                             self.text_chunks.upsert(chunks)
@@ -966,7 +1093,7 @@ class LightRAG:
                                 doc_id: {
                                     "status": DocStatus.PROCESSED,
                                     "chunks_count": len(chunks),
-                                    "content": status_doc.content,
+                                    "content": content,
                                     "content_summary": status_doc.content_summary,
                                     "content_length": status_doc.content_length,
                                     "created_at": status_doc.created_at,
@@ -998,7 +1125,7 @@ class LightRAG:
                                 doc_id: {
                                     "status": DocStatus.FAILED,
                                     "error": str(e),
-                                    "content": status_doc.content,
+                                    "content": content,
                                     "content_summary": status_doc.content_summary,
                                     "content_length": status_doc.content_length,
                                     "created_at": status_doc.created_at,
@@ -1008,39 +1135,20 @@ class LightRAG:
                             }
                         )
 
-                # 3. iterate over batches
-                total_batches = len(docs_batches)
-                for batch_idx, docs_batch in enumerate(docs_batches):
-                    current_batch = batch_idx + 1
-                    log_message = (
-                        f"Start processing batch {current_batch} of {total_batches}."
-                    )
-                    logger.info(log_message)
-                    pipeline_status["cur_batch"] = current_batch
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
-
-                    doc_tasks = []
-                    for doc_id, status_doc in docs_batch:
-                        doc_tasks.append(
-                            process_document(
-                                doc_id,
-                                status_doc,
-                                split_by_character,
-                                split_by_character_only,
-                                pipeline_status,
-                                pipeline_status_lock,
-                            )
-                        )
-
-                    # Process documents in one batch parallelly
-                    await asyncio.gather(*doc_tasks)
-                    await self._insert_done()
-
-                    log_message = f"Completed batch {current_batch} of {total_batches}."
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
+                # 3. feed documents to a fixed pool of workers through a bounded
+                # queue, so a new document starts as soon as any slot frees up
+                # instead of waiting for the slowest document of a batch
+                await self._process_documents_streaming(
+                    to_process_docs,
+                    partial(
+                        process_document,
+                        split_by_character=split_by_character,
+                        split_by_character_only=split_by_character_only,
+                        pipeline_status=pipeline_status,
+                        pipeline_status_lock=pipeline_status_lock,
+                    ),
+                    pipeline_status,
+                )
 
                 # Check if there's a pending request to process more documents (with lock)
                 has_pending_request = False
@@ -1079,6 +1187,76 @@ class LightRAG:
                 pipeline_status["latest_message"] = log_message
                 pipeline_status["history_messages"].append(log_message)
 
+    async def _process_documents_streaming(
+        self,
+        to_process_docs: dict[str, DocProcessingStatus],
+        process_document: Callable[..., Any],
+        pipeline_status: dict,
+    ) -> None:
+        """Run process_document over all documents with max_parallel_insert workers
+
+        Storages are persisted once insert_persist_docs documents have finished
+        since the last save, at least every insert_persist_interval seconds while
+        there is unsaved work, and once more when all documents are done.
+        """
+        doc_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_parallel_insert)
+        persist_lock = asyncio.Lock()
+        stop_flusher = asyncio.Event()
+        progress = {"done": 0, "unsaved": 0}
+        total_docs = len(to_process_docs)
+
+        async def persist(force: bool = False) -> None:
+            async with persist_lock:
+                if not progress["unsaved"] and not force:
+                    return
+                progress["unsaved"] = 0
+                await self._insert_done()
+                log_message = f"Persisted storages ({progress['done']}/{total_docs} documents done)"
+                logger.info(log_message)
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+        async def worker() -> None:
+            while True:
+                item = await doc_queue.get()
+                if item is None:
+                    return
+                doc_id, status_doc = item
+                await process_document(doc_id, status_doc)
+                progress["done"] += 1
+                progress["unsaved"] += 1
+                pipeline_status["cur_batch"] = progress["done"]
+                if progress["unsaved"] >= self.insert_persist_docs:
+                    await persist()
+
+        async def flusher() -> None:
+            while not stop_flusher.is_set():
+                try:
+                    await asyncio.wait_for(
+                        stop_flusher.wait(), timeout=self.insert_persist_interval
+                    )
+                except asyncio.TimeoutError:
+                    await persist()
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, min(self.max_parallel_insert, total_docs)))
+        ]
+        flusher_task = asyncio.create_task(flusher())
+        try:
+            for item in to_process_docs.items():
+                await doc_queue.put(item)
+            for _ in workers:
+                await doc_queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                if not task.done():
+                    task.cancel()
+            stop_flusher.set()
+            await flusher_task
+            await persist(force=True)
+
     async def _process_entity_relation_graph(
         self, chunk: dict[str, Any], pipeline_status=None, pipeline_status_lock=None
     ) -> None:
@@ -1092,6 +1270,7 @@ class LightRAG:
                 pipeline_status=pipeline_status,
                 pipeline_status_lock=pipeline_status_lock,
                 llm_response_cache=self.llm_response_cache,
+                doc_chunk_index=self.doc_chunk_index,
             )
         except Exception as e:
             logger.error("Failed to extract entities and relationships")
@@ -1105,6 +1284,7 @@ class LightRAG:
             for storage_inst in [  # type: ignore
                 self.full_docs,
                 self.text_chunks,
+                self.doc_chunk_index,
                 self.llm_response_cache,
                 self.entities_vdb,
                 self.relationships_vdb,
@@ -1431,6 +1611,38 @@ class LightRAG:
         return response
 
     async def _query_done(self):
+        # Flush at most once per llm_cache_flush_interval; a flush requested
+        # sooner is deferred, and covers every query finished meanwhile
+        task = self._query_flush_task
+        if task is not None and not task.done():
+            if task.get_loop() is asyncio.get_running_loop():
+                return
+            # Deferred on a loop that is not running, e.g. the one of the sync
+            # query(); the flush might never happen, so write the cache now
+            self._query_flush_task = None
+            if not task.get_loop().is_closed():
+                task.cancel()
+            await self._flush_query_cache()
+            return
+        delay = (
+            self._last_query_flush + self.llm_cache_flush_interval - time.monotonic()
+        )
+        if delay <= 0:
+            await self._flush_query_cache()
+        else:
+            self._query_flush_task = asyncio.create_task(self._flush_query_cache(delay))
+
+    async def _flush_query_cache(self, delay: float = 0) -> None:
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # asyncio.run cancels what is left when its loop ends; write the
+                # cache unless finalize_storages has taken the flush over
+                if self._query_flush_task is asyncio.current_task():
+                    await self.llm_response_cache.index_done_callback()
+                raise
+        self._last_query_flush = time.monotonic()
         await self.llm_response_cache.index_done_callback()
 
     def delete_by_entity(self, entity_name: str) -> None:
@@ -1549,6 +1761,10 @@ class LightRAG:
     async def adelete_by_doc_id(self, doc_id: str) -> None:
         """Delete a document and all its related data
 
+        The entities and relations to visit are looked up in doc_chunk_index, so
+        the cost follows the size of the document. Documents indexed before
+        doc_chunk_index existed fall back to scanning all chunks and the graph.
+
         Args:
             doc_id: Document ID to delete
         """
@@ -1560,67 +1776,70 @@ class LightRAG:
 
             logger.debug(f"Starting deletion for document {doc_id}")
 
-            # 2. Get all chunks related to this document
-            # Find all chunks where full_doc_id equals the current doc_id
-            all_chunks = await self.text_chunks.get_all()
-            related_chunks = {
-                chunk_id: chunk_data
-                for chunk_id, chunk_data in all_chunks.items()
-                if isinstance(chunk_data, dict)
-                and chunk_data.get("full_doc_id") == doc_id
-            }
+            # 2. Get all chunks related to this document, and the entities and
+            # relationships they contributed to
+            doc_index = await self.doc_chunk_index.get_by_id(doc_id)
+            if doc_index is not None:
+                chunk_ids = set(doc_index["chunks"])
+                candidate_entities = {
+                    entity
+                    for chunk in doc_index["chunks"].values()
+                    for entity in chunk["entities"]
+                }
+                candidate_relations = {
+                    tuple(relation)
+                    for chunk in doc_index["chunks"].values()
+                    for relation in chunk["relations"]
+                }
+            else:
+                # Find all chunks where full_doc_id equals the current doc_id
+                all_chunks = await self.text_chunks.get_all()
+                chunk_ids = {
+                    chunk_id
+                    for chunk_id, chunk_data in all_chunks.items()
+                    if isinstance(chunk_data, dict)
+                    and chunk_data.get("full_doc_id") == doc_id
+                }
+                candidate_entities = set(
+                    await self.chunk_entity_relation_graph.get_all_labels()
+                )
+                edges_by_node = (
+                    await self.chunk_entity_relation_graph.get_nodes_edges_batch(
+                        list(candidate_entities)
+                    )
+                )
+                candidate_relations = {
+                    edge for edges in edges_by_node.values() for edge in edges
+                }
 
-            if not related_chunks:
+            if not chunk_ids:
                 logger.warning(f"No chunks found for document {doc_id}")
                 return
 
-            # Get all related chunk IDs
-            chunk_ids = set(related_chunks.keys())
-            logger.debug(f"Found {len(chunk_ids)} chunks to delete")
-
-            # TODO: self.entities_vdb.client_storage only works for local storage, need to fix this
-
-            # 3. Before deleting, check the related entities and relationships for these chunks
-            for chunk_id in chunk_ids:
-                # Check entities
-                entities_storage = await self.entities_vdb.client_storage
-                entities = [
-                    dp
-                    for dp in entities_storage["data"]
-                    if chunk_id in dp.get("source_id")
-                ]
-                logger.debug(f"Chunk {chunk_id} has {len(entities)} related entities")
-
-                # Check relationships
-                relationships_storage = await self.relationships_vdb.client_storage
-                relations = [
-                    dp
-                    for dp in relationships_storage["data"]
-                    if chunk_id in dp.get("source_id")
-                ]
-                logger.debug(f"Chunk {chunk_id} has {len(relations)} related relations")
-
-            # Continue with the original deletion process...
+            logger.debug(
+                f"Found {len(chunk_ids)} chunks, {len(candidate_entities)} entities "
+                f"and {len(candidate_relations)} relations to check"
+            )
 
-            # 4. Delete chunks from vector database
-            if chunk_ids:
-                await self.chunks_vdb.delete(chunk_ids)
-                await self.text_chunks.delete(chunk_ids)
+            # 3. Delete chunks from vector database
+            await self.chunks_vdb.delete(list(chunk_ids))
+            await self.text_chunks.delete(list(chunk_ids))
 
-            # 5. Find and process entities and relationships that have these chunks as source
-            # Get all nodes and edges from the graph storage using storage-agnostic methods
+            # 4. Find and process entities and relationships that have these chunks as source
             entities_to_delete = set()
             entities_to_update = {}  # entity_name -> new_source_id
             relationships_to_delete = set()
             relationships_to_update = {}  # (src, tgt) -> new_source_id
 
-            # Process entities - use storage-agnostic methods
-            all_labels = await self.chunk_entity_relation_graph.get_all_labels()
-            for node_label in all_labels:
-                node_data = await self.chunk_entity_relation_graph.get_node(node_label)
+            nodes = await self.chunk_entity_relation_graph.get_nodes_batch(
+                list(candidate_entities)
+            )
+            for node_label, node_data in nodes.items():
                 if node_data and "source_id" in node_data:
                     # Split source_id using GRAPH_FIELD_SEP
                     sources = set(node_data["source_id"].split(GRAPH_FIELD_SEP))
+                    if sources.isdisjoint(chunk_ids):
+                        continue
                     sources.difference_update(chunk_ids)
                     if not sources:
                         entities_to_delete.add(node_label)
@@ -1634,31 +1853,27 @@ class LightRAG:
                             f"Entity {node_label} will be updated with new source_id: {new_source_id}"
                         )
 
-            # Process relationships
-            for node_label in all_labels:
-                node_edges = await self.chunk_entity_relation_graph.get_node_edges(
-                    node_label
-                )
-                if node_edges:
-                    for src, tgt in node_edges:
-                        edge_data = await self.chunk_entity_relation_graph.get_edge(
-                            src, tgt
+            edges = await self.chunk_entity_relation_graph.get_edges_batch(
+                list(candidate_relations)
+            )
+            for (src, tgt), edge_data in edges.items():
+                if edge_data and "source_id" in edge_data:
+                    # Split source_id using GRAPH_FIELD_SEP
+                    sources = set(edge_data["source_id"].split(GRAPH_FIELD_SEP))
+                    if sources.isdisjoint(chunk_ids):
+                        continue
+                    sources.difference_update(chunk_ids)
+                    if not sources:
+                        relationships_to_delete.add((src, tgt))
+                        logger.debug(
+                            f"Relationship {src}-{tgt} marked for deletion - no remaining sources"
+                        )
+                    else:
+                        new_source_id = GRAPH_FIELD_SEP.join(sources)
+                        relationships_to_update[(src, tgt)] = new_source_id
+                        logger.debug(
+                            f"Relationship {src}-{tgt} will be updated with new source_id: {new_source_id}"
                         )
-                        if edge_data and "source_id" in edge_data:
-                            # Split source_id using GRAPH_FIELD_SEP
-                            sources = set(edge_data["source_id"].split(GRAPH_FIELD_SEP))
-                            sources.difference_update(chunk_ids)
-                            if not sources:
-                                relationships_to_delete.add((src, tgt))
-                                logger.debug(
-                                    f"Relationship {src}-{tgt} marked for deletion - no remaining sources"
-                                )
-                            else:
-                                new_source_id = GRAPH_FIELD_SEP.join(sources)
-                                relationships_to_update[(src, tgt)] = new_source_id
-                                logger.debug(
-                                    f"Relationship {src}-{tgt} will be updated with new source_id: {new_source_id}"
-                                )
 
             # Delete entities
             if entities_to_delete:
@@ -1672,15 +1887,12 @@ class LightRAG:
 
             # Update entities
             for entity, new_source_id in entities_to_update.items():
-                node_data = await self.chunk_entity_relation_graph.get_node(entity)
-                if node_data:
-                    node_data["source_id"] = new_source_id
-                    await self.chunk_entity_relation_graph.upsert_node(
-                        entity, node_data
-                    )
-                    logger.debug(
-                        f"Updated entity {entity} with new source_id: {new_source_id}"
-                    )
+                node_data = nodes[entity]
+                node_data["source_id"] = new_source_id
+                await self.chunk_entity_relation_graph.upsert_node(entity, node_data)
+                logger.debug(
+                    f"Updated entity {entity} with new source_id: {new_source_id}"
+                )
 
             # Delete relationships
             if relationships_to_delete:
@@ -1698,19 +1910,71 @@ class LightRAG:
 
             # Update relationships
             for (src, tgt), new_source_id in relationships_to_update.items():
-                edge_data = await self.chunk_entity_relation_graph.get_edge(src, tgt)
-                if edge_data:
-                    edge_data["source_id"] = new_source_id
-                    await self.chunk_entity_relation_graph.upsert_edge(
-                        src, tgt, edge_data
-                    )
-                    logger.debug(
-                        f"Updated relationship {src}-{tgt} with new source_id: {new_source_id}"
+                edge_data = edges[(src, tgt)]
+                edge_data["source_id"] = new_source_id
+                await self.chunk_entity_relation_graph.upsert_edge(src, tgt, edge_data)
+                logger.debug(
+                    f"Updated relationship {src}-{tgt} with new source_id: {new_source_id}"
+                )
+
+            # 5. Update the source_id of the vector DB records that keep other sources
+            async def update_vdb_sources(data_type, vdb, ids):
+                data_for_vdb = {}
+                for item in await vdb.get_by_ids(ids):
+                    if not item:
+                        continue
+                    old_sources = (item.get("source_id") or "").split(GRAPH_FIELD_SEP)
+                    new_sources = [src for src in old_sources if src not in chunk_ids]
+                    if len(new_sources) == len(old_sources):
+                        continue
+                    item_id = item.get("__id__") or item["id"]
+                    data = {
+                        k: v
+                        for k, v in item.items()
+                        if k not in ("__id__", "__created_at__", "__vector__", "id")
+                    }
+                    data["source_id"] = GRAPH_FIELD_SEP.join(new_sources)
+                    if data_type == "entities":
+                        data["content"] = data.get("content") or (
+                            item.get("entity_name", "")
+                            + (item.get("description") or "")
+                        )
+                    else:  # relationships
+                        data["content"] = data.get("content") or (
+                            (item.get("keywords") or "")
+                            + (item.get("src_id") or "")
+                            + (item.get("tgt_id") or "")
+                            + (item.get("description") or "")
+                        )
+                    data_for_vdb[item_id] = data
+
+                if data_for_vdb:
+                    await vdb.upsert(data_for_vdb)
+                    logger.info(
+                        f"Updated source_id of {len(data_for_vdb)} {data_type} in vector DB"
                     )
 
-            # 6. Delete original document and status
+            await update_vdb_sources(
+                "entities",
+                self.entities_vdb,
+                [
+                    compute_mdhash_id(entity, prefix="ent-")
+                    for entity in entities_to_update
+                ],
+            )
+            await update_vdb_sources(
+                "relationships",
+                self.relationships_vdb,
+                [
+                    compute_mdhash_id(src + tgt, prefix="rel-")
+                    for src, tgt in relationships_to_update
+                ],
+            )
+
+            # 6. Delete original document, status and index entry
             await self.full_docs.delete([doc_id])
             await self.doc_status.delete([doc_id])
+            await self.doc_chunk_index.delete([doc_id])
 
             # 7. Ensure all indexes are updated
             await self._insert_done()
@@ -1721,84 +1985,6 @@ class LightRAG:
                 f"Updated {len(entities_to_update)} entities and {len(relationships_to_update)} relationships."
             )
 
-            async def process_data(data_type, vdb, chunk_id):
-                # Check data (entities or relationships)
-                storage = await vdb.client_storage
-                data_with_chunk = [
-                    dp
-                    for dp in storage["data"]
-                    if chunk_id in (dp.get("source_id") or "").split(GRAPH_FIELD_SEP)
-                ]
-
-                data_for_vdb = {}
-                if data_with_chunk:
-                    logger.warning(
-                        f"found {len(data_with_chunk)} {data_type} still referencing chunk {chunk_id}"
-                    )
-
-                    for item in data_with_chunk:
-                        old_sources = item["source_id"].split(GRAPH_FIELD_SEP)
-                        new_sources = [src for src in old_sources if src != chunk_id]
-
-                        if not new_sources:
-                            logger.info(
-                                f"{data_type} {item.get('entity_name', 'N/A')} is deleted because source_id is not exists"
-                            )
-                            await vdb.delete_entity(item)
-                        else:
-                            item["source_id"] = GRAPH_FIELD_SEP.join(new_sources)
-                            item_id = item["__id__"]
-                            data_for_vdb[item_id] = item.copy()
-                            if data_type == "entities":
-                                data_for_vdb[item_id]["content"] = data_for_vdb[
-                                    item_id
-                                ].get("content") or (
-                                    item.get("entity_name", "")
-                                    + (item.get("description") or "")
-                                )
-                            else:  # relationships
-                                data_for_vdb[item_id]["content"] = data_for_vdb[
-                                    item_id
-                                ].get("content") or (
-                                    (item.get("keywords") or "")
-                                    + (item.get("src_id") or "")
-                                    + (item.get("tgt_id") or "")
-                                    + (item.get("description") or "")
-                                )
-
-                    if data_for_vdb:
-                        await vdb.upsert(data_for_vdb)
-                        logger.info(f"Successfully updated {data_type} in vector DB")
-
-            # Add verification step
-            async def verify_deletion():
-                # Verify if the document has been deleted
-                if await self.full_docs.get_by_id(doc_id):
-                    logger.warning(f"Document {doc_id} still exists in full_docs")
-
-                # Verify if chunks have been deleted
-                all_remaining_chunks = await self.text_chunks.get_all()
-                remaining_related_chunks = {
-                    chunk_id: chunk_data
-                    for chunk_id, chunk_data in all_remaining_chunks.items()
-                    if isinstance(chunk_data, dict)
-                    and chunk_data.get("full_doc_id") == doc_id
-                }
-
-                if remaining_related_chunks:
-                    logger.warning(
-                        f"Found {len(remaining_related_chunks)} remaining chunks"
-                    )
-
-                # Verify entities and relationships
-                for chunk_id in chunk_ids:
-                    await process_data("entities", self.entities_vdb, chunk_id)
-                    await process_data(
-                        "relationships", self.relationships_vdb, chunk_id
-                    )
-
-            await verify_deletion()
-
         except Exception as e:
             logger.error(f"Error while deleting document {doc_id}: {e}")
 
@@ -2679,308 +2865,194 @@ class LightRAG:
     async def aexport_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "parquet"] = "csv",
         include_vector_data: bool = False,
+        vector_format: Literal["str", "npy"] = "str",
+        batch_size: int = 1000,
     ) -> None:
         """
         Asynchronously exports all entities, relations, and relationships to various formats.
+
+        Entities and relations are streamed from the storages in batches and written
+        row by row, so the export takes time linear in the size of the graph and
+        memory bounded by the batch size.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "excel", "md", "txt", "parquet".
                 - csv: Comma-separated values file
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                - parquet: One Parquet file per table, <stem>.entities.parquet,
+                  <stem>.relations.parquet and <stem>.relationships.parquet
             include_vector_data: Whether to include data from the vector database.
+            vector_format: How to export the vectors when include_vector_data is set.
+                - str: vector database records as strings only
+                - npy: also write the stored vectors of entities and relationships
+                  to <stem>.entities.npy and <stem>.relationships.npy, and add a
+                  vector_index column with the row of each vector in those files
+            batch_size: Number of nodes or edges fetched from the storages at once.
         """
-        # Collect data
-        entities_data = []
-        relations_data = []
-        relationships_data = []
-
-        # --- Entities ---
-        all_entities = await self.chunk_entity_relation_graph.get_all_labels()
-        for entity_name in all_entities:
-            entity_info = await self.get_entity_info(
-                entity_name, include_vector_data=include_vector_data
+        if file_format not in TABLE_WRITERS:
+            raise ValueError(
+                f"Unsupported file format: {file_format}. "
+                f"Choose from: {', '.join(TABLE_WRITERS)}"
             )
-            entity_row = {
-                "entity_name": entity_name,
-                "source_id": entity_info["source_id"],
-                "graph_data": str(
-                    entity_info["graph_data"]
-                ),  # Convert to string to ensure compatibility
+        graph = self.chunk_entity_relation_graph
+        write_npy = include_vector_data and vector_format == "npy"
+
+        async def edge_batches() -> AsyncIterator[list[tuple[str, str, dict]]]:
+            batch = []
+            async for edge in graph.iter_edges(batch_size):
+                batch.append(edge)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def relation_ids(src: str, tgt: str) -> list[str]:
+            # Relations are stored under the direction they were extracted in
+            return [
+                compute_mdhash_id(src + tgt, prefix="rel-"),
+                compute_mdhash_id(tgt + src, prefix="rel-"),
+            ]
+
+        async def vector_records(
+            vdb: BaseVectorStorage, ids: list[str]
+        ) -> dict[str, dict[str, Any]]:
+            records = await vdb.get_by_ids(ids)
+            return {
+                record.get("__id__", record.get("id")): record for record in records
             }
-            if include_vector_data and "vector_data" in entity_info:
-                entity_row["vector_data"] = str(entity_info["vector_data"])
-            entities_data.append(entity_row)
-
-        # --- Relations ---
-        for src_entity in all_entities:
-            for tgt_entity in all_entities:
-                if src_entity == tgt_entity:
-                    continue
 
-                edge_exists = await self.chunk_entity_relation_graph.has_edge(
-                    src_entity, tgt_entity
-                )
-                if edge_exists:
-                    relation_info = await self.get_relation_info(
-                        src_entity, tgt_entity, include_vector_data=include_vector_data
+        async def append_vectors(
+            vdb: BaseVectorStorage, ids: list[str], npy: NpyWriter
+        ) -> list[int | None]:
+            """Write the vectors of ids to npy and return their rows"""
+            vectors = await vdb.get_vectors_by_ids(ids)
+            return [npy.append(vectors[id]) if id in vectors else None for id in ids]
+
+        writer = TABLE_WRITERS[file_format](output_path)
+        try:
+            # --- Entities ---
+            fieldnames = ["entity_name", "source_id", "graph_data"]
+            if include_vector_data:
+                fieldnames.append("vector_data")
+            if write_npy:
+                fieldnames.append("vector_index")
+                npy = NpyWriter(table_file_name(output_path, "entities", ".npy"))
+            writer.start_table("Entities", fieldnames)
+            all_entities = await graph.get_all_labels()
+            for start in range(0, len(all_entities), batch_size):
+                batch = all_entities[start : start + batch_size]
+                nodes = await graph.get_nodes_batch(batch)
+                ids = [compute_mdhash_id(name, prefix="ent-") for name in batch]
+                if include_vector_data:
+                    records = await vector_records(self.entities_vdb, ids)
+                if write_npy:
+                    rows = await append_vectors(self.entities_vdb, ids, npy)
+                for i, (entity_name, id) in enumerate(zip(batch, ids)):
+                    node_data = nodes.get(entity_name)
+                    entity_row = {
+                        "entity_name": entity_name,
+                        "source_id": node_data.get("source_id") if node_data else None,
+                        "graph_data": str(node_data),
+                    }
+                    if include_vector_data:
+                        entity_row["vector_data"] = str(records.get(id))
+                    if write_npy:
+                        entity_row["vector_index"] = rows[i]
+                    writer.write_row(entity_row)
+            writer.end_table()
+            if write_npy:
+                npy.close()
+
+            # --- Relations ---
+            fieldnames = ["src_entity", "tgt_entity", "source_id", "graph_data"]
+            if include_vector_data:
+                fieldnames.append("vector_data")
+            writer.start_table("Relations", fieldnames)
+            async for batch in edge_batches():
+                if include_vector_data:
+                    records = await vector_records(
+                        self.relationships_vdb,
+                        [id for src, tgt, _ in batch for id in relation_ids(src, tgt)],
                     )
+                for src_entity, tgt_entity, edge_data in batch:
                     relation_row = {
                         "src_entity": src_entity,
                         "tgt_entity": tgt_entity,
-                        "source_id": relation_info["source_id"],
-                        "graph_data": str(
-                            relation_info["graph_data"]
-                        ),  # Convert to string
+                        "source_id": edge_data.get("source_id"),
+                        "graph_data": str(edge_data),
                     }
-                    if include_vector_data and "vector_data" in relation_info:
-                        relation_row["vector_data"] = str(relation_info["vector_data"])
-                    relations_data.append(relation_row)
-
-        # --- Relationships (from VectorDB) ---
-        all_relationships = await self.relationships_vdb.client_storage
-        for rel in all_relationships["data"]:
-            relationships_data.append(
-                {
-                    "relationship_id": rel["__id__"],
-                    "data": str(rel),  # Convert to string for compatibility
-                }
-            )
-
-        # Export based on format
-        if file_format == "csv":
-            # CSV export
-            with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-                # Entities
-                if entities_data:
-                    csvfile.write("# ENTITIES\n")
-                    writer = csv.DictWriter(csvfile, fieldnames=entities_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(entities_data)
-                    csvfile.write("\n\n")
-
-                # Relations
-                if relations_data:
-                    csvfile.write("# RELATIONS\n")
-                    writer = csv.DictWriter(
-                        csvfile, fieldnames=relations_data[0].keys()
-                    )
-                    writer.writeheader()
-                    writer.writerows(relations_data)
-                    csvfile.write("\n\n")
-
-                # Relationships
-                if relationships_data:
-                    csvfile.write("# RELATIONSHIPS\n")
-                    writer = csv.DictWriter(
-                        csvfile, fieldnames=relationships_data[0].keys()
-                    )
-                    writer.writeheader()
-                    writer.writerows(relationships_data)
-
-        elif file_format == "excel":
-            # Excel export
-            entities_df = (
-                pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
-            )
-            relations_df = (
-                pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
-            )
-            relationships_df = (
-                pd.DataFrame(relationships_data)
-                if relationships_data
-                else pd.DataFrame()
-            )
-
-            with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-                if not entities_df.empty:
-                    entities_df.to_excel(writer, sheet_name="Entities", index=False)
-                if not relations_df.empty:
-                    relations_df.to_excel(writer, sheet_name="Relations", index=False)
-                if not relationships_df.empty:
-                    relationships_df.to_excel(
-                        writer, sheet_name="Relationships", index=False
-                    )
-
-        elif file_format == "md":
-            # Markdown export
-            with open(output_path, "w", encoding="utf-8") as mdfile:
-                mdfile.write("# LightRAG Data Export\n\n")
-
-                # Entities
-                mdfile.write("## Entities\n\n")
-                if entities_data:
-                    # Write header
-                    mdfile.write("| " + " | ".join(entities_data[0].keys()) + " |\n")
-                    mdfile.write(
-                        "| "
-                        + " | ".join(["---"] * len(entities_data[0].keys()))
-                        + " |\n"
-                    )
-
-                    # Write rows
-                    for entity in entities_data:
-                        mdfile.write(
-                            "| " + " | ".join(str(v) for v in entity.values()) + " |\n"
-                        )
-                    mdfile.write("\n\n")
-                else:
-                    mdfile.write("*No entity data available*\n\n")
-
-                # Relations
-                mdfile.write("## Relations\n\n")
-                if relations_data:
-                    # Write header
-                    mdfile.write("| " + " | ".join(relations_data[0].keys()) + " |\n")
-                    mdfile.write(
-                        "| "
-                        + " | ".join(["---"] * len(relations_data[0].keys()))
-                        + " |\n"
-                    )
-
-                    # Write rows
-                    for relation in relations_data:
-                        mdfile.write(
-                            "| "
-                            + " | ".join(str(v) for v in relation.values())
-                            + " |\n"
-                        )
-                    mdfile.write("\n\n")
-                else:
-                    mdfile.write("*No relation data available*\n\n")
-
-                # Relationships
-                mdfile.write("## Relationships\n\n")
-                if relationships_data:
-                    # Write header
-                    mdfile.write(
-                        "| " + " | ".join(relationships_data[0].keys()) + " |\n"
-                    )
-                    mdfile.write(
-                        "| "
-                        + " | ".join(["---"] * len(relationships_data[0].keys()))
-                        + " |\n"
-                    )
-
-                    # Write rows
-                    for relationship in relationships_data:
-                        mdfile.write(
-                            "| "
-                            + " | ".join(str(v) for v in relationship.values())
-                            + " |\n"
-                        )
-                else:
-                    mdfile.write("*No relationship data available*\n\n")
-
-        elif file_format == "txt":
-            # Plain text export
-            with open(output_path, "w", encoding="utf-8") as txtfile:
-                txtfile.write("LIGHTRAG DATA EXPORT\n")
-                txtfile.write("=" * 80 + "\n\n")
-
-                # Entities
-                txtfile.write("ENTITIES\n")
-                txtfile.write("-" * 80 + "\n")
-                if entities_data:
-                    # Create fixed width columns
-                    col_widths = {
-                        k: max(len(k), max(len(str(e[k])) for e in entities_data))
-                        for k in entities_data[0]
-                    }
-                    header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
-                    txtfile.write(header + "\n")
-                    txtfile.write("-" * len(header) + "\n")
-
-                    # Write rows
-                    for entity in entities_data:
-                        row = "  ".join(
-                            str(v).ljust(col_widths[k]) for k, v in entity.items()
-                        )
-                        txtfile.write(row + "\n")
-                    txtfile.write("\n\n")
-                else:
-                    txtfile.write("No entity data available\n\n")
-
-                # Relations
-                txtfile.write("RELATIONS\n")
-                txtfile.write("-" * 80 + "\n")
-                if relations_data:
-                    # Create fixed width columns
-                    col_widths = {
-                        k: max(len(k), max(len(str(r[k])) for r in relations_data))
-                        for k in relations_data[0]
-                    }
-                    header = "  ".join(
-                        k.ljust(col_widths[k]) for k in relations_data[0]
-                    )
-                    txtfile.write(header + "\n")
-                    txtfile.write("-" * len(header) + "\n")
-
-                    # Write rows
-                    for relation in relations_data:
-                        row = "  ".join(
-                            str(v).ljust(col_widths[k]) for k, v in relation.items()
-                        )
-                        txtfile.write(row + "\n")
-                    txtfile.write("\n\n")
-                else:
-                    txtfile.write("No relation data available\n\n")
-
-                # Relationships
-                txtfile.write("RELATIONSHIPS\n")
-                txtfile.write("-" * 80 + "\n")
-                if relationships_data:
-                    # Create fixed width columns
-                    col_widths = {
-                        k: max(len(k), max(len(str(r[k])) for r in relationships_data))
-                        for k in relationships_data[0]
-                    }
-                    header = "  ".join(
-                        k.ljust(col_widths[k]) for k in relationships_data[0]
-                    )
-                    txtfile.write(header + "\n")
-                    txtfile.write("-" * len(header) + "\n")
-
-                    # Write rows
-                    for relationship in relationships_data:
-                        row = "  ".join(
-                            str(v).ljust(col_widths[k]) for k, v in relationship.items()
+                    if include_vector_data:
+                        relation_row["vector_data"] = str(
+                            next(
+                                (
+                                    records[id]
+                                    for id in relation_ids(src_entity, tgt_entity)
+                                    if id in records
+                                ),
+                                None,
+                            )
                         )
-                        txtfile.write(row + "\n")
-                else:
-                    txtfile.write("No relationship data available\n\n")
+                    writer.write_row(relation_row)
+            writer.end_table()
+
+            # --- Relationships (from VectorDB) ---
+            fieldnames = ["relationship_id", "data"]
+            if write_npy:
+                fieldnames.append("vector_index")
+                npy = NpyWriter(table_file_name(output_path, "relationships", ".npy"))
+            writer.start_table("Relationships", fieldnames)
+            async for batch in edge_batches():
+                records = await vector_records(
+                    self.relationships_vdb,
+                    [id for src, tgt, _ in batch for id in relation_ids(src, tgt)],
+                )
+                found = [
+                    next((id for id in relation_ids(src, tgt) if id in records), None)
+                    for src, tgt, _ in batch
+                ]
+                found = [id for id in found if id]
+                if write_npy:
+                    rows = await append_vectors(self.relationships_vdb, found, npy)
+                for i, id in enumerate(found):
+                    relationship_row = {"relationship_id": id, "data": str(records[id])}
+                    if write_npy:
+                        relationship_row["vector_index"] = rows[i]
+                    writer.write_row(relationship_row)
+            writer.end_table()
+            if write_npy:
+                npy.close()
+        finally:
+            writer.close()
 
-        else:
-            raise ValueError(
-                f"Unsupported file format: {file_format}. "
-                f"Choose from: csv, excel, md, txt"
-            )
-        if file_format is not None:
-            print(f"Data exported to: {output_path} with format: {file_format}")
-        else:
-            print("Data displayed as table format")
+        print(f"Data exported to: {output_path} with format: {file_format}")
 
     def export_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "parquet"] = "csv",
         include_vector_data: bool = False,
+        vector_format: Literal["str", "npy"] = "str",
+        batch_size: int = 1000,
     ) -> None:
         """
         Synchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "excel", "md", "txt", "parquet".
                 - csv: Comma-separated values file
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                - parquet: One Parquet file per table
             include_vector_data: Whether to include data from the vector database.
+            vector_format: "str" for vector database records as strings, "npy" to
+                also write the vectors to .npy files next to the output.
+            batch_size: Number of nodes or edges fetched from the storages at once.
         """
         try:
             loop = asyncio.get_event_loop()
@@ -2989,7 +3061,13 @@ class LightRAG:
             asyncio.set_event_loop(loop)
 
         loop.run_until_complete(
-            self.aexport_data(output_path, file_format, include_vector_data)
+            self.aexport_data(
+                output_path,
+                file_format,
+                include_vector_data,
+                vector_format,
+                batch_size,
+            )
         )
 
     def merge_entities(
@@ -0,0 +1,236 @@
+"""
+Shared, pooled HTTP clients for the LLM and embedding bindings.
+
+Creating a new SDK client for every completion or embedding call pays a new
+TCP/TLS handshake each time and leaves connection pools behind under high
+concurrency. The registry below keeps one client per (provider, base_url,
+api_key, config, event loop), backed by a keep-alive httpx connection pool
+(HTTP/2 when the `h2` package is installed), and records request and
+connection counts for each client.
+
+Pool limits can be tuned with environment variables:
+    LLM_HTTP_MAX_CONNECTIONS            max open connections per client (100)
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS  max idle connections kept open (20)
+    LLM_HTTP_KEEPALIVE_EXPIRY           seconds an idle connection is kept (30)
+    LLM_HTTP2                           use HTTP/2 if available (true)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import os
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import pipmaster as pm  # Pipmaster for dynamic library install
+
+if not pm.is_installed("httpx"):
+    pm.install("httpx")
+
+import httpx
+
+from lightrag.utils import logger
+
+
+@dataclass
+class ClientStats:
+    """Request and connection counters of one pooled client"""
+
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        """Share of requests served by an already open connection"""
+        if not self.requests:
+            return 0.0
+        return max(self.requests - self.connections_opened, 0) / self.requests
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "connection_reuse_ratio": self.connection_reuse_ratio}
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """httpx transport wrapper that updates ClientStats for every request"""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, stats: ClientStats):
+        self._transport = transport
+        self._stats = stats
+        self._seen_connections: weakref.WeakSet = weakref.WeakSet()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            self._count_connections()
+
+    def _count_connections(self) -> None:
+        pool = getattr(self._transport, "_pool", None)
+        for connection in getattr(pool, "connections", ()):
+            if connection not in self._seen_connections:
+                self._seen_connections.add(connection)
+                self._stats.connections_opened += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_enabled() -> bool:
+    wanted = os.getenv("LLM_HTTP2", "true").lower() in ("true", "1", "yes")
+    return wanted and importlib.util.find_spec("h2") is not None
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(
+            os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+        ),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 30)),
+    )
+
+
+def _config_key(config: dict[str, Any] | None) -> str:
+    return repr(sorted((config or {}).items(), key=lambda item: item[0]))
+
+
+class ClientRegistry:
+    """Caches SDK clients that share pooled httpx transports.
+
+    Clients are keyed by provider, base URL, API key, extra client config and
+    the running event loop, since httpx connections cannot be shared across
+    loops. LightRAG instances acquire the registry in initialize_storages and
+    release it in finalize_storages; the clients are closed when the last
+    instance releases it.
+    """
+
+    def __init__(self):
+        # key -> (client, stats, label, loop)
+        self._clients: dict[tuple, tuple[Any, ClientStats, str, Any]] = {}
+        self._users = 0
+
+    def _get(
+        self,
+        provider: str,
+        base_url: str | None,
+        api_key: str | None,
+        config: dict[str, Any] | None,
+        factory: Callable[[httpx.AsyncBaseTransport], Any],
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        # Clients of loops that are gone cannot be used or closed any more
+        for key in [k for k, v in self._clients.items() if v[3].is_closed()]:
+            del self._clients[key]
+
+        key = (provider, base_url, api_key, _config_key(config), id(loop))
+        entry = self._clients.get(key)
+        if entry is None:
+            stats = ClientStats()
+            transport = _CountingTransport(
+                httpx.AsyncHTTPTransport(http2=_http2_enabled(), limits=_pool_limits()),
+                stats,
+            )
+            # Stats are labelled without exposing the API key
+            key_hash = hashlib.md5((api_key or "").encode()).hexdigest()[:8]
+            label = f"{provider}:{base_url or 'default'}:{key_hash}"
+            entry = (factory(transport), stats, label, loop)
+            self._clients[key] = entry
+            logger.debug(f"Created pooled client {label}")
+        return entry[0]
+
+    def get_openai_client(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        client_configs: dict[str, Any] | None = None,
+    ):
+        """Return a cached AsyncOpenAI client for the given configuration"""
+        from lightrag.llm.openai import create_openai_async_client
+
+        if not api_key:
+            api_key = os.environ["OPENAI_API_KEY"]
+        if base_url is None:
+            base_url = os.environ["OPENAI_API_BASE"]
+
+        def factory(transport):
+            return create_openai_async_client(
+                api_key=api_key,
+                base_url=base_url,
+                client_configs={
+                    **(client_configs or {}),
+                    "http_client": httpx.AsyncClient(transport=transport),
+                },
+            )
+
+        return self._get("openai", base_url, api_key, client_configs, factory)
+
+    def get_ollama_client(
+        self,
+        host: str | None = None,
+        timeout: Any = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ):
+        """Return a cached ollama.AsyncClient for the given configuration"""
+        import ollama
+
+        config = {"timeout": timeout, "headers": headers, **kwargs}
+
+        def factory(transport):
+            return ollama.AsyncClient(
+                host=host,
+                timeout=timeout,
+                headers=headers,
+                transport=transport,
+                **kwargs,
+            )
+
+        return self._get("ollama", host, None, config, factory)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Request, in-flight and connection reuse counters of every client"""
+        return {label: stats.as_dict() for _, stats, label, _ in self._clients.values()}
+
+    def acquire(self) -> None:
+        self._users += 1
+
+    async def release(self) -> None:
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the clients that belong to the running event loop"""
+        loop = asyncio.get_running_loop()
+        for key, (client, _, label, client_loop) in list(self._clients.items()):
+            if client_loop is not loop and not client_loop.is_closed():
+                continue
+            del self._clients[key]
+            if client_loop.is_closed():
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled client {label}: {e}")
+
+
+client_registry = ClientRegistry()
+
+
+def get_client_stats() -> dict[str, dict[str, Any]]:
+    """Counters of the pooled LLM and embedding clients, keyed by client label"""
+    return client_registry.stats()
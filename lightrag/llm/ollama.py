@@ -28,6 +28,7 @@ from lightrag.exceptions import (
     APITimeoutError,
 )
 from lightrag.api import __api_version__
+from lightrag.llm.client_registry import client_registry
 
 import numpy as np
 from typing import Union
@@ -61,7 +62,9 @@ async def _ollama_model_if_cache(
     }
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
-    ollama_client = ollama.AsyncClient(host=host, timeout=timeout, headers=headers)
+    ollama_client = client_registry.get_ollama_client(
+        host=host, timeout=timeout, headers=headers
+    )
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
@@ -127,6 +130,6 @@ async def ollama_embed(texts: list[str], embed_model, **kwargs) -> np.ndarray:
     if api_key:
         headers["Authorization"] = api_key
     kwargs["headers"] = headers
-    ollama_client = ollama.Client(**kwargs)
-    data = ollama_client.embed(model=embed_model, input=texts)
+    ollama_client = client_registry.get_ollama_client(**kwargs)
+    data = await ollama_client.embed(model=embed_model, input=texts)
     return data["embeddings"]
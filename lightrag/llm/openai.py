@@ -32,6 +32,7 @@ from lightrag.utils import (
     logger,
 )
 from lightrag.types import GPTKeywordExtractionFormat
+from lightrag.llm.client_registry import client_registry
 from lightrag.api import __api_version__
 
 import numpy as np
@@ -140,8 +141,8 @@ async def openai_complete_if_cache(
     # Extract client configuration options
     client_configs = kwargs.pop("openai_client_configs", {})
 
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Reuse the pooled OpenAI client for this configuration
+    openai_async_client = client_registry.get_openai_client(
         api_key=api_key, base_url=base_url, client_configs=client_configs
     )
 
@@ -359,8 +360,8 @@ async def openai_embed(
         RateLimitError: If the OpenAI API rate limit is exceeded.
         APITimeoutError: If the OpenAI API request times out.
     """
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Reuse the pooled OpenAI client for this configuration
+    openai_async_client = client_registry.get_openai_client(
         api_key=api_key, base_url=base_url, client_configs=client_configs
     )
 
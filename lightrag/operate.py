@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import traceback
+from bisect import bisect_left, bisect_right
 import json
 import re
 import os
@@ -14,6 +15,7 @@ from .utils import (
     compute_mdhash_id,
     decode_tokens_by_tiktoken,
     encode_string_by_tiktoken,
+    token_char_offsets,
     is_float_regex,
     list_of_list_to_csv,
     pack_user_ass_to_openai_messages,
@@ -44,6 +46,32 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+def _token_windows(
+    content: str,
+    offsets: list[int],
+    token_start: int,
+    token_end: int,
+    char_start: int,
+    char_end: int,
+    overlap_token_size: int,
+    max_token_size: int,
+) -> list[tuple[int, int, str]]:
+    """Split tokens [token_start, token_end) of content into overlapping windows
+    as (token_start, token_end, text)
+
+    Window text is sliced from content at the token character offsets rather
+    than decoded from the token window; the first and last windows start and
+    end at char_start and char_end.
+    """
+    windows = []
+    for start in range(token_start, token_end, max_token_size - overlap_token_size):
+        end = min(start + max_token_size, token_end)
+        window_start = offsets[start] if start > token_start else char_start
+        window_end = offsets[end] if end < token_end else char_end
+        windows.append((start, end, content[window_start:window_end]))
+    return windows
+
+
 def chunking_by_token_size(
     content: str,
     split_by_character: str | None = None,
@@ -52,51 +80,47 @@ def chunking_by_token_size(
     max_token_size: int = 1024,
     tiktoken_model: str = "gpt-4o",
 ) -> list[dict[str, Any]]:
+    # The content is encoded once; token_start and token_end of every chunk index
+    # its tokens, whether or not it is split by character first
     tokens = encode_string_by_tiktoken(content, model_name=tiktoken_model)
-    results: list[dict[str, Any]] = []
+    offsets = token_char_offsets(tokens, model_name=tiktoken_model)
     if split_by_character:
-        raw_chunks = content.split(split_by_character)
-        new_chunks = []
-        if split_by_character_only:
-            for chunk in raw_chunks:
-                _tokens = encode_string_by_tiktoken(chunk, model_name=tiktoken_model)
-                new_chunks.append((len(_tokens), chunk))
-        else:
-            for chunk in raw_chunks:
-                _tokens = encode_string_by_tiktoken(chunk, model_name=tiktoken_model)
-                if len(_tokens) > max_token_size:
-                    for start in range(
-                        0, len(_tokens), max_token_size - overlap_token_size
-                    ):
-                        chunk_content = decode_tokens_by_tiktoken(
-                            _tokens[start : start + max_token_size],
-                            model_name=tiktoken_model,
-                        )
-                        new_chunks.append(
-                            (min(max_token_size, len(_tokens) - start), chunk_content)
-                        )
-                else:
-                    new_chunks.append((len(_tokens), chunk))
-        for index, (_len, chunk) in enumerate(new_chunks):
-            results.append(
-                {
-                    "tokens": _len,
-                    "content": chunk.strip(),
-                    "chunk_order_index": index,
-                }
-            )
+        pieces = []
+        char_start = 0
+        for piece in content.split(split_by_character):
+            pieces.append((char_start, char_start + len(piece)))
+            char_start += len(piece) + len(split_by_character)
     else:
-        for index, start in enumerate(
-            range(0, len(tokens), max_token_size - overlap_token_size)
+        pieces = [(0, len(content))]
+
+    results: list[dict[str, Any]] = []
+    for char_start, char_end in pieces:
+        # A token that straddles the start of the piece counts towards it
+        token_start = max(bisect_right(offsets, char_start) - 1, 0)
+        token_end = bisect_left(offsets, char_end)
+        if split_by_character and (
+            split_by_character_only or token_end - token_start <= max_token_size
         ):
-            chunk_content = decode_tokens_by_tiktoken(
-                tokens[start : start + max_token_size], model_name=tiktoken_model
+            windows = [(token_start, token_end, content[char_start:char_end])]
+        else:
+            windows = _token_windows(
+                content,
+                offsets,
+                token_start,
+                token_end,
+                char_start,
+                char_end,
+                overlap_token_size,
+                max_token_size,
             )
+        for start, end, chunk_content in windows:
             results.append(
                 {
-                    "tokens": min(max_token_size, len(tokens) - start),
+                    "tokens": end - start,
                     "content": chunk_content.strip(),
-                    "chunk_order_index": index,
+                    "chunk_order_index": len(results),
+                    "token_start": start,
+                    "token_end": end,
                 }
             )
     return results
@@ -386,18 +410,20 @@ async def _merge_edges_then_upsert(
         )
     )
 
-    for need_insert_id in [src_id, tgt_id]:
-        if not (await knowledge_graph_inst.has_node(need_insert_id)):
-            await knowledge_graph_inst.upsert_node(
-                need_insert_id,
-                node_data={
-                    "entity_id": need_insert_id,
-                    "source_id": source_id,
-                    "description": description,
-                    "entity_type": "UNKNOWN",
-                    "file_path": file_path,
-                },
-            )
+    existing_nodes = await knowledge_graph_inst.get_nodes_batch([src_id, tgt_id])
+    missing_nodes = {
+        need_insert_id: {
+            "entity_id": need_insert_id,
+            "source_id": source_id,
+            "description": description,
+            "entity_type": "UNKNOWN",
+            "file_path": file_path,
+        }
+        for need_insert_id in [src_id, tgt_id]
+        if need_insert_id not in existing_nodes
+    }
+    if missing_nodes:
+        await knowledge_graph_inst.upsert_nodes_batch(missing_nodes)
 
     force_llm_summary_on_merge = global_config["force_llm_summary_on_merge"]
 
@@ -463,6 +489,7 @@ async def extract_entities(
     pipeline_status: dict = None,
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
+    doc_chunk_index: BaseKVStorage | None = None,
 ) -> None:
     use_llm_func: callable = global_config["llm_model_func"]
     entity_extract_max_gleaning = global_config["entity_extract_max_gleaning"]
@@ -512,9 +539,7 @@ async def extract_entities(
     total_relations_count = 0
 
     # Get lock manager from shared storage
-    from .kg.shared_storage import get_graph_db_lock
-
-    graph_db_lock = get_graph_db_lock(enable_logging=False)
+    from .kg.shared_storage import get_graph_db_key_lock
 
     # Use the global use_llm_func_with_cache function from utils.py
 
@@ -664,47 +689,78 @@ async def extract_entities(
             sorted_edge_key = tuple(sorted(edge_key))
             all_edges[sorted_edge_key].extend(edges)
 
-    # Centralized processing of all nodes and edges
-    entities_data = []
-    relationships_data = []
+    # Merges of different entities/relations run concurrently; each one holds
+    # the locks of the graph keys it reads and writes, so updates of a single
+    # entity or relation stay atomic
+    merge_semaphore = asyncio.Semaphore(global_config.get("llm_model_max_async", 4))
+
+    def _node_key(entity_name: str) -> str:
+        return f"node:{entity_name}"
+
+    def _edge_keys(src_id: str, tgt_id: str) -> list[str]:
+        # Edge merges may also insert missing endpoint nodes
+        return [f"edge:{src_id}|{tgt_id}", _node_key(src_id), _node_key(tgt_id)]
+
+    async def _merge_node(entity_name: str, entities: list[dict]) -> None:
+        async with merge_semaphore:
+            async with get_graph_db_key_lock([_node_key(entity_name)]):
+                await _merge_nodes_then_upsert(
+                    entity_name,
+                    entities,
+                    knowledge_graph_inst,
+                    global_config,
+                    pipeline_status,
+                    pipeline_status_lock,
+                    llm_response_cache,
+                )
 
-    # Use graph database lock to ensure atomic merges and updates
-    async with graph_db_lock:
-        # Process and update all entities at once
-        for entity_name, entities in all_nodes.items():
-            entity_data = await _merge_nodes_then_upsert(
-                entity_name,
-                entities,
-                knowledge_graph_inst,
-                global_config,
-                pipeline_status,
-                pipeline_status_lock,
-                llm_response_cache,
-            )
-            entities_data.append(entity_data)
-
-        # Process and update all relationships at once
-        for edge_key, edges in all_edges.items():
-            edge_data = await _merge_edges_then_upsert(
-                edge_key[0],
-                edge_key[1],
-                edges,
-                knowledge_graph_inst,
-                global_config,
-                pipeline_status,
-                pipeline_status_lock,
-                llm_response_cache,
-            )
-            relationships_data.append(edge_data)
+    async def _merge_edge(edge_key: tuple[str, str], edges: list[dict]) -> None:
+        async with merge_semaphore:
+            async with get_graph_db_key_lock(_edge_keys(*edge_key)):
+                await _merge_edges_then_upsert(
+                    edge_key[0],
+                    edge_key[1],
+                    edges,
+                    knowledge_graph_inst,
+                    global_config,
+                    pipeline_status,
+                    pipeline_status_lock,
+                    llm_response_cache,
+                )
+
+    # Process and update all entities, then all relationships
+    await asyncio.gather(*[_merge_node(k, v) for k, v in all_nodes.items()])
+    await asyncio.gather(*[_merge_edge(k, v) for k, v in all_edges.items()])
+
+    # Another document may have merged the same keys meanwhile, so the vector
+    # databases are fed from the graph's current state while all touched keys
+    # are locked; this keeps them in step with the graph
+    touched_keys = [_node_key(name) for name in all_nodes]
+    for edge_key in all_edges:
+        touched_keys.extend(_edge_keys(*edge_key))
+    async with get_graph_db_key_lock(touched_keys):
+        nodes = await knowledge_graph_inst.get_nodes_batch(list(all_nodes))
+        entities_data = [
+            {**nodes[entity_name], "entity_name": entity_name}
+            for entity_name in all_nodes
+            if entity_name in nodes
+        ]
+
+        edges = await knowledge_graph_inst.get_edges_batch(list(all_edges))
+        relationships_data = [
+            {**edges[edge_key], "src_id": edge_key[0], "tgt_id": edge_key[1]}
+            for edge_key in all_edges
+            if edge_key in edges
+        ]
 
         # Update vector databases with all collected data
         if entity_vdb is not None and entities_data:
             data_for_vdb = {
                 compute_mdhash_id(dp["entity_name"], prefix="ent-"): {
                     "entity_name": dp["entity_name"],
-                    "entity_type": dp["entity_type"],
-                    "content": f"{dp['entity_name']}\n{dp['description']}",
-                    "source_id": dp["source_id"],
+                    "entity_type": dp.get("entity_type", "UNKNOWN"),
+                    "content": f"{dp['entity_name']}\n{dp.get('description', '')}",
+                    "source_id": dp.get("source_id", ""),
                     "file_path": dp.get("file_path", "unknown_source"),
                 }
                 for dp in entities_data
@@ -716,15 +772,45 @@ async def extract_entities(
                 compute_mdhash_id(dp["src_id"] + dp["tgt_id"], prefix="rel-"): {
                     "src_id": dp["src_id"],
                     "tgt_id": dp["tgt_id"],
-                    "keywords": dp["keywords"],
-                    "content": f"{dp['src_id']}\t{dp['tgt_id']}\n{dp['keywords']}\n{dp['description']}",
-                    "source_id": dp["source_id"],
+                    "keywords": dp.get("keywords", ""),
+                    "content": f"{dp['src_id']}\t{dp['tgt_id']}\n{dp.get('keywords', '')}\n{dp.get('description', '')}",
+                    "source_id": dp.get("source_id", ""),
                     "file_path": dp.get("file_path", "unknown_source"),
                 }
                 for dp in relationships_data
             }
             await relationships_vdb.upsert(data_for_vdb)
 
+    # Record what each chunk contributed, so deleting a document only has to
+    # visit its own entities and relations
+    if doc_chunk_index is not None:
+        doc_chunks: dict[str, dict[str, Any]] = defaultdict(dict)
+        for (chunk_key, chunk_dp), (maybe_nodes, maybe_edges) in zip(
+            ordered_chunks, chunk_results
+        ):
+            doc_id = chunk_dp.get("full_doc_id")
+            if doc_id is None:
+                continue
+            doc_chunks[doc_id][chunk_key] = {
+                "entities": sorted(maybe_nodes),
+                "relations": [
+                    list(edge)
+                    for edge in sorted({tuple(sorted(edge)) for edge in maybe_edges})
+                ],
+            }
+        if doc_chunks:
+            # Looked up one by one: backends differ in whether get_by_ids keeps
+            # the order of the ids and pads missing records with None
+            existing = await asyncio.gather(
+                *(doc_chunk_index.get_by_id(doc_id) for doc_id in doc_chunks)
+            )
+            await doc_chunk_index.upsert(
+                {
+                    doc_id: {"chunks": {**(old or {}).get("chunks", {}), **chunks}}
+                    for (doc_id, chunks), old in zip(doc_chunks.items(), existing)
+                }
+            )
+
     # Update total counts
     total_entities_count = len(entities_data)
     total_relations_count = len(relationships_data)
@@ -1305,22 +1391,19 @@ async def _get_node_data(
     if not len(results):
         return "", "", ""
     # get entity information
-    node_datas, node_degrees = await asyncio.gather(
-        asyncio.gather(
-            *[knowledge_graph_inst.get_node(r["entity_name"]) for r in results]
-        ),
-        asyncio.gather(
-            *[knowledge_graph_inst.node_degree(r["entity_name"]) for r in results]
-        ),
+    entity_names = [r["entity_name"] for r in results]
+    nodes, node_degrees = await asyncio.gather(
+        knowledge_graph_inst.get_nodes_batch(entity_names),
+        knowledge_graph_inst.node_degrees_batch(entity_names),
     )
 
-    if not all([n is not None for n in node_datas]):
+    if len(nodes) < len(set(entity_names)):
         logger.warning("Some nodes are missing, maybe the storage is damaged")
 
     node_datas = [
-        {**n, "entity_name": k["entity_name"], "rank": d}
-        for k, n, d in zip(results, node_datas, node_degrees)
-        if n is not None
+        {**nodes[name], "entity_name": name, "rank": node_degrees.get(name, 0)}
+        for name in entity_names
+        if name in nodes
     ]  # what is this text_chunks_db doing.  dont remember it in airvx.  check the diagram.
     # get entitytext chunk
     use_text_units, use_relations = await asyncio.gather(
@@ -1436,24 +1519,24 @@ async def _find_most_related_text_unit_from_entities(
         for dp in node_datas
         if dp["source_id"] is not None
     ]
-    edges = await asyncio.gather(
-        *[knowledge_graph_inst.get_node_edges(dp["entity_name"]) for dp in node_datas]
+    nodes_edges = await knowledge_graph_inst.get_nodes_edges_batch(
+        [dp["entity_name"] for dp in node_datas]
     )
+    edges = [nodes_edges.get(dp["entity_name"], []) for dp in node_datas]
     all_one_hop_nodes = set()
     for this_edges in edges:
         if not this_edges:
             continue
         all_one_hop_nodes.update([e[1] for e in this_edges])
 
-    all_one_hop_nodes = list(all_one_hop_nodes)
-    all_one_hop_nodes_data = await asyncio.gather(
-        *[knowledge_graph_inst.get_node(e) for e in all_one_hop_nodes]
+    all_one_hop_nodes_data = await knowledge_graph_inst.get_nodes_batch(
+        list(all_one_hop_nodes)
     )
 
     # Add null check for node data
     all_one_hop_text_units_lookup = {
         k: set(split_string_by_multi_markers(v["source_id"], [GRAPH_FIELD_SEP]))
-        for k, v in zip(all_one_hop_nodes, all_one_hop_nodes_data)
+        for k, v in all_one_hop_nodes_data.items()
         if v is not None and "source_id" in v  # Add source_id check
     }
 
@@ -1526,29 +1609,27 @@ async def _find_most_related_edges_from_entities(
     query_param: QueryParam,
     knowledge_graph_inst: BaseGraphStorage,
 ):
-    all_related_edges = await asyncio.gather(
-        *[knowledge_graph_inst.get_node_edges(dp["entity_name"]) for dp in node_datas]
+    all_related_edges = await knowledge_graph_inst.get_nodes_edges_batch(
+        [dp["entity_name"] for dp in node_datas]
     )
     all_edges = []
     seen = set()
 
-    for this_edges in all_related_edges:
-        for e in this_edges:
+    for dp in node_datas:
+        for e in all_related_edges.get(dp["entity_name"], []):
             sorted_edge = tuple(sorted(e))
             if sorted_edge not in seen:
                 seen.add(sorted_edge)
                 all_edges.append(sorted_edge)
 
     all_edges_pack, all_edges_degree = await asyncio.gather(
-        asyncio.gather(*[knowledge_graph_inst.get_edge(e[0], e[1]) for e in all_edges]),
-        asyncio.gather(
-            *[knowledge_graph_inst.edge_degree(e[0], e[1]) for e in all_edges]
-        ),
+        knowledge_graph_inst.get_edges_batch(all_edges),
+        knowledge_graph_inst.edge_degrees_batch(all_edges),
     )
     all_edges_data = [
-        {"src_tgt": k, "rank": d, **v}
-        for k, v, d in zip(all_edges, all_edges_pack, all_edges_degree)
-        if v is not None
+        {"src_tgt": k, "rank": all_edges_degree.get(k, 0), **all_edges_pack[k]}
+        for k in all_edges
+        if k in all_edges_pack
     ]
     all_edges_data = sorted(
         all_edges_data, key=lambda x: (x["rank"], x["weight"]), reverse=True
@@ -1584,28 +1665,22 @@ async def _get_edge_data(
     if not len(results):
         return "", "", ""
 
-    edge_datas, edge_degree = await asyncio.gather(
-        asyncio.gather(
-            *[knowledge_graph_inst.get_edge(r["src_id"], r["tgt_id"]) for r in results]
-        ),
-        asyncio.gather(
-            *[
-                knowledge_graph_inst.edge_degree(r["src_id"], r["tgt_id"])
-                for r in results
-            ]
-        ),
+    pairs = [(r["src_id"], r["tgt_id"]) for r in results]
+    edges, edge_degrees = await asyncio.gather(
+        knowledge_graph_inst.get_edges_batch(pairs),
+        knowledge_graph_inst.edge_degrees_batch(pairs),
     )
 
     edge_datas = [
         {
             "src_id": k["src_id"],
             "tgt_id": k["tgt_id"],
-            "rank": d,
+            "rank": edge_degrees.get(pair, 0),
             "created_at": k.get("__created_at__", None),
-            **v,
+            **edges[pair],
         }
-        for k, v, d in zip(results, edge_datas, edge_degree)
-        if v is not None
+        for k, pair in zip(results, pairs)
+        if pair in edges
     ]
     edge_datas = sorted(
         edge_datas, key=lambda x: (x["rank"], x["weight"]), reverse=True
@@ -1712,24 +1787,14 @@ async def _find_most_related_entities_from_relationships(
             entity_names.append(e["tgt_id"])
             seen.add(e["tgt_id"])
 
-    node_datas, node_degrees = await asyncio.gather(
-        asyncio.gather(
-            *[
-                knowledge_graph_inst.get_node(entity_name)
-                for entity_name in entity_names
-            ]
-        ),
-        asyncio.gather(
-            *[
-                knowledge_graph_inst.node_degree(entity_name)
-                for entity_name in entity_names
-            ]
-        ),
+    nodes, node_degrees = await asyncio.gather(
+        knowledge_graph_inst.get_nodes_batch(entity_names),
+        knowledge_graph_inst.node_degrees_batch(entity_names),
     )
     node_datas = [
-        {**n, "entity_name": k, "rank": d}
-        for k, n, d in zip(entity_names, node_datas, node_degrees)
-        if n is not None
+        {**nodes[k], "entity_name": k, "rank": node_degrees.get(k, 0)}
+        for k in entity_names
+        if k in nodes
     ]
 
     len_node_datas = len(node_datas)
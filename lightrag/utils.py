@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import html
 import io
 import csv
@@ -9,6 +10,8 @@ import logging
 import logging.handlers
 import os
 import re
+import time
+import weakref
 from dataclasses import dataclass
 from functools import wraps
 from hashlib import md5
@@ -289,6 +292,147 @@ def limit_async_func_call(max_size: int):
     return final_decro
 
 
+class Histogram:
+    """Bucketed histogram of observed values, e.g. batch sizes or latencies"""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = tuple(bounds)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": dict(zip(labels, self.bucket_counts)),
+        }
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent small embedding calls into batched provider calls.
+
+    Calls with fewer than max_batch_size texts are queued. The queue is sent as
+    one request when it holds max_batch_size distinct texts, or max_wait seconds
+    after the first text arrived. Identical texts within a batch are embedded
+    once, and every caller receives the rows for its own texts. Larger calls,
+    and calls with extra keyword arguments, go straight to the wrapped function.
+    """
+
+    def __init__(
+        self, func: Callable, max_batch_size: int = 32, max_wait: float = 0.005
+    ):
+        self.func = func
+        self.embedding_dim = getattr(func, "embedding_dim", None)
+        self.max_token_size = getattr(func, "max_token_size", None)
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait
+        # text -> futures of every caller waiting for it
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._pending_since: float | None = None
+        self._flush_handle: asyncio.Handle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self.requested_texts = 0
+        self.embedded_texts = 0
+        self.batch_size = Histogram((1, 2, 4, 8, 16, 32, 64, 128))
+        self.flush_latency = Histogram(
+            (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+        )
+
+    def __deepcopy__(self, memo):
+        # Shared by every storage; asdict(LightRAG) must not copy the queue
+        return self
+
+    async def __call__(self, texts: list[str], **kwargs) -> np.ndarray:
+        if kwargs or not texts or len(texts) >= self.max_batch_size:
+            return await self.func(texts, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.setdefault(text, []).append(future)
+            futures.append(future)
+        self.requested_texts += len(texts)
+        if self._pending_since is None:
+            self._pending_since = time.perf_counter()
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, 0)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, self.max_wait)
+
+        return np.array(await asyncio.gather(*futures))
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if delay > 0:
+            self._flush_handle = loop.call_later(delay, self._start_flush)
+        else:
+            self._flush_handle = loop.call_soon(self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        if not self._pending:
+            return
+        items = list(self._pending.items())
+        batch, rest = items[: self.max_batch_size], items[self.max_batch_size :]
+        self._pending = dict(rest)
+        started = self._pending_since
+        self._pending_since = time.perf_counter() if rest else None
+        loop = asyncio.get_running_loop()
+        if rest:
+            full = len(rest) >= self.max_batch_size
+            self._schedule_flush(loop, 0 if full else self.max_wait)
+
+        task = loop.create_task(self._flush(batch, started))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(
+        self, batch: list[tuple[str, list[asyncio.Future]]], started: float
+    ) -> None:
+        try:
+            embeddings = await self.func([text for text, _ in batch])
+        except asyncio.CancelledError:
+            for _, waiters in batch:
+                for future in waiters:
+                    future.cancel()
+            raise
+        except Exception as e:
+            for _, waiters in batch:
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        finally:
+            self.batch_size.observe(len(batch))
+            self.flush_latency.observe(time.perf_counter() - started)
+
+        self.embedded_texts += len(batch)
+        for (_, waiters), embedding in zip(batch, embeddings):
+            for future in waiters:
+                # Callers that were cancelled meanwhile are skipped
+                if not future.done():
+                    future.set_result(embedding)
+
+    def stats(self) -> dict[str, Any]:
+        """Coalescing counters plus batch size and flush latency histograms"""
+        return {
+            "requested_texts": self.requested_texts,
+            "embedded_texts": self.embedded_texts,
+            "batch_size": self.batch_size.as_dict(),
+            "flush_latency_seconds": self.flush_latency.as_dict(),
+        }
+
+
 def wrap_embedding_func_with_attrs(**kwargs):
     """Wrap a function with attributes"""
 
@@ -319,6 +463,19 @@ def encode_string_by_tiktoken(content: str, model_name: str = "gpt-4o"):
     return tokens
 
 
+def token_char_offsets(tokens: list[int], model_name: str = "gpt-4o") -> list[int]:
+    """Character offset at which each token starts in the text it was encoded from
+
+    Lets callers cut token windows out of the original string by slicing instead
+    of decoding every window again.
+    """
+    global ENCODER
+    if ENCODER is None:
+        ENCODER = tiktoken.encoding_for_model(model_name)
+    _, offsets = ENCODER.decode_with_offsets(tokens)
+    return offsets
+
+
 def decode_tokens_by_tiktoken(tokens: list[int], model_name: str = "gpt-4o"):
     global ENCODER
     if ENCODER is None:
@@ -509,6 +666,234 @@ def process_combine_contexts(hl: str, ll: str):
     return combined_sources_result
 
 
+class SemanticCacheIndex:
+    """Query embeddings of one LLM cache mode, held as one contiguous matrix.
+
+    Rows keep the uint8 quantization used in the KV store together with their
+    per-row offset (min) and scale, so the best match for a query is found
+    with one chunked matrix-vector product instead of decoding every entry.
+    Entries older than ttl seconds are ignored and evicted, and the least
+    recently used entries are evicted beyond max_entries.
+    """
+
+    # Rows dequantized per step of the lookup, to bound temporary memory
+    _LOOKUP_CHUNK = 4096
+
+    def __init__(self, max_entries: int = 10000, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Version of the cache mode record the index reflects (see get_version)
+        self.version: int | None = None
+        self.built_at = time.monotonic()
+        self.size = 0
+        self.ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._allocate(0, 16)
+
+    def _allocate(self, dim: int, capacity: int) -> None:
+        self.dim = dim
+        self.matrix = np.zeros((capacity, dim), dtype=np.uint8)
+        self.offsets = np.zeros(capacity, dtype=np.float32)
+        self.scales = np.zeros(capacity, dtype=np.float32)
+        self.norms = np.zeros(capacity, dtype=np.float32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.cache_types = np.empty(capacity, dtype=object)
+
+    def _grow(self) -> None:
+        capacity = len(self.offsets) * 2
+        for name in (
+            "matrix",
+            "offsets",
+            "scales",
+            "norms",
+            "created",
+            "last_used",
+            "cache_types",
+        ):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            if old.dtype == object:
+                new = np.empty(capacity, dtype=object)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def add(
+        self,
+        cache_id: str,
+        quantized: np.ndarray,
+        min_val: float,
+        max_val: float,
+        cache_type: str | None = None,
+        created: float | None = None,
+    ) -> None:
+        quantized = np.asarray(quantized, dtype=np.uint8).reshape(-1)
+        if self.size == 0 or quantized.shape[0] != self.dim:
+            # First entry, or the embedding model changed: start a new matrix
+            if self.size and quantized.shape[0] != self.dim:
+                logger.info("Embedding size changed, resetting semantic cache index")
+            self.size = 0
+            self.ids = []
+            self._positions = {}
+            self._allocate(quantized.shape[0], len(self.offsets))
+        self.remove([cache_id])
+        if self.size == len(self.offsets):
+            self._grow()
+
+        i = self.size
+        scale = (max_val - min_val) / 255
+        self.matrix[i] = quantized
+        self.offsets[i] = min_val
+        self.scales[i] = scale
+        self.norms[i] = np.linalg.norm(quantized * np.float32(scale) + min_val)
+        self.created[i] = created if created is not None else time.time()
+        self.last_used[i] = self.created[i]
+        self.cache_types[i] = cache_type
+        self.ids.append(cache_id)
+        self._positions[cache_id] = i
+        self.size += 1
+
+    def remove(self, cache_ids: list[str]) -> None:
+        for cache_id in cache_ids:
+            i = self._positions.pop(cache_id, None)
+            if i is None:
+                continue
+            # Move the last row into the hole to keep the matrix contiguous
+            last = self.size - 1
+            if i != last:
+                for array in (
+                    self.matrix,
+                    self.offsets,
+                    self.scales,
+                    self.norms,
+                    self.created,
+                    self.last_used,
+                    self.cache_types,
+                ):
+                    array[i] = array[last]
+                self.ids[i] = self.ids[last]
+                self._positions[self.ids[i]] = i
+            self.ids.pop()
+            self.size -= 1
+
+    def best_match(
+        self, embedding: np.ndarray, cache_type: str | None = None
+    ) -> tuple[str, float] | None:
+        """Return (cache_id, cosine similarity) of the closest live entry"""
+        n = self.size
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if n == 0 or query.shape[0] != self.dim:
+            return None
+
+        now = time.time()
+        valid = np.ones(n, dtype=bool)
+        if cache_type:
+            valid &= self.cache_types[:n] == cache_type
+        if self.ttl:
+            valid &= self.created[:n] >= now - self.ttl
+        if not valid.any():
+            return None
+
+        # cos(q, row) with row = quantized * scale + offset, without decoding rows
+        query_sum = query.sum()
+        query_norm = np.linalg.norm(query)
+        similarities = np.empty(n, dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for start in range(0, n, self._LOOKUP_CHUNK):
+                end = min(start + self._LOOKUP_CHUNK, n)
+                dots = self.matrix[start:end].astype(np.float32) @ query
+                similarities[start:end] = (
+                    self.scales[start:end] * dots + self.offsets[start:end] * query_sum
+                ) / (self.norms[start:end] * query_norm)
+        similarities[~valid | np.isnan(similarities)] = -np.inf
+
+        best = int(np.argmax(similarities))
+        self.last_used[best] = now
+        return self.ids[best], float(similarities[best])
+
+    def evict(self) -> list[str]:
+        """Drop expired and least recently used entries, returning their ids"""
+        n = self.size
+        evicted = []
+        if self.ttl:
+            expired = np.nonzero(self.created[:n] < time.time() - self.ttl)[0]
+            evicted.extend(self.ids[i] for i in expired)
+        overflow = n - len(evicted) - self.max_entries
+        if overflow > 0:
+            order = np.argsort(self.last_used[:n], kind="stable")
+            evicted_set = set(evicted)
+            for i in order:
+                if overflow == 0:
+                    break
+                if self.ids[i] not in evicted_set:
+                    evicted.append(self.ids[i])
+                    overflow -= 1
+        self.remove(evicted)
+        return evicted
+
+
+# id(hashing_kv) -> {mode: SemanticCacheIndex}
+_semantic_cache_indexes: dict[int, dict[str, SemanticCacheIndex]] = {}
+
+
+def _semantic_cache_config(hashing_kv) -> dict[str, Any]:
+    return hashing_kv.global_config.get("embedding_cache_config") or {}
+
+
+async def _cache_mode_version(hashing_kv, mode: str) -> int | None:
+    if exists_func(hashing_kv, "get_version"):
+        return await hashing_kv.get_version(mode)
+    return None
+
+
+def _semantic_cache_index_is_stale(
+    hashing_kv, index: SemanticCacheIndex, version: int | None
+) -> bool:
+    if version is not None:
+        return version != index.version
+    # Without versions, reload what other workers cached now and then
+    refresh_interval = _semantic_cache_config(hashing_kv).get(
+        "index_refresh_interval", 60
+    )
+    return (
+        refresh_interval is not None
+        and time.monotonic() - index.built_at > refresh_interval
+    )
+
+
+async def get_semantic_cache_index(hashing_kv, mode: str) -> SemanticCacheIndex:
+    """Return the index of a cache mode, building it from the KV store.
+
+    Indexes follow the writes of this process (see save_to_cache) and are rebuilt
+    when the version of the mode record shows that another process wrote, or,
+    for KV storages without versions, every index_refresh_interval seconds.
+    """
+    indexes = _semantic_cache_indexes.get(id(hashing_kv))
+    if indexes is None:
+        indexes = _semantic_cache_indexes[id(hashing_kv)] = {}
+        weakref.finalize(hashing_kv, _semantic_cache_indexes.pop, id(hashing_kv), None)
+    # Read before the records, so a write in between only causes another rebuild
+    version = await _cache_mode_version(hashing_kv, mode)
+    index = indexes.get(mode)
+    if index is None or _semantic_cache_index_is_stale(hashing_kv, index, version):
+        config = _semantic_cache_config(hashing_kv)
+        index = SemanticCacheIndex(config.get("max_entries", 10000), config.get("ttl"))
+        index.version = version
+        for cache_id, cache_data in (await hashing_kv.get_by_id(mode) or {}).items():
+            if not isinstance(cache_data, dict) or cache_data.get("embedding") is None:
+                continue
+            index.add(
+                cache_id,
+                np.frombuffer(bytes.fromhex(cache_data["embedding"]), dtype=np.uint8),
+                cache_data["embedding_min"],
+                cache_data["embedding_max"],
+                cache_data.get("cache_type"),
+                cache_data.get("create_time"),
+            )
+        indexes[mode] = index
+    return index
+
+
 async def get_best_cached_response(
     hashing_kv,
     current_embedding,
@@ -522,96 +907,77 @@ async def get_best_cached_response(
     logger.debug(
         f"get_best_cached_response:  mode={mode} cache_type={cache_type} use_llm_check={use_llm_check}"
     )
-    mode_cache = await hashing_kv.get_by_id(mode)
-    if not mode_cache:
+    index = await get_semantic_cache_index(hashing_kv, mode)
+    match = index.best_match(current_embedding, cache_type)
+    if match is None:
+        return None
+    best_cache_id, best_similarity = match
+    if best_similarity <= similarity_threshold:
         return None
 
-    best_similarity = -1
-    best_response = None
-    best_prompt = None
-    best_cache_id = None
-
-    # Only iterate through cache entries for this mode
-    for cache_id, cache_data in mode_cache.items():
-        # Skip if cache_type doesn't match
-        if cache_type and cache_data.get("cache_type") != cache_type:
-            continue
-
-        if cache_data["embedding"] is None:
-            continue
-
-        # Convert cached embedding list to ndarray
-        cached_quantized = np.frombuffer(
-            bytes.fromhex(cache_data["embedding"]), dtype=np.uint8
-        ).reshape(cache_data["embedding_shape"])
-        cached_embedding = dequantize_embedding(
-            cached_quantized,
-            cache_data["embedding_min"],
-            cache_data["embedding_max"],
+    if exists_func(hashing_kv, "get_by_mode_and_id"):
+        mode_cache = await hashing_kv.get_by_mode_and_id(mode, best_cache_id) or {}
+    else:
+        mode_cache = await hashing_kv.get_by_id(mode) or {}
+    cache_data = mode_cache.get(best_cache_id)
+    if cache_data is None:
+        # Removed from the store by another process
+        index.remove([best_cache_id])
+        return None
+    best_response = cache_data["return"]
+    best_prompt = cache_data["original_prompt"]
+
+    # If LLM check is enabled and all required parameters are provided
+    if (
+        use_llm_check
+        and llm_func
+        and original_prompt
+        and best_prompt
+        and best_response is not None
+    ):
+        compare_prompt = PROMPTS["similarity_check"].format(
+            original_prompt=original_prompt, cached_prompt=best_prompt
         )
 
-        similarity = cosine_similarity(current_embedding, cached_embedding)
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_response = cache_data["return"]
-            best_prompt = cache_data["original_prompt"]
-            best_cache_id = cache_id
-
-    if best_similarity > similarity_threshold:
-        # If LLM check is enabled and all required parameters are provided
-        if (
-            use_llm_check
-            and llm_func
-            and original_prompt
-            and best_prompt
-            and best_response is not None
-        ):
-            compare_prompt = PROMPTS["similarity_check"].format(
-                original_prompt=original_prompt, cached_prompt=best_prompt
-            )
-
-            try:
-                llm_result = await llm_func(compare_prompt)
-                llm_result = llm_result.strip()
-                llm_similarity = float(llm_result)
-
-                # Replace vector similarity with LLM similarity score
-                best_similarity = llm_similarity
-                if best_similarity < similarity_threshold:
-                    log_data = {
-                        "event": "cache_rejected_by_llm",
-                        "type": cache_type,
-                        "mode": mode,
-                        "original_question": original_prompt[:100] + "..."
-                        if len(original_prompt) > 100
-                        else original_prompt,
-                        "cached_question": best_prompt[:100] + "..."
-                        if len(best_prompt) > 100
-                        else best_prompt,
-                        "similarity_score": round(best_similarity, 4),
-                        "threshold": similarity_threshold,
-                    }
-                    logger.debug(json.dumps(log_data, ensure_ascii=False))
-                    logger.info(f"Cache rejected by LLM(mode:{mode} tpye:{cache_type})")
-                    return None
-            except Exception as e:  # Catch all possible exceptions
-                logger.warning(f"LLM similarity check failed: {e}")
-                return None  # Return None directly when LLM check fails
-
-        prompt_display = (
-            best_prompt[:50] + "..." if len(best_prompt) > 50 else best_prompt
-        )
-        log_data = {
-            "event": "cache_hit",
-            "type": cache_type,
-            "mode": mode,
-            "similarity": round(best_similarity, 4),
-            "cache_id": best_cache_id,
-            "original_prompt": prompt_display,
-        }
-        logger.debug(json.dumps(log_data, ensure_ascii=False))
-        return best_response
-    return None
+        try:
+            llm_result = await llm_func(compare_prompt)
+            llm_result = llm_result.strip()
+            llm_similarity = float(llm_result)
+
+            # Replace vector similarity with LLM similarity score
+            best_similarity = llm_similarity
+            if best_similarity < similarity_threshold:
+                log_data = {
+                    "event": "cache_rejected_by_llm",
+                    "type": cache_type,
+                    "mode": mode,
+                    "original_question": original_prompt[:100] + "..."
+                    if len(original_prompt) > 100
+                    else original_prompt,
+                    "cached_question": best_prompt[:100] + "..."
+                    if len(best_prompt) > 100
+                    else best_prompt,
+                    "similarity_score": round(best_similarity, 4),
+                    "threshold": similarity_threshold,
+                }
+                logger.debug(json.dumps(log_data, ensure_ascii=False))
+                logger.info(f"Cache rejected by LLM(mode:{mode} tpye:{cache_type})")
+                return None
+        except Exception as e:  # Catch all possible exceptions
+            logger.warning(f"LLM similarity check failed: {e}")
+            return None  # Return None directly when LLM check fails
+
+    prompt_display = best_prompt[:50] + "..." if len(best_prompt) > 50 else best_prompt
+    log_data = {
+        "event": "cache_hit",
+        "type": cache_type,
+        "mode": mode,
+        "similarity": round(best_similarity, 4),
+        "cache_id": best_cache_id,
+        "original_prompt": prompt_display,
+    }
+    logger.debug(json.dumps(log_data, ensure_ascii=False))
+    return best_response
 
 
 def cosine_similarity(v1, v2):
@@ -759,6 +1125,7 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
             return
 
     # Update cache with new content
+    now = int(time.time())
     mode_cache[cache_data.args_hash] = {
         "return": cache_data.content,
         "cache_type": cache_data.cache_type,
@@ -771,11 +1138,33 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
         "embedding_min": cache_data.min_val,
         "embedding_max": cache_data.max_val,
         "original_prompt": cache_data.prompt,
+        "create_time": now,
     }
 
+    # Keep the semantic index in sync, and evict expired or excess entries
+    index = None
+    if cache_data.quantized is not None:
+        index = await get_semantic_cache_index(hashing_kv, cache_data.mode)
+        version = index.version
+        index.add(
+            cache_data.args_hash,
+            cache_data.quantized,
+            cache_data.min_val,
+            cache_data.max_val,
+            cache_data.cache_type,
+            now,
+        )
+        for cache_id in index.evict():
+            mode_cache.pop(cache_id, None)
+
     # Only upsert if there's actual new content
     await hashing_kv.upsert({cache_data.mode: mode_cache})
 
+    if index is not None and version is not None:
+        # The index stays current if this upsert was the only change meanwhile
+        new_version = await _cache_mode_version(hashing_kv, cache_data.mode)
+        index.version = new_version if new_version == version + 1 else None
+
 
 def safe_unicode_decode(content):
     # Regular expression to find all Unicode escape sequences of the form \uXXXX
@@ -1057,6 +1446,8 @@ class TokenTracker:
         self.completion_tokens = 0
         self.total_tokens = 0
         self.call_count = 0
+        self.embedding_cache_hits = 0
+        self.embedding_cache_misses = 0
 
     def add_usage(self, token_counts):
         """Add token usage from one LLM call.
@@ -1077,6 +1468,11 @@ class TokenTracker:
 
         self.call_count += 1
 
+    def add_embedding_cache_usage(self, hits: int, misses: int):
+        """Add embedding cache hits and misses from one embedding call."""
+        self.embedding_cache_hits += hits
+        self.embedding_cache_misses += misses
+
     def get_usage(self):
         """Get current usage statistics."""
         return {
@@ -1084,6 +1480,8 @@ class TokenTracker:
             "completion_tokens": self.completion_tokens,
             "total_tokens": self.total_tokens,
             "call_count": self.call_count,
+            "embedding_cache_hits": self.embedding_cache_hits,
+            "embedding_cache_misses": self.embedding_cache_misses,
         }
 
     def __str__(self):
@@ -1092,5 +1490,7 @@ class TokenTracker:
             f"LLM call count: {usage['call_count']}, "
             f"Prompt tokens: {usage['prompt_tokens']}, "
             f"Completion tokens: {usage['completion_tokens']}, "
-            f"Total tokens: {usage['total_tokens']}"
+            f"Total tokens: {usage['total_tokens']}, "
+            f"Embedding cache hits/misses: "
+            f"{usage['embedding_cache_hits']}/{usage['embedding_cache_misses']}"
         )
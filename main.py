@@ -9,47 +9,33 @@ def print_step_header(step: str):
     print(f"Step: {step}")
     print("="*50 + "\n")
 
-async def run_step(step_name: str, command: str) -> bool:
-    """Run a pipeline step and handle errors"""
-    print_step_header(step_name)
-    try:
-        if os.system(command) == 0:
-            print(f"\n✅ {step_name} completed successfully!")
-            return True
-        else:
-            print(f"\n❌ {step_name} failed. Would you like to retry? (y/n): ")
-            if input().lower().strip() == 'y':
-                return await run_step(step_name, command)
-            return False
-    except Exception as e:
-        print(f"\n❌ Error in {step_name}: {e}", file=sys.stderr)
-        return False
-
 async def process_new_videos():
     """Process pipeline for adding new videos"""
     print("\nStarting pipeline to add new videos...")
-    
-    # Step 1: YouTube Link Extraction
-    if await run_step("YouTube Link Extraction", "python ylink_extract.py"):
-        # Verify youtube_urls.txt exists
-        if not os.path.exists("youtube_urls.txt"):
-            print("❌ Error: youtube_urls.txt not found. Cannot continue.", file=sys.stderr)
-            return
+    print_step_header("YouTube Link Extraction → Transcripts → RAG Processing")
 
-        # Step 2: Transcript Extraction
-        print("\nProceeding with transcript extraction...")
-        if await run_step("Transcript Extraction", "python transcript.py"):
-            # Step 3: RAG Processing
-            print("\nProceeding with RAG processing...")
-            if await run_step("RAG Processing", "python youtuberag.py"):
-                print("\n🎉 Pipeline completed successfully!")
-                print("You can now query the database.")
-                return True
-            else:
-                print("\n⚠️ RAG processing failed. Cannot proceed.")
-        else:
-            print("\n⚠️ Transcript extraction failed. Cannot proceed with RAG processing.")
-    return False
+    # Imported here so the menu starts without loading LightRAG
+    import ylink_extract
+    import youtuberag
+    from pipeline import StreamingPipeline
+
+    rag = await youtuberag.initialize_rag()
+    try:
+        pipeline = StreamingPipeline(
+            ingest=lambda documents: youtuberag.ingest_documents(rag, documents),
+            discover=ylink_extract.main,
+        )
+        await pipeline.run()
+        pipeline.report()
+    except Exception as e:
+        print(f"\n❌ Pipeline failed: {e}", file=sys.stderr)
+        return False
+    finally:
+        await rag.finalize_storages()
+
+    print("\n🎉 Pipeline completed successfully!")
+    print("You can now query the database.")
+    return True
 
 async def query_existing_data():
     """Query existing RAG database"""
@@ -58,10 +44,14 @@ async def query_existing_data():
         return False
     
     print("\nStarting query interface...")
-    if await run_step("Query Interface", "python yrag_query.py"):
+    print_step_header("Query Interface")
+    import yrag_query
+
+    try:
+        await yrag_query.interactive_chat()
         return True
-    else:
-        print("\n⚠️ Failed to start query interface.")
+    except Exception as e:
+        print(f"\n⚠️ Failed to start query interface: {e}", file=sys.stderr)
         return False
 
 async def main():
@@ -0,0 +1,206 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from transcript import AlternativeTranscriptExtractor
+from video_catalog import extract_video_id
+from youtuberag import video_document
+
+# Marks the end of a stage's output queue
+_DONE = object()
+
+
+class StageStats:
+    """Item count and timing for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def start(self) -> None:
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    def record(self, items: int, busy: float, failed: int = 0) -> None:
+        self.items += items
+        self.failed += failed
+        self.busy += busy
+
+    def summary(self) -> str:
+        wall = (self.finished or time.perf_counter()) - (self.started or 0)
+        rate = self.items / wall if self.started and wall > 0 else 0.0
+        line = (
+            f"{self.name}: {self.items} items in {wall:.1f}s "
+            f"({rate:.2f}/s, {self.busy:.1f}s busy)"
+        )
+        if self.failed:
+            line += f", {self.failed} failed"
+        return line
+
+
+class StreamingPipeline:
+    """Runs link discovery, transcript fetching and RAG ingestion in one process.
+
+    Stages are connected by asyncio queues, so transcripts are fetched as soon
+    as videos are discovered and ingested as soon as their transcript arrives,
+    while earlier videos are still being chunked and extracted.
+    """
+
+    def __init__(
+        self,
+        ingest: Callable[[dict], Awaitable[dict]],
+        discover: Optional[Callable[[Callable[[List[dict]], None]], None]] = None,
+        extractor: Optional[AlternativeTranscriptExtractor] = None,
+        ingest_batch_size: int = 8,
+    ):
+        """
+        Args:
+            ingest: Coroutine function taking {doc_id: (content, url)}, e.g.
+                youtuberag.ingest_documents bound to a LightRAG instance
+            discover: Blocking function run in a worker thread; it is passed a
+                callback to call with each batch of discovered {"title", "url"}
+                entries. None only processes videos already in the catalog
+            extractor: Transcript extractor, whose catalog is also used here
+            ingest_batch_size: Max documents handed to one ingest call
+        """
+        self.ingest = ingest
+        self.discover = discover
+        self.extractor = extractor or AlternativeTranscriptExtractor()
+        self.ingest_batch_size = ingest_batch_size
+        self.stats: Dict[str, StageStats] = {
+            name: StageStats(name) for name in ("discover", "transcripts", "ingest")
+        }
+        self._seen: set = set()
+
+    async def run(self) -> Dict[str, StageStats]:
+        url_queue: asyncio.Queue = asyncio.Queue()
+        doc_queue: asyncio.Queue = asyncio.Queue()
+
+        # Videos left over from earlier runs go first; ingestion skips known ones
+        backlog = list(self.extractor.catalog.iter_entries(with_transcripts=True))
+        for entry in backlog:
+            self._put_url(url_queue, entry)
+
+        await asyncio.gather(
+            self._discover_stage(url_queue),
+            self._transcript_stage(url_queue, doc_queue),
+            self._ingest_stage(doc_queue),
+        )
+        return self.stats
+
+    def _put_url(self, url_queue: asyncio.Queue, entry: dict) -> None:
+        video_id = entry.get("video_id") or extract_video_id(entry.get("url", ""))
+        # Playlists and other non-video URLs have no transcript to fetch
+        if not video_id or video_id in self._seen:
+            return
+        self._seen.add(video_id)
+        url_queue.put_nowait(dict(entry, video_id=video_id))
+
+    async def _discover_stage(self, url_queue: asyncio.Queue) -> None:
+        stats = self.stats["discover"]
+        stats.start()
+        loop = asyncio.get_running_loop()
+
+        def on_results(results: List[dict]) -> None:
+            # Called from the discovery thread
+            def enqueue():
+                stats.record(len(results), 0.0)
+                for entry in results:
+                    self._put_url(url_queue, entry)
+
+            loop.call_soon_threadsafe(enqueue)
+
+        try:
+            if self.discover is not None:
+                start = time.perf_counter()
+                await asyncio.to_thread(self.discover, on_results)
+                stats.busy += time.perf_counter() - start
+        except Exception as e:
+            print(f"\n❌ Error in link discovery: {e}")
+        finally:
+            # Let callbacks scheduled by the thread run before closing the queue
+            await asyncio.sleep(0)
+            url_queue.put_nowait(_DONE)
+            stats.finish()
+
+    async def _transcript_stage(
+        self, url_queue: asyncio.Queue, doc_queue: asyncio.Queue
+    ) -> None:
+        stats = self.stats["transcripts"]
+        catalog = self.extractor.catalog
+        semaphore = asyncio.Semaphore(self.extractor.concurrency)
+
+        async def fetch_one(entry: dict) -> None:
+            video_id = entry["video_id"]
+            transcript = entry.get("transcript") or catalog.get_transcript(video_id)
+            if "segments" not in entry:
+                entry = dict(entry, segments=catalog.get_segments(video_id))
+            if not transcript or transcript.startswith(("ERROR_", "NO_")):
+                start = time.perf_counter()
+                transcript = await self.extractor.get_transcript_async(
+                    video_id, semaphore
+                )
+                self.extractor.save_transcript(video_id, transcript)
+                segments = catalog.get_segments(video_id)
+                document = video_document(
+                    dict(entry, transcript=transcript, segments=segments)
+                )
+                stats.record(1, time.perf_counter() - start, int(document is None))
+                outcome = "ok" if document is not None else transcript
+                print(f"  Transcript {video_id}: {outcome}")
+            else:
+                document = video_document(dict(entry, transcript=transcript))
+            if document is not None:
+                doc_queue.put_nowait(document)
+
+        tasks = []
+        try:
+            while True:
+                entry = await url_queue.get()
+                if entry is _DONE:
+                    break
+                stats.start()
+                tasks.append(asyncio.create_task(fetch_one(entry)))
+            await asyncio.gather(*tasks)
+        finally:
+            doc_queue.put_nowait(_DONE)
+            stats.finish()
+
+    async def _ingest_stage(self, doc_queue: asyncio.Queue) -> None:
+        stats = self.stats["ingest"]
+        done = False
+        while not done:
+            document = await doc_queue.get()
+            if document is _DONE:
+                break
+            stats.start()
+            # Take whatever else is already waiting, up to the batch size
+            batch = {document[0]: document[1:]}
+            while len(batch) < self.ingest_batch_size and not doc_queue.empty():
+                document = doc_queue.get_nowait()
+                if document is _DONE:
+                    done = True
+                    break
+                batch[document[0]] = document[1:]
+
+            start = time.perf_counter()
+            try:
+                result = await self.ingest(batch)
+                ingested = result.get("new", 0) + result.get("changed", 0)
+                stats.record(ingested, time.perf_counter() - start)
+            except Exception as e:
+                print(f"\n❌ Error ingesting {len(batch)} documents: {e}")
+                stats.record(0, time.perf_counter() - start, len(batch))
+        stats.finish()
+
+    def report(self) -> None:
+        print("\nPipeline throughput:")
+        for stage in self.stats.values():
+            print(f"  {stage.summary()}")
@@ -0,0 +1,97 @@
+"""
+Tests for token-offset chunking. A small byte-level tiktoken encoding is
+installed as the shared encoder so no encoding files need downloading.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+import tiktoken
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import utils
+from lightrag.operate import chunking_by_token_size
+
+
+@pytest.fixture
+def byte_encoder(monkeypatch):
+    ranks = {bytes([i]): i for i in range(256)}
+    ranks[b"ab"] = 256
+    encoder = tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+    monkeypatch.setattr(utils, "ENCODER", encoder)
+    return encoder
+
+
+def test_windows_are_slices_matching_decoded_tokens(byte_encoder):
+    content = "ab cd ab é ünïcode " * 20
+    chunks = chunking_by_token_size(content, None, False, 7, 30, "test")
+
+    tokens = byte_encoder.encode(content)
+    assert [c["token_start"] for c in chunks] == list(range(0, len(tokens), 23))
+    for chunk in chunks:
+        window = tokens[chunk["token_start"] : chunk["token_end"]]
+        assert chunk["tokens"] == len(window)
+        # Windows cut inside a multi-byte character differ only in that character
+        decoded = byte_encoder.decode(window, errors="ignore").strip()
+        assert decoded in chunk["content"]
+        assert len(chunk["content"]) - len(decoded) <= 2
+
+
+def test_split_by_character_chunks_carry_document_token_offsets(byte_encoder):
+    content = "short one\n\n" + "ab " * 40 + "\n\nlast"
+    chunks = chunking_by_token_size(content, "\n\n", False, 5, 30, "test")
+    assert chunks[0]["content"] == "short one"
+    assert chunks[-1]["content"] == "last"
+    middle = [c["content"] for c in chunks[1:-1]]
+    assert len(middle) > 1 and all(part.startswith("ab") for part in middle)
+    assert [c["chunk_order_index"] for c in chunks] == list(range(len(chunks)))
+
+    # Offsets index the tokens of the whole document, as without a split character
+    tokens = byte_encoder.encode(content)
+    for chunk in chunks:
+        window = tokens[chunk["token_start"] : chunk["token_end"]]
+        assert chunk["tokens"] == len(window)
+        assert byte_encoder.decode(window).strip() == chunk["content"]
+
+    only = chunking_by_token_size(content, "\n\n", True, 5, 30, "test")
+    assert [c["tokens"] for c in only] == [
+        len(t) for t in byte_encoder.encode_batch(content.split("\n\n"))
+    ]
+    assert all("token_start" in c and "token_end" in c for c in only)
+
+
+def test_lightrag_runs_chunking_on_its_thread_pool(byte_encoder, tmp_path):
+    from lightrag import LightRAG
+    from lightrag.utils import EmbeddingFunc
+
+    threads = []
+
+    def chunking_func(content, *args):
+        threads.append(threading.current_thread().name)
+        return chunking_by_token_size(content, *args)
+
+    async def embed(texts):
+        raise AssertionError("not used")
+
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=embed),
+        llm_model_func=embed,
+        chunking_func=chunking_func,
+        chunk_token_size=30,
+        chunk_overlap_token_size=5,
+        tiktoken_model_name="test",
+    )
+    chunks = asyncio.run(rag._run_chunking("ab " * 40, None, False))
+    assert len(chunks) > 1
+    assert threads and threads[0].startswith("lightrag-chunking")
+    rag._chunking_executor.shutdown()
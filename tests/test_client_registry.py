@@ -0,0 +1,93 @@
+"""
+Tests for the pooled LLM/embedding client registry, against a local
+keep-alive HTTP server that mimics the OpenAI embeddings endpoint.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.llm.client_registry import ClientRegistry
+
+
+class _EmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps(
+            {
+                "object": "list",
+                "model": request["model"],
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [float(i), 1.0]}
+                    for i in range(len(request["input"]))
+                ],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EmbeddingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_clients_are_cached_per_configuration(base_url):
+    registry = ClientRegistry()
+
+    async def main():
+        first = registry.get_openai_client(api_key="k1", base_url=base_url)
+        assert registry.get_openai_client(api_key="k1", base_url=base_url) is first
+        assert registry.get_openai_client(api_key="k2", base_url=base_url) is not first
+        assert len(registry.stats()) == 2
+        # Labels never contain the API key
+        assert not any("k1" in label.split(":")[-1] for label in registry.stats())
+        await registry.aclose()
+        assert registry.stats() == {}
+
+    asyncio.run(main())
+
+
+def test_requests_reuse_the_pooled_connection(base_url):
+    registry = ClientRegistry()
+
+    async def main():
+        registry.acquire()
+        for _ in range(3):
+            client = registry.get_openai_client(api_key="key", base_url=base_url)
+            response = await client.embeddings.create(
+                model="test", input=["a", "b"], encoding_format="float"
+            )
+            assert [d.embedding for d in response.data] == [[0.0, 1.0], [1.0, 1.0]]
+
+        (stats,) = registry.stats().values()
+        assert stats["requests"] == 3
+        assert stats["connections_opened"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["connection_reuse_ratio"] == pytest.approx(2 / 3)
+
+        await registry.release()
+        assert registry.stats() == {}
+
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Tests for document deletion through the doc_chunk_index reverse index.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+import tiktoken
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import LightRAG, utils
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    initialize_pipeline_status,
+    initialize_share_data,
+)
+from lightrag.utils import EmbeddingFunc, compute_mdhash_id
+
+# Entities and relations the fake LLM extracts from each document
+_EXTRACTIONS = {
+    "FIRST": [("Alice", "Bob")],
+    "SECOND": [("Alice", "Carol")],
+}
+
+
+def _entity(name):
+    return f'("entity"<|>"{name}"<|>"person"<|>"{name} is a person")'
+
+
+def _relation(src, tgt):
+    return (
+        f'("relationship"<|>"{src}"<|>"{tgt}"<|>"{src} knows {tgt}"<|>"friends"<|>1.0)'
+    )
+
+
+async def _llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    for marker, relations in _EXTRACTIONS.items():
+        if f"{marker} document" in prompt:
+            names = sorted({name for pair in relations for name in pair})
+            records = [_entity(n) for n in names] + [_relation(*r) for r in relations]
+            return "##".join(records) + "<|COMPLETE|>"
+    return "no"
+
+
+async def _embed(texts):
+    return np.array([[len(t) % 7 + 1.0, 1.0, float("Alice" in t), 0.5] for t in texts])
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    # A byte-level encoding, so no tiktoken files need downloading
+    encoder = tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(utils, "ENCODER", encoder)
+    finalize_share_data()
+    initialize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=_llm,
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+        auto_manage_storages_states=False,
+    )
+    asyncio.run(rag.initialize_storages())
+    asyncio.run(initialize_pipeline_status())
+    yield rag
+    asyncio.run(rag.finalize_storages())
+
+
+def test_delete_visits_only_the_documents_entities(rag):
+    first = "FIRST document about people."
+    second = "SECOND document about people."
+    asyncio.run(rag.ainsert([first, second]))
+    first_id = compute_mdhash_id(first, prefix="doc-")
+    graph = rag.chunk_entity_relation_graph
+
+    index = asyncio.run(rag.doc_chunk_index.get_by_id(first_id))
+    [chunk] = index["chunks"].values()
+    assert chunk == {"entities": ["Alice", "Bob"], "relations": [["Alice", "Bob"]]}
+
+    async def no_scan(*args, **kwargs):
+        raise AssertionError("deletion scanned the whole store")
+
+    rag.text_chunks.get_all = no_scan
+    graph.get_all_labels = no_scan
+    asyncio.run(rag.adelete_by_doc_id(first_id))
+
+    assert not asyncio.run(graph.has_node("Bob"))
+    assert not asyncio.run(graph.has_edge("Alice", "Bob"))
+    assert asyncio.run(graph.has_edge("Alice", "Carol"))
+    # Alice keeps only the chunk of the second document as source
+    [second_chunk] = asyncio.run(
+        rag.doc_chunk_index.get_by_id(compute_mdhash_id(second, prefix="doc-"))
+    )["chunks"]
+    assert asyncio.run(graph.get_node("Alice"))["source_id"] == second_chunk
+    alice = asyncio.run(
+        rag.entities_vdb.get_by_id(compute_mdhash_id("Alice", prefix="ent-"))
+    )
+    assert alice["source_id"] == second_chunk
+    assert asyncio.run(rag.doc_chunk_index.get_by_id(first_id)) is None
+    assert asyncio.run(rag.doc_status.get_by_id(first_id)) is None
+
+
+def test_index_is_written_when_get_by_ids_leaves_out_missing_rows(rag):
+    # Like MongoKVStorage, return only the records that exist, in any order
+    json_get_by_ids = rag.doc_chunk_index.get_by_ids
+
+    async def found_rows_only(ids):
+        return [row for row in reversed(await json_get_by_ids(ids)) if row]
+
+    rag.doc_chunk_index.get_by_ids = found_rows_only
+    first = "FIRST document about people."
+    asyncio.run(rag.ainsert(first))
+    index = asyncio.run(
+        rag.doc_chunk_index.get_by_id(compute_mdhash_id(first, prefix="doc-"))
+    )
+    [chunk] = index["chunks"].values()
+    assert chunk["entities"] == ["Alice", "Bob"]
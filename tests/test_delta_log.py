@@ -0,0 +1,182 @@
+"""
+Tests for the delta log of the in-memory storages: replay after a restart,
+applying the changes of another process, and snapshot compaction.
+"""
+
+import asyncio
+import copy
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg import delta_log
+from lightrag.kg.json_doc_status_impl import JsonDocStatusStorage
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.nano_vector_db_impl import NanoVectorDBStorage
+from lightrag.kg.networkx_impl import NetworkXStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+_WORDS = ["apple", "banana", "cherry"]
+
+
+async def _embed(texts):
+    return np.array([[float(w in text) for w in _WORDS] + [0.1] for text in texts])
+
+
+def _open(cls, tmp_path, namespace, reset=True):
+    # Each open with reset reads the files again, like a restarted process
+    if reset:
+        finalize_share_data()
+        initialize_share_data()
+    kwargs = {"meta_fields": {"entity_name"}} if cls is NanoVectorDBStorage else {}
+    storage = cls(
+        namespace=namespace,
+        global_config={
+            "working_dir": str(tmp_path),
+            "embedding_batch_num": 8,
+            "vector_db_storage_cls_kwargs": {"cosine_better_than_threshold": 0.2},
+        },
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+        **kwargs,
+    )
+    asyncio.run(storage.initialize())
+    return storage
+
+
+def test_kv_and_doc_status_changes_are_logged_and_replayed(tmp_path):
+    kv = _open(JsonKVStorage, tmp_path, "llm_response_cache")
+    doc_status = _open(JsonDocStatusStorage, tmp_path, "doc_status", reset=False)
+
+    async def write():
+        mode_cache = {}
+        for i in range(3):
+            mode_cache[f"h{i}"] = {"return": f"answer {i}"}
+            # Shared dicts of other processes hand out copies, not the same objects
+            await kv.upsert({"local": copy.deepcopy(mode_cache)})
+            await kv.index_done_callback()
+        await doc_status.upsert({"doc-1": {"status": "processed"}})
+        await doc_status.upsert({"doc-2": {"status": "pending"}})
+        await doc_status.delete(["doc-1"])
+        await doc_status.index_done_callback()
+
+    asyncio.run(write())
+    assert not os.path.exists(tmp_path / "kv_store_llm_response_cache.json")
+    with open(tmp_path / "kv_store_llm_response_cache.delta.jsonl") as f:
+        # Header, then the whole record once and only the new entries after that
+        assert len(f.readlines()) == 4
+
+    kv = _open(JsonKVStorage, tmp_path, "llm_response_cache")
+    doc_status = _open(JsonDocStatusStorage, tmp_path, "doc_status", reset=False)
+    assert asyncio.run(kv.get_by_id("local")) == {
+        f"h{i}": {"return": f"answer {i}"} for i in range(3)
+    }
+    assert asyncio.run(doc_status.get_by_id("doc-1")) is None
+    assert asyncio.run(doc_status.get_by_id("doc-2")) == {"status": "pending"}
+
+
+def test_log_follows_the_order_of_changes_across_writers(tmp_path):
+    kv_a = _open(JsonKVStorage, tmp_path, "full_docs")
+    kv_b = _open(JsonKVStorage, tmp_path, "full_docs", reset=False)
+    status_a = _open(JsonDocStatusStorage, tmp_path, "doc_status", reset=False)
+    status_b = _open(JsonDocStatusStorage, tmp_path, "doc_status", reset=False)
+
+    async def write():
+        # The writer that changed a record last flushes first
+        await kv_a.upsert({"k": {"content": "v1"}, "gone": {"content": "x"}})
+        await kv_b.upsert({"k": {"content": "v2"}})
+        await kv_b.delete(["gone"])
+        await status_a.upsert({"doc-1": {"status": "processing"}})
+        await status_b.upsert({"doc-1": {"status": "processed"}})
+        for storage in (kv_b, status_b, kv_a, status_a):
+            await storage.index_done_callback()
+
+    asyncio.run(write())
+    kv = _open(JsonKVStorage, tmp_path, "full_docs")
+    status = _open(JsonDocStatusStorage, tmp_path, "doc_status", reset=False)
+    assert asyncio.run(kv.get_by_id("k")) == {"content": "v2"}
+    assert asyncio.run(kv.get_by_id("gone")) is None
+    assert asyncio.run(status.get_by_id("doc-1")) == {"status": "processed"}
+
+
+def test_other_process_applies_delta_and_follows_compaction(tmp_path, monkeypatch):
+    writer_graph = _open(NetworkXStorage, tmp_path, "chunk_entity_relation")
+    writer_vdb = _open(NanoVectorDBStorage, tmp_path, "entities", reset=False)
+    # A second process sharing the same files; in this test its update flag is
+    # set by hand, as the shared update flags would do
+    reader_graph = _open(NetworkXStorage, tmp_path, "chunk_entity_relation", False)
+    reader_vdb = _open(NanoVectorDBStorage, tmp_path, "entities", reset=False)
+
+    async def write(word):
+        await writer_graph.upsert_node(word, {"entity_type": "fruit"})
+        await writer_graph.upsert_edge("apple", word, {"weight": 1.0})
+        await writer_vdb.upsert({f"ent-{word}": {"content": word, "entity_name": word}})
+        await writer_graph.index_done_callback()
+        await writer_vdb.index_done_callback()
+        reader_graph.storage_updated.value = True
+        reader_vdb.storage_updated.value = True
+
+    asyncio.run(write("apple"))
+    asyncio.run(write("banana"))
+    assert asyncio.run(reader_graph.has_edge("banana", "apple"))
+    hits = asyncio.run(reader_vdb.query("banana", top_k=1))
+    assert [hit["id"] for hit in hits] == ["ent-banana"]
+
+    async def remove():
+        await writer_graph.remove_nodes(["banana"])
+        await writer_vdb.delete(["ent-banana"])
+
+    asyncio.run(remove())
+    monkeypatch.setattr(delta_log, "_COMPACT_MIN_BYTES", 0)
+    asyncio.run(write("cherry"))
+    assert os.path.exists(tmp_path / "graph_chunk_entity_relation.msgpack")
+    assert os.path.exists(tmp_path / "vdb_entities.json")
+
+    assert not asyncio.run(reader_graph.has_node("banana"))
+    assert asyncio.run(reader_graph.has_edge("apple", "cherry"))
+    assert asyncio.run(reader_vdb.get_by_id("ent-banana")) is None
+    assert asyncio.run(reader_vdb.get_by_id("ent-cherry"))["entity_name"] == "cherry"
+
+    # A restarted process sees the same state
+    graph = _open(NetworkXStorage, tmp_path, "chunk_entity_relation")
+    assert sorted(asyncio.run(graph._get_graph()).nodes) == ["apple", "cherry"]
+
+
+def test_unwritten_changes_survive_a_reload_after_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(delta_log, "_COMPACT_MIN_BYTES", 0)
+    graph_a = _open(NetworkXStorage, tmp_path, "chunk_entity_relation")
+    vdb_a = _open(NanoVectorDBStorage, tmp_path, "entities", reset=False)
+    graph_b = _open(NetworkXStorage, tmp_path, "chunk_entity_relation", False)
+    vdb_b = _open(NanoVectorDBStorage, tmp_path, "entities", reset=False)
+
+    async def write(graph, vdb, word, done):
+        await graph.upsert_node(word, {"entity_type": "fruit"})
+        await vdb.upsert({f"ent-{word}": {"content": word, "entity_name": word}})
+        if done:
+            await graph.index_done_callback()
+            await vdb.index_done_callback()
+
+    # A keeps apple in memory while B writes banana and compacts the log
+    asyncio.run(write(graph_a, vdb_a, "apple", done=False))
+    asyncio.run(write(graph_b, vdb_b, "banana", done=True))
+    assert os.path.exists(tmp_path / "vdb_entities.json")
+    graph_a.storage_updated.value = True
+    vdb_a.storage_updated.value = True
+
+    assert asyncio.run(graph_a.has_node("apple"))
+    assert asyncio.run(graph_a.has_node("banana"))
+    assert asyncio.run(vdb_a.get_by_id("ent-apple"))["entity_name"] == "apple"
+    assert asyncio.run(vdb_a.get_by_id("ent-banana"))["entity_name"] == "banana"
+
+    async def flush():
+        await graph_a.index_done_callback()
+        await vdb_a.index_done_callback()
+
+    asyncio.run(flush())
+    graph = _open(NetworkXStorage, tmp_path, "chunk_entity_relation")
+    vdb = _open(NanoVectorDBStorage, tmp_path, "entities", reset=False)
+    assert sorted(asyncio.run(graph._get_graph()).nodes) == ["apple", "banana"]
+    assert asyncio.run(vdb.get_by_id("ent-apple")) is not None
@@ -0,0 +1,79 @@
+"""
+Tests for the streaming document worker pool used by
+apipeline_process_enqueue_documents.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import LightRAG
+from lightrag.utils import EmbeddingFunc
+
+
+async def _unused(*args, **kwargs):
+    raise AssertionError("not used")
+
+
+def _make_rag(tmp_path, **kwargs) -> LightRAG:
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_unused),
+        llm_model_func=_unused,
+        **kwargs,
+    )
+    rag.finished = []
+    rag.persist_calls = []
+
+    async def insert_done():
+        rag.persist_calls.append(len(rag.finished))
+
+    rag._insert_done = insert_done
+    return rag
+
+
+def test_slots_refill_without_waiting_for_the_slowest_document(tmp_path):
+    rag = _make_rag(tmp_path, max_parallel_insert=2, insert_persist_docs=3)
+    started = []
+
+    async def process_document(doc_id, status_doc):
+        started.append(doc_id)
+        await asyncio.sleep(0.5 if doc_id == "slow" else 0.01)
+        rag.finished.append(doc_id)
+
+    docs = {"slow": None, **{f"fast{i}": None for i in range(6)}}
+    status = {"history_messages": []}
+    asyncio.run(rag._process_documents_streaming(docs, process_document, status))
+
+    # Every fast document ran on the second slot while "slow" held the first
+    assert rag.finished[:6] == [f"fast{i}" for i in range(6)]
+    assert rag.finished[-1] == "slow"
+    # Persisted after every 3 documents, then once more at the end
+    assert rag.persist_calls == [3, 6, 7]
+    assert status["cur_batch"] == 7
+
+
+def test_unsaved_documents_are_persisted_on_the_interval(tmp_path):
+    rag = _make_rag(
+        tmp_path,
+        max_parallel_insert=1,
+        insert_persist_docs=100,
+        insert_persist_interval=0.1,
+    )
+
+    async def process_document(doc_id, status_doc):
+        await asyncio.sleep(0.15 if doc_id == "b" else 0.01)
+        rag.finished.append(doc_id)
+
+    status = {"history_messages": []}
+    asyncio.run(
+        rag._process_documents_streaming(
+            {"a": None, "b": None}, process_document, status
+        )
+    )
+
+    # "a" was saved by the timer while "b" was still running
+    assert rag.persist_calls[0] == 1
+    assert rag.persist_calls[-1] == 2
@@ -0,0 +1,93 @@
+"""
+Tests for EmbeddingBatcher, which coalesces concurrent small embedding calls.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.utils import EmbeddingBatcher, EmbeddingFunc
+
+
+def _recording_embed(calls):
+    async def embed(texts, **kwargs):
+        calls.append((list(texts), kwargs))
+        await asyncio.sleep(0.01)
+        return np.array([[float(len(t)), float(t.count("a"))] for t in texts])
+
+    return EmbeddingFunc(embedding_dim=2, max_token_size=64, func=embed)
+
+
+def test_concurrent_single_text_calls_share_one_request():
+    calls = []
+    batcher = EmbeddingBatcher(_recording_embed(calls), max_batch_size=8, max_wait=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            batcher(["a"]), batcher(["bb"]), batcher(["a"]), batcher(["aaa", "bb"])
+        )
+
+    results = asyncio.run(main())
+
+    # One provider call, with duplicates embedded once
+    assert calls == [(["a", "bb", "aaa"], {})]
+    assert results[0].tolist() == [[1.0, 1.0]]
+    assert results[2].tolist() == [[1.0, 1.0]]
+    assert results[3].tolist() == [[3.0, 3.0], [2.0, 0.0]]
+    assert batcher.embedding_dim == 2
+
+    stats = batcher.stats()
+    assert stats["requested_texts"] == 5
+    assert stats["embedded_texts"] == 3
+    assert stats["batch_size"]["count"] == 1
+    assert stats["batch_size"]["buckets"]["<=4"] == 1
+    assert stats["flush_latency_seconds"]["count"] == 1
+
+
+def test_full_batches_flush_without_waiting():
+    calls = []
+    batcher = EmbeddingBatcher(_recording_embed(calls), max_batch_size=2, max_wait=10)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*[batcher([t]) for t in ("a", "b", "c", "d")]), 1
+        )
+
+    asyncio.run(main())
+    assert [texts for texts, _ in calls] == [["a", "b"], ["c", "d"]]
+
+
+def test_large_and_keyword_calls_bypass_the_queue():
+    calls = []
+    batcher = EmbeddingBatcher(_recording_embed(calls), max_batch_size=2, max_wait=10)
+
+    async def main():
+        await batcher(["a", "b"])
+        await batcher(["c"], model="other")
+
+    asyncio.run(main())
+    assert calls == [(["a", "b"], {}), (["c"], {"model": "other"})]
+    assert batcher.stats()["requested_texts"] == 0
+
+
+def test_provider_errors_reach_every_caller():
+    async def failing(texts):
+        raise RuntimeError("provider down")
+
+    batcher = EmbeddingBatcher(failing, max_batch_size=4, max_wait=0.01)
+
+    async def main():
+        return await asyncio.gather(
+            batcher(["a"]), batcher(["b"]), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher(["c"]))
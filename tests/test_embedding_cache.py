@@ -0,0 +1,104 @@
+"""
+Tests for the persistent, content-addressed EmbeddingCache.
+"""
+
+import asyncio
+import os
+import sys
+from functools import partial
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.embedding_cache import EmbeddingCache, embedding_model_identity
+from lightrag.utils import EmbeddingFunc, TokenTracker
+
+
+def _recording_embed(calls):
+    async def embed(texts):
+        calls.append(list(texts))
+        return np.array([[len(t) / 10, -0.5, 0.25] for t in texts])
+
+    return EmbeddingFunc(embedding_dim=3, max_token_size=64, func=embed)
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_unchanged_texts_are_embedded_once_across_restarts(tmp_path, dtype, tolerance):
+    calls = []
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(_recording_embed(calls), db_path, dtype=dtype)
+
+    first = asyncio.run(cache(["alpha", "beta", "alpha"]))
+    assert calls == [["alpha", "beta"]]
+    assert first.shape == (3, 3)
+    cache.close()
+
+    # A new instance on the same file serves everything from disk
+    cache = EmbeddingCache(_recording_embed(calls), db_path, dtype=dtype)
+    second = asyncio.run(cache(["beta", "alpha", "gamma"]))
+    assert calls == [["alpha", "beta"], ["gamma"]]
+    np.testing.assert_allclose(second[:2], first[[1, 0]], atol=tolerance)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert cache.hit_rate == pytest.approx(2 / 3)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    calls = []
+    cache = EmbeddingCache(
+        _recording_embed(calls), str(tmp_path / "cache.sqlite3"), max_entries=2
+    )
+
+    async def main():
+        await cache(["a"])
+        await cache(["b"])
+        await cache(["a"])  # "b" is now the least recently used
+        await cache(["c"])
+        await cache(["a", "b"])
+
+    asyncio.run(main())
+    assert calls == [["a"], ["b"], ["c"], ["b"]]
+    assert cache.stats()["entries"] == 2
+
+
+def test_hits_are_reported_to_the_token_tracker(tmp_path):
+    tracker = TokenTracker()
+    cache = EmbeddingCache(
+        _recording_embed([]), str(tmp_path / "cache.sqlite3"), token_tracker=tracker
+    )
+    asyncio.run(cache(["x", "y"]))
+    asyncio.run(cache(["x"]))
+    usage = tracker.get_usage()
+    assert usage["embedding_cache_hits"] == 1
+    assert usage["embedding_cache_misses"] == 2
+
+
+def test_changed_embedding_layout_clears_the_cache(tmp_path):
+    calls = []
+    db_path = str(tmp_path / "cache.sqlite3")
+    asyncio.run(EmbeddingCache(_recording_embed(calls), db_path)(["a"]))
+    asyncio.run(EmbeddingCache(_recording_embed(calls), db_path, dtype="int8")(["a"]))
+    assert calls == [["a"], ["a"]]
+
+
+def test_another_model_of_the_same_dimension_clears_the_cache(tmp_path):
+    calls = []
+    db_path = str(tmp_path / "cache.sqlite3")
+
+    async def embed(texts, model="model-a"):
+        calls.append((model, list(texts)))
+        return np.array([[1.0, 0.0, 0.0] for _ in texts])
+
+    model_a = EmbeddingFunc(embedding_dim=3, max_token_size=64, func=embed)
+    model_b = EmbeddingFunc(
+        embedding_dim=3, max_token_size=64, func=partial(embed, model="model-b")
+    )
+    asyncio.run(EmbeddingCache(model_a, db_path)(["a"]))
+    asyncio.run(EmbeddingCache(model_a, db_path)(["a"]))
+    asyncio.run(EmbeddingCache(model_b, db_path)(["a"]))
+    asyncio.run(EmbeddingCache(model_b, db_path, model_name="model-c")(["a"]))
+    assert calls == [("model-a", ["a"]), ("model-b", ["a"]), ("model-b", ["a"])]
+    assert embedding_model_identity(model_a) == "model-a"
+    assert embedding_model_identity(model_b) == "model-b"
@@ -0,0 +1,114 @@
+"""
+Tests for the streaming knowledge graph export of LightRAG.aexport_data.
+"""
+
+import asyncio
+import csv
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import LightRAG
+from lightrag.base import BaseGraphStorage
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    initialize_pipeline_status,
+    initialize_share_data,
+)
+from lightrag.utils import EmbeddingFunc
+
+
+async def _llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    return "no"
+
+
+async def _embed(texts):
+    return np.array([[len(t) % 7 + 1.0, 1.0, float("Alice" in t), 0.5] for t in texts])
+
+
+@pytest.fixture
+def rag(tmp_path):
+    finalize_share_data()
+    initialize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=_llm,
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+        auto_manage_storages_states=False,
+    )
+    asyncio.run(rag.initialize_storages())
+    asyncio.run(initialize_pipeline_status())
+
+    async def build():
+        for name in ["Alice", "Bob", "Carol", "Dave"]:
+            await rag.acreate_entity(name, {"description": f"{name} is a person"})
+        for src, tgt in [("Alice", "Bob"), ("Carol", "Alice"), ("Bob", "Carol")]:
+            await rag.acreate_relation(src, tgt, {"description": f"{src} knows {tgt}"})
+
+    asyncio.run(build())
+    yield rag
+    asyncio.run(rag.finalize_storages())
+
+
+def _edges(graph, iter_edges):
+    async def collect():
+        return [(src, tgt) async for src, tgt, _ in iter_edges(graph, batch_size=2)]
+
+    return sorted(tuple(sorted(edge)) for edge in asyncio.run(collect()))
+
+
+def test_default_edge_iterator_reports_each_edge_once(rag):
+    graph = rag.chunk_entity_relation_graph
+    expected = [("Alice", "Bob"), ("Alice", "Carol"), ("Bob", "Carol")]
+    assert _edges(graph, BaseGraphStorage.iter_edges) == expected
+    assert _edges(graph, type(graph).iter_edges) == expected
+
+
+def test_csv_export_with_npy_vectors(rag, tmp_path):
+    async def no_pairwise_lookup(*args, **kwargs):
+        raise AssertionError("export looked up a pair of entities")
+
+    rag.chunk_entity_relation_graph.has_edge = no_pairwise_lookup
+    output = str(tmp_path / "graph.csv")
+    asyncio.run(
+        rag.aexport_data(
+            output, include_vector_data=True, vector_format="npy", batch_size=2
+        )
+    )
+
+    with open(output, encoding="utf-8") as f:
+        sections = {}
+        for block in f.read().strip().split("\n\n\n"):
+            title, *lines = block.strip().split("\n")
+            sections[title] = list(csv.DictReader(lines))
+    entities = sections["# ENTITIES"]
+    relations = sections["# RELATIONS"]
+    relationships = sections["# RELATIONSHIPS"]
+    assert [e["entity_name"] for e in entities] == ["Alice", "Bob", "Carol", "Dave"]
+    assert len(relations) == 3
+    assert all("knows" in r["vector_data"] for r in relations)
+    assert len(relationships) == 3
+
+    entity_vectors = np.load(tmp_path / "graph.entities.npy")
+    assert entity_vectors.shape == (4, 4)
+    embedded = asyncio.run(_embed(["Alice\nAlice is a person"]))[0]
+    alice = entity_vectors[int(entities[0]["vector_index"])]
+    assert np.allclose(alice, embedded / np.linalg.norm(embedded), atol=1e-3)
+    relationship_vectors = np.load(tmp_path / "graph.relationships.npy")
+    assert relationship_vectors.shape == (3, 4)
+    assert sorted(int(r["vector_index"]) for r in relationships) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("file_format", ["md", "txt", "excel"])
+def test_other_formats(rag, tmp_path, file_format):
+    output = str(tmp_path / f"graph.{file_format}")
+    asyncio.run(rag.aexport_data(output, file_format=file_format))
+    assert os.path.getsize(output) > 0
+    if file_format != "excel":
+        with open(output, encoding="utf-8") as f:
+            content = f.read()
+        assert "Carol" in content and "Dave" in content
@@ -0,0 +1,160 @@
+"""
+Tests for FaissVectorDBStorage: ANN index types, ID mapping and deletion.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+faiss = pytest.importorskip("faiss")
+
+from lightrag.kg.faiss_impl import FaissVectorDBStorage
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    initialize_share_data,
+)
+from lightrag.utils import EmbeddingFunc
+
+_DIM = 16
+_VECTORS = np.random.default_rng(0).normal(size=(600, _DIM)).astype(np.float32)
+
+
+async def _embed(texts):
+    return np.array([_VECTORS[int(t)] for t in texts])
+
+
+def _open(tmp_path, **kwargs):
+    finalize_share_data()
+    initialize_share_data()
+    storage = FaissVectorDBStorage(
+        namespace="chunks",
+        global_config={
+            "working_dir": str(tmp_path),
+            "embedding_batch_num": 100,
+            "vector_db_storage_cls_kwargs": {
+                "cosine_better_than_threshold": 0.2,
+                "ann_threshold": 300,
+                **kwargs,
+            },
+        },
+        embedding_func=EmbeddingFunc(embedding_dim=_DIM, max_token_size=8, func=_embed),
+        meta_fields=set(),
+    )
+    asyncio.run(storage.initialize())
+    return storage
+
+
+@pytest.mark.parametrize(
+    "index_type,index_class",
+    [("hnsw", faiss.IndexHNSWFlat), ("ivf_pq", faiss.IndexIVFPQ)],
+)
+def test_ann_index_is_built_past_the_threshold(tmp_path, index_type, index_class):
+    storage = _open(tmp_path, index_type=index_type, nprobe=64, ef_search=128)
+
+    async def fill(start, end):
+        await storage.upsert({str(i): {"content": str(i)} for i in range(start, end)})
+
+    asyncio.run(fill(0, 200))
+    assert isinstance(storage._base_index(storage._index), faiss.IndexFlatIP)
+    asyncio.run(fill(200, 600))
+    assert isinstance(storage._base_index(storage._index), index_class)
+    assert storage._index.ntotal == 600
+
+    # Both the exact and the re-scored approximate results find the vector itself
+    results = asyncio.run(storage.query("42", top_k=3))
+    assert results[0]["id"] == "42"
+    assert results[0]["distance"] == pytest.approx(1.0, abs=1e-5)
+
+    asyncio.run(storage.index_done_callback())
+    storage = _open(tmp_path, index_type=index_type, nprobe=64, ef_search=128)
+    assert isinstance(storage._base_index(storage._index), index_class)
+    assert asyncio.run(storage.query("7", top_k=1))[0]["id"] == "7"
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_pq"])
+def test_deletes_and_replacements_keep_faiss_ids_stable(tmp_path, index_type):
+    storage = _open(tmp_path, index_type=index_type, max_tombstone_ratio=0.5, nprobe=64)
+
+    async def write():
+        await storage.upsert({str(i): {"content": str(i)} for i in range(400)})
+        # Replace "1" by the vector of "2", then delete "2"
+        await storage.upsert({"1": {"content": "2"}})
+        await storage.delete(["2", "3"])
+        await storage.index_done_callback()
+
+    asyncio.run(write())
+    assert storage._custom_id_to_fid["1"] == 400
+    # Tombstoned vectors stay in the index until enough of them accumulate
+    assert storage._tombstones == {1, 2, 3}
+    assert storage._index.ntotal == 401
+    assert all("__vector__" not in meta for meta in storage._id_to_meta.values())
+
+    storage = _open(tmp_path, index_type=index_type, max_tombstone_ratio=0.5, nprobe=64)
+    assert storage._tombstones == {1, 2, 3}
+    assert [r["id"] for r in asyncio.run(storage.query("2", top_k=1))] == ["1"]
+    assert asyncio.run(storage.get_by_id("3")) is None
+
+    asyncio.run(storage.delete([str(i) for i in range(4, 300)]))
+    assert storage._tombstones == set()
+    assert storage._index.ntotal == 102
+    assert asyncio.run(storage.get_by_id("350"))["id"] == "350"
+    assert asyncio.run(storage.query("350", top_k=1))[0]["id"] == "350"
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_pq"])
+def test_tombstoned_neighbours_are_excluded_by_the_search(tmp_path, index_type):
+    storage = _open(tmp_path, index_type=index_type, max_tombstone_ratio=0.5, nprobe=64)
+    asyncio.run(storage.upsert({str(i): {"content": str(i)} for i in range(400)}))
+    # Delete the nearest neighbours of vector 42, including itself
+    normalized = _VECTORS[:400] / np.linalg.norm(_VECTORS[:400], axis=1, keepdims=True)
+    scores = normalized @ normalized[42]
+    nearest = np.argsort(-scores)
+    asyncio.run(storage.delete([str(i) for i in nearest[:50]]))
+    assert len(storage._tombstones) == 50
+
+    results = asyncio.run(storage.query("42", top_k=3))
+    assert [r["id"] for r in results] == [str(i) for i in nearest[50:53]]
+
+
+def test_writes_during_a_rebuild_are_applied_to_the_new_index(tmp_path):
+    storage = _open(tmp_path, index_type="hnsw", max_tombstone_ratio=0.5)
+    build_index = storage._build_index
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_build(vectors, fids):
+        started.set()
+        release.wait(10)
+        return build_index(vectors, fids)
+
+    async def write():
+        await storage.upsert({str(i): {"content": str(i)} for i in range(250)})
+        storage._build_index = slow_build
+        rebuild = asyncio.create_task(
+            storage.upsert({str(i): {"content": str(i)} for i in range(250, 400)})
+        )
+        await asyncio.to_thread(started.wait, 10)
+        try:
+            # The storage lock is free while the index is built
+            await asyncio.wait_for(
+                storage.upsert({"400": {"content": "400"}, "5": {"content": "401"}}),
+                5,
+            )
+            await asyncio.wait_for(storage.delete(["6"]), 5)
+        finally:
+            release.set()
+            await rebuild
+
+    asyncio.run(write())
+    assert isinstance(storage._base_index(storage._index), faiss.IndexHNSWFlat)
+    assert storage._index.ntotal == 402
+    assert storage._tombstones == {5, 6}
+    assert asyncio.run(storage.query("400", top_k=1))[0]["id"] == "400"
+    assert asyncio.run(storage.query("401", top_k=1))[0]["id"] == "5"
+    assert asyncio.run(storage.get_by_id("6")) is None
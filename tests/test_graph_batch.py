@@ -0,0 +1,79 @@
+"""
+Tests that the batched graph API of NetworkXStorage agrees with the
+per-item methods and with the BaseGraphStorage fallbacks.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.base import BaseGraphStorage
+from lightrag.kg.networkx_impl import NetworkXStorage
+from lightrag.kg.shared_storage import initialize_share_data
+
+
+async def _make_storage(tmp_path) -> NetworkXStorage:
+    initialize_share_data()
+    storage = NetworkXStorage(
+        namespace="chunk_entity_relation",
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    await storage.initialize()
+    await storage.upsert_nodes_batch(
+        {
+            name: {"entity_id": name, "entity_type": "PERSON", "description": name}
+            for name in ("A", "B", "C", "D")
+        }
+    )
+    await storage.upsert_edges_batch(
+        {
+            ("A", "B"): {"weight": 1.0, "description": "a-b"},
+            ("A", "C"): {"weight": 2.0, "description": "a-c"},
+        }
+    )
+    return storage
+
+
+def test_batch_reads_match_per_item_methods(tmp_path):
+    async def main():
+        storage = await _make_storage(tmp_path)
+        node_ids = ["A", "B", "D", "missing"]
+        pairs = [("A", "B"), ("C", "A"), ("B", "C")]
+
+        for batch in (NetworkXStorage, BaseGraphStorage):
+            nodes = await batch.get_nodes_batch(storage, node_ids)
+            assert nodes == {n: await storage.get_node(n) for n in ("A", "B", "D")}
+
+            degrees = await batch.node_degrees_batch(storage, ["A", "B", "D"])
+            assert degrees == {"A": 2, "B": 1, "D": 0}
+
+            edges = await batch.get_edges_batch(storage, pairs)
+            assert set(edges) == {("A", "B"), ("C", "A")}
+            assert edges[("C", "A")]["description"] == "a-c"
+
+            edge_degrees = await batch.edge_degrees_batch(storage, pairs)
+            assert edge_degrees == {("A", "B"): 3, ("C", "A"): 3, ("B", "C"): 2}
+
+            nodes_edges = await batch.get_nodes_edges_batch(storage, node_ids)
+            assert sorted(nodes_edges["A"]) == [("A", "B"), ("A", "C")]
+            assert nodes_edges["D"] == [] and nodes_edges["missing"] == []
+
+    asyncio.run(main())
+
+
+def test_batch_upserts_merge_into_existing_items(tmp_path):
+    async def main():
+        storage = await _make_storage(tmp_path)
+        await storage.upsert_nodes_batch({"A": {"description": "updated"}})
+        await storage.upsert_edges_batch({("B", "A"): {"weight": 5.0}})
+
+        node = await storage.get_node("A")
+        assert node["description"] == "updated"
+        assert node["entity_type"] == "PERSON"
+        edge = await storage.get_edge("A", "B")
+        assert edge == {"weight": 5.0, "description": "a-b"}
+
+    asyncio.run(main())
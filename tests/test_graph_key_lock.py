@@ -0,0 +1,61 @@
+"""
+Tests for the per-key graph locks used by extract_entities to merge
+entities and relations concurrently.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import get_graph_db_key_lock
+
+
+def _run_merges(key_sets):
+    events = []
+
+    async def merge(name, keys):
+        async with get_graph_db_key_lock(keys):
+            events.append(("start", name))
+            await asyncio.sleep(0.05)
+            events.append(("end", name))
+
+    async def main():
+        await asyncio.gather(*[merge(name, keys) for name, keys in key_sets])
+
+    asyncio.run(main())
+    return events
+
+
+def test_distinct_keys_merge_concurrently():
+    events = _run_merges([("a", ["node:A"]), ("b", ["node:B"])])
+    assert events[:2] == [("start", "a"), ("start", "b")]
+    assert shared_storage._graph_db_key_locks == {}
+
+
+def test_shared_key_serializes_merges():
+    events = _run_merges(
+        [
+            ("node", ["node:A"]),
+            ("edge", ["edge:A|B", "node:A", "node:B"]),
+            ("other", ["node:C"]),
+        ]
+    )
+    node_end = events.index(("end", "node"))
+    assert events.index(("start", "edge")) > node_end
+    assert events.index(("start", "other")) < node_end
+    assert shared_storage._graph_db_key_locks == {}
+
+
+def test_overlapping_key_sets_do_not_deadlock():
+    # Opposite orders would deadlock without sorted acquisition
+    events = _run_merges(
+        [
+            ("ab", ["node:A", "node:B"]),
+            ("ba", ["node:B", "node:A"]),
+        ]
+    )
+    assert len(events) == 4
+    assert shared_storage._graph_db_key_locks == {}
@@ -0,0 +1,82 @@
+"""
+Tests for the status index of JsonDocStatusStorage.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.base import DocStatus
+from lightrag.kg.json_doc_status_impl import JsonDocStatusStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+
+
+def _open(tmp_path):
+    # Each open reads the files again, like a restarted process
+    finalize_share_data()
+    initialize_share_data()
+    storage = JsonDocStatusStorage(
+        namespace="doc_status",
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    asyncio.run(storage.initialize())
+    return storage
+
+
+def _doc(status, content="some text"):
+    return {
+        "status": status,
+        "content": content,
+        "content_summary": content[:4],
+        "content_length": len(content),
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": "2025-01-01T00:00:00",
+        "file_path": "doc.txt",
+    }
+
+
+def test_status_index_follows_upserts_and_deletes(tmp_path):
+    storage = _open(tmp_path)
+
+    async def write():
+        await storage.upsert({f"doc-{i}": _doc(DocStatus.PENDING) for i in range(4)})
+        await storage.upsert({"doc-0": _doc(DocStatus.PROCESSED)})
+        await storage.upsert({"doc-1": _doc(DocStatus.FAILED)})
+        await storage.delete(["doc-2"])
+
+    asyncio.run(write())
+    counts = asyncio.run(storage.get_status_counts())
+    assert counts[DocStatus.PENDING] == 1
+    assert counts[DocStatus.PROCESSED] == 1
+    assert counts[DocStatus.FAILED] == 1
+    assert counts[DocStatus.PROCESSING] == 0
+
+    pending = asyncio.run(storage.get_docs_by_status(DocStatus.PENDING))
+    assert list(pending) == ["doc-3"]
+    # The content is kept in full_docs only
+    assert "content" not in asyncio.run(storage.get_by_id("doc-3"))
+    assert pending["doc-3"].content == pending["doc-3"].content_summary
+
+    # Another process changed the records
+    storage._data["doc-3"] = _doc(DocStatus.PROCESSING)
+    storage.storage_updated.value = True
+    assert list(asyncio.run(storage.get_docs_by_status(DocStatus.PROCESSING))) == [
+        "doc-3"
+    ]
+    assert asyncio.run(storage.get_docs_by_status(DocStatus.PENDING)) == {}
+
+
+def test_legacy_content_of_processed_documents_is_dropped(tmp_path):
+    with open(tmp_path / "kv_store_doc_status.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {"doc-a": _doc("processed"), "doc-b": _doc("pending", "pending text")}, f
+        )
+
+    storage = _open(tmp_path)
+    assert "content" not in asyncio.run(storage.get_by_id("doc-a"))
+    pending = asyncio.run(storage.get_docs_by_status(DocStatus.PENDING))
+    assert pending["doc-b"].content == "pending text"
@@ -0,0 +1,91 @@
+"""
+Tests for MemmapVectorDBStorage, the memory-mapped local vector storage.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg import memmap_vector_impl
+from lightrag.kg.memmap_vector_impl import MemmapVectorDBStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+_WORDS = ["apple", "banana", "cherry", "grape", "lemon", "mango"]
+
+
+async def _embed(texts):
+    # One axis per known word, so a query for a word matches its record best
+    return np.array([[float(w in text) for w in _WORDS] + [0.1] for text in texts])
+
+
+def _open(tmp_path, dtype="float32"):
+    # Each open reads the files again, like a restarted process
+    finalize_share_data()
+    initialize_share_data()
+    storage = MemmapVectorDBStorage(
+        namespace="entities",
+        global_config={
+            "working_dir": str(tmp_path),
+            "embedding_batch_num": 2,
+            "vector_db_storage_cls_kwargs": {
+                "cosine_better_than_threshold": 0.5,
+                "vector_dtype": dtype,
+            },
+        },
+        embedding_func=EmbeddingFunc(embedding_dim=7, max_token_size=64, func=_embed),
+        meta_fields={"entity_name"},
+    )
+    asyncio.run(storage.initialize())
+    return storage
+
+
+def _records(*words):
+    return {f"ent-{w}": {"content": w, "entity_name": w.upper()} for w in words}
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_vectors_survive_restarts_with_upserts_and_deletes(tmp_path, dtype):
+    storage = _open(tmp_path, dtype)
+
+    async def write():
+        await storage.upsert(_records("apple", "banana", "cherry"))
+        await storage.index_done_callback()
+        await storage.upsert({"ent-apple": {"content": "grape", "entity_name": "G"}})
+        await storage.delete(["ent-banana"])
+        await storage.index_done_callback()
+
+    asyncio.run(write())
+
+    storage = _open(tmp_path, dtype)
+    assert isinstance(storage._segments[0].vectors, np.memmap)
+    results = asyncio.run(storage.query("grape", top_k=2))
+    assert [(r["id"], r["entity_name"]) for r in results] == [("ent-apple", "G")]
+    assert results[0]["distance"] == pytest.approx(1.0, abs=1e-3)
+    assert asyncio.run(storage.get_by_id("ent-banana")) is None
+    assert asyncio.run(storage.get_by_id("ent-cherry"))["entity_name"] == "CHERRY"
+    assert len(asyncio.run(storage.search_by_prefix("ent-"))) == 2
+
+
+def test_segments_are_merged(tmp_path, monkeypatch):
+    monkeypatch.setattr(memmap_vector_impl, "_MAX_SEGMENTS", 2)
+    storage = _open(tmp_path)
+
+    async def write():
+        for word in _WORDS:
+            await storage.upsert(_records(word))
+            await storage.index_done_callback()
+
+    asyncio.run(write())
+    assert len(storage._segments) <= 2
+    assert len(os.listdir(tmp_path / "memmap_vdb_entities")) <= 2 * 3 + 1
+
+    storage = _open(tmp_path)
+    results = asyncio.run(storage.query("mango", top_k=1))
+    assert [r["id"] for r in results] == ["ent-mango"]
+    assert len(asyncio.run(storage.get_by_ids([f"ent-{w}" for w in _WORDS]))) == 6
@@ -0,0 +1,83 @@
+"""
+Tests for the binary graph file of NetworkXStorage.
+"""
+
+import asyncio
+import os
+import sys
+
+import networkx as nx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg import delta_log
+from lightrag.kg.networkx_impl import NetworkXStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+
+
+def _open(tmp_path):
+    # Each open reads the files again, like a restarted process
+    finalize_share_data()
+    initialize_share_data()
+    storage = NetworkXStorage(
+        namespace="chunk_entity_relation",
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    asyncio.run(storage.initialize())
+    return storage
+
+
+def test_graph_survives_restart_and_exports_graphml(tmp_path, monkeypatch):
+    # Rewrite the binary snapshot on every index_done_callback
+    monkeypatch.setattr(delta_log, "_COMPACT_MIN_BYTES", 0)
+    storage = _open(tmp_path)
+    description = "<SEP>".join(["a long description"] * 50)
+
+    async def write():
+        await storage.upsert_node(
+            "Alice", {"entity_type": "person", "description": description}
+        )
+        await storage.upsert_node("Bob", {"entity_type": "person"})
+        await storage.upsert_edge(
+            "Alice", "Bob", {"weight": 2.5, "description": description}
+        )
+        await storage.index_done_callback()
+
+    asyncio.run(write())
+    assert sorted(os.listdir(tmp_path)) == [
+        "graph_chunk_entity_relation.delta.jsonl",
+        "graph_chunk_entity_relation.msgpack",
+    ]
+
+    storage = _open(tmp_path)
+    assert asyncio.run(storage.get_node("Alice")) == {
+        "entity_type": "person",
+        "description": description,
+    }
+    assert asyncio.run(storage.get_node("Bob")) == {"entity_type": "person"}
+    assert asyncio.run(storage.get_edge("Bob", "Alice")) == {
+        "weight": 2.5,
+        "description": description,
+    }
+
+    exported = asyncio.run(storage.export_graphml())
+    graph = nx.read_graphml(exported)
+    assert graph.nodes["Alice"]["description"] == description
+    assert graph.edges["Alice", "Bob"]["weight"] == 2.5
+
+
+def test_legacy_graphml_is_migrated(tmp_path):
+    graph = nx.Graph()
+    graph.add_node("Alice", entity_type="person")
+    graph.add_edge("Alice", "Bob", weight=1.0)
+    nx.write_graphml(graph, tmp_path / "graph_chunk_entity_relation.graphml")
+
+    storage = _open(tmp_path)
+    assert asyncio.run(storage.has_edge("Alice", "Bob"))
+    asyncio.run(storage.upsert_node("Carol", {"entity_type": "person"}))
+    asyncio.run(storage.index_done_callback())
+
+    storage = _open(tmp_path)
+    assert asyncio.run(storage.get_node("Alice")) == {"entity_type": "person"}
+    assert asyncio.run(storage.has_node("Carol"))
@@ -0,0 +1,74 @@
+"""
+Tests for the in-process streaming pipeline, using the local YouTube stand-in
+from the transcript tests and a recording ingest function.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import StreamingPipeline
+from transcript import AlternativeTranscriptExtractor
+from test_transcript_fetcher import CAPTIONED_IDS, _StandIn
+
+
+def test_pipeline_streams_discovered_videos_into_ingest(tmp_path):
+    ingested = {}
+
+    async def ingest(documents):
+        ingested.update(documents)
+        return {"new": len(documents), "changed": 0, "skipped": 0}
+
+    def discover(on_results):
+        on_results(
+            [
+                {
+                    "title": "One",
+                    "url": f"https://www.youtube.com/watch?v={CAPTIONED_IDS[0]}",
+                },
+                {"title": "Gone", "url": "https://www.youtube.com/watch?v=missing01"},
+            ]
+        )
+        # Already-seen videos and playlists are not fetched twice
+        on_results(
+            [
+                {"title": "One again", "url": f"https://youtu.be/{CAPTIONED_IDS[0]}"},
+                {"title": "Two", "url": f"https://youtu.be/{CAPTIONED_IDS[1]}"},
+                {"title": "List", "url": "https://www.youtube.com/playlist?list=PL1"},
+            ]
+        )
+
+    with _StandIn(delay=0) as stand_in:
+        extractor = AlternativeTranscriptExtractor(
+            catalog_path=str(tmp_path / "catalog.sqlite3"),
+            legacy_txt_file=str(tmp_path / "missing.txt"),
+            requests_per_second=0,
+            base_url=stand_in.base_url,
+            use_pytube=False,
+            cache_path=None,
+        )
+        extractor.retry_delay = 0.01
+        extractor.max_retry_delay = 0.02
+        extractor.catalog.add(
+            "Old", f"https://youtu.be/{CAPTIONED_IDS[2]}", "cached text"
+        )
+        pipeline = StreamingPipeline(ingest, discover=discover, extractor=extractor)
+        stats = asyncio.run(pipeline.run())
+
+    urls = sorted(url for _, url in ingested.values())
+    assert urls == sorted(
+        [
+            f"https://www.youtube.com/watch?v={CAPTIONED_IDS[0]}",
+            f"https://youtu.be/{CAPTIONED_IDS[1]}",
+            f"https://youtu.be/{CAPTIONED_IDS[2]}",
+        ]
+    )
+    assert extractor.catalog.get_transcript("missing01") == "NO_SUBTITLES_AVAILABLE"
+    assert extractor.catalog.get_transcript(CAPTIONED_IDS[1]).startswith("hello from")
+    assert stats["discover"].items == 5
+    assert stats["transcripts"].items == 3
+    assert stats["transcripts"].failed == 1
+    assert stats["ingest"].items == 3
@@ -0,0 +1,78 @@
+"""
+Tests for the debounced LLM cache flush after queries.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import LightRAG
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+
+async def _llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    return ""
+
+
+async def _embed(texts):
+    return np.ones((len(texts), 4))
+
+
+@pytest.fixture
+def rag(tmp_path):
+    finalize_share_data()
+    initialize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=_llm,
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+        auto_manage_storages_states=False,
+        llm_cache_flush_interval=3600,
+    )
+    asyncio.run(rag.initialize_storages())
+    flushes = []
+
+    async def count_flush():
+        flushes.append(1)
+
+    rag.llm_response_cache.index_done_callback = count_flush
+    rag.flushes = flushes
+    yield rag
+
+
+def test_deferred_flush_is_written_when_the_loop_ends(rag):
+    # The first query flushes, the second is deferred on its own loop
+    asyncio.run(rag._query_done())
+    asyncio.run(rag._query_done())
+    assert len(rag.flushes) == 2
+    asyncio.run(rag.finalize_storages())
+    assert len(rag.flushes) == 2
+
+
+def test_flush_deferred_on_an_idle_loop_happens_on_the_next_query(rag):
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(rag._query_done())
+    loop.run_until_complete(rag._query_done())
+    assert len(rag.flushes) == 1
+    # The loop of the deferred flush is not running, so this query writes it
+    asyncio.run(rag._query_done())
+    assert len(rag.flushes) == 2
+    asyncio.run(rag.finalize_storages())
+    loop.close()
+
+
+def test_finalize_writes_out_a_deferred_flush(rag):
+    async def queries():
+        await rag._query_done()
+        await rag._query_done()
+        assert len(rag.flushes) == 1
+        await rag.finalize_storages()
+
+    asyncio.run(queries())
+    assert len(rag.flushes) == 2
@@ -0,0 +1,159 @@
+"""
+Tests for the vectorized semantic LLM cache lookup.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import (
+    CacheData,
+    SemanticCacheIndex,
+    cosine_similarity,
+    get_best_cached_response,
+    get_semantic_cache_index,
+    quantize_embedding,
+    save_to_cache,
+)
+
+
+class _MemoryKV:
+    def __init__(self, **cache_config):
+        self.global_config = {
+            "enable_llm_cache": True,
+            "embedding_cache_config": {"enabled": True, **cache_config},
+        }
+        self.data = {}
+
+    async def get_by_id(self, id):
+        return self.data.get(id)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+
+def _save(kv, args_hash, embedding, content, cache_type="query"):
+    quantized, min_val, max_val = quantize_embedding(np.asarray(embedding))
+    asyncio.run(
+        save_to_cache(
+            kv,
+            CacheData(
+                args_hash=args_hash,
+                content=content,
+                prompt=f"prompt of {args_hash}",
+                quantized=quantized,
+                min_val=min_val,
+                max_val=max_val,
+                mode="local",
+                cache_type=cache_type,
+            ),
+        )
+    )
+
+
+def test_lookup_matches_the_dequantized_cosine_similarity():
+    rng = np.random.default_rng(0)
+    index = SemanticCacheIndex()
+    vectors = rng.normal(size=(50, 16))
+    for i, vector in enumerate(vectors):
+        index.add(str(i), *quantize_embedding(vector))
+
+    query = vectors[7] + rng.normal(scale=0.01, size=16)
+    best_id, similarity = index.best_match(query)
+    assert best_id == "7"
+    assert np.isclose(similarity, cosine_similarity(vectors[7], query), atol=1e-2)
+
+    # Rows moved by a removal keep their identity
+    index.remove(["0", "7"])
+    assert index.size == 48
+    assert index.best_match(vectors[49])[0] == "49"
+    assert index.best_match(np.ones(8)) is None
+
+
+def test_cache_hits_are_filtered_by_cache_type():
+    kv = _MemoryKV()
+    _save(kv, "a", [1.0, 0.0, 0.5], "answer a", cache_type="query")
+    _save(kv, "b", [0.0, 1.0, 0.5], "answer b", cache_type="keywords")
+
+    async def lookup(embedding, cache_type):
+        return await get_best_cached_response(
+            kv, np.asarray(embedding), mode="local", cache_type=cache_type
+        )
+
+    assert asyncio.run(lookup([1.0, 0.01, 0.5], "query")) == "answer a"
+    assert asyncio.run(lookup([1.0, 0.01, 0.5], "keywords")) is None
+    assert asyncio.run(lookup([0.01, 1.0, 0.5], "keywords")) == "answer b"
+
+
+def test_least_recently_used_and_expired_entries_are_evicted():
+    kv = _MemoryKV(max_entries=2)
+    _save(kv, "a", [1.0, 0.0, 0.0], "answer a")
+    _save(kv, "b", [0.0, 1.0, 0.0], "answer b")
+    assert (
+        asyncio.run(get_best_cached_response(kv, np.array([1.0, 0, 0]), mode="local"))
+        == "answer a"
+    )
+    _save(kv, "c", [0.0, 0.0, 1.0], "answer c")
+    assert sorted(kv.data["local"]) == ["a", "c"]
+
+    index = SemanticCacheIndex(ttl=60)
+    index.add("old", *quantize_embedding(np.array([1.0, 0.0, 0.0])), created=0)
+    assert index.best_match(np.array([1.0, 0.0, 0.0])) is None
+    assert index.evict() == ["old"]
+
+
+def test_index_picks_up_entries_written_by_another_process(tmp_path):
+    finalize_share_data()
+    initialize_share_data()
+
+    def open_kv():
+        kv = JsonKVStorage(
+            namespace="llm_response_cache",
+            global_config={
+                "working_dir": str(tmp_path),
+                "embedding_cache_config": {"enabled": True},
+            },
+            embedding_func=None,
+        )
+        asyncio.run(kv.initialize())
+        return kv
+
+    # Two storages on the same shared records stand in for two workers
+    writer, reader = open_kv(), open_kv()
+
+    async def lookup(embedding):
+        return await get_best_cached_response(
+            reader, np.asarray(embedding), mode="local"
+        )
+
+    _save(writer, "a", [1.0, 0.0, 0.5], "answer a")
+    assert asyncio.run(lookup([1.0, 0.01, 0.5])) == "answer a"
+    _save(writer, "b", [0.0, 1.0, 0.5], "answer b")
+    assert asyncio.run(lookup([0.01, 1.0, 0.5])) == "answer b"
+    # The reader's own writes do not make it rebuild
+    index = asyncio.run(get_semantic_cache_index(reader, "local"))
+    _save(reader, "c", [0.5, 0.5, 1.0], "answer c")
+    assert asyncio.run(lookup([0.5, 0.5, 1.0])) == "answer c"
+    assert asyncio.run(get_semantic_cache_index(reader, "local")) is index
+
+
+def test_index_without_versions_is_refreshed_after_an_interval():
+    writer = _MemoryKV()
+    reader = _MemoryKV(index_refresh_interval=0)
+    reader.data = writer.data
+
+    async def lookup(embedding):
+        return await get_best_cached_response(
+            reader, np.asarray(embedding), mode="local"
+        )
+
+    _save(writer, "a", [1.0, 0.0, 0.5], "answer a")
+    assert asyncio.run(lookup([1.0, 0.01, 0.5])) == "answer a"
+    _save(writer, "b", [0.0, 1.0, 0.5], "answer b")
+    assert asyncio.run(lookup([0.01, 1.0, 0.5])) == "answer b"
@@ -0,0 +1,63 @@
+"""
+Tests for the segment-aware chunking function. Token counts are replaced by
+word counts so the tests do not depend on tiktoken encoding downloads.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcript_chunking
+from transcript_chunking import chunking_by_segments, format_timestamped_transcript
+
+
+def _document(n_segments: int) -> str:
+    segments = [
+        {"start": i * 2.0, "duration": 2.0, "text": f"word{i} " * 4}
+        for i in range(n_segments)
+    ]
+    return (
+        "Title: Talk\n"
+        "URL: https://www.youtube.com/watch?v=abc\n"
+        f"Transcript:\n{format_timestamped_transcript(segments)}\n"
+    )
+
+
+def test_chunks_pack_whole_segments_with_overlap(monkeypatch):
+    monkeypatch.setattr(
+        transcript_chunking, "_count_tokens", lambda text, model: len(text.split())
+    )
+    # Each segment line is 5 "tokens", the header is 4
+    chunks = chunking_by_segments(_document(10), None, False, 5, 19, "gpt-4o")
+
+    assert [c["chunk_order_index"] for c in chunks] == list(range(len(chunks)))
+    assert [(c["start_seconds"], c["end_seconds"]) for c in chunks] == [
+        (0.0, 6.0),
+        (4.0, 10.0),
+        (8.0, 14.0),
+        (12.0, 18.0),
+        (16.0, 20.0),
+    ]
+    first = chunks[0]["content"].splitlines()
+    assert first[:2] == ["Title: Talk", "URL: https://www.youtube.com/watch?v=abc&t=0s"]
+    assert first[2].startswith("[0.00-2.00] word0")
+    assert chunks[1]["content"].splitlines()[1].endswith("&t=4s")
+    assert all(c["tokens"] <= 19 for c in chunks)
+
+
+def test_documents_without_segments_fall_back_to_token_chunking(monkeypatch):
+    calls = []
+
+    def fake_token_chunking(*args):
+        calls.append(args)
+        return [{"tokens": 1, "content": args[0], "chunk_order_index": 0}]
+
+    monkeypatch.setattr(
+        transcript_chunking, "chunking_by_token_size", fake_token_chunking
+    )
+    plain = "Title: Talk\nURL: u\nTranscript: no timestamps here\n"
+    assert (
+        chunking_by_segments(plain, None, False, 8, 64, "gpt-4o")[0]["content"] == plain
+    )
+    assert calls[0][3:] == (8, 64, "gpt-4o")
@@ -0,0 +1,285 @@
+"""
+Tests for the concurrent transcript fetch mode, transcript cache and video
+catalog.
+
+A local HTTP stand-in serves canned watch pages and timedtext XML, so the
+tests never touch YouTube.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript import AlternativeTranscriptExtractor, HostRateLimiter
+from transcript_cache import TranscriptCache
+import video_catalog
+from video_catalog import VideoCatalog
+
+CAPTIONED_IDS = [f"vid{i:03d}" for i in range(12)]
+
+
+class _StandIn:
+    """Tiny YouTube stand-in tracking request counts and peak concurrency"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    stand_in.in_flight += 1
+                    stand_in.peak_in_flight = max(
+                        stand_in.peak_in_flight, stand_in.in_flight
+                    )
+                try:
+                    time.sleep(stand_in.delay)
+                    parsed = urlparse(self.path)
+                    video_id = parse_qs(parsed.query).get("v", [""])[0]
+                    if parsed.path == "/watch":
+                        body = stand_in.watch_page(video_id)
+                    elif parsed.path == "/api/timedtext":
+                        body = stand_in.timedtext(video_id)
+                    else:
+                        body = None
+                    if body is None:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    data = body.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with stand_in.lock:
+                        stand_in.in_flight -= 1
+
+        return Handler
+
+    def watch_page(self, video_id: str) -> str:
+        if video_id not in CAPTIONED_IDS:
+            return "<html><body>no captions here</body></html>"
+        caption_url = f"{self.base_url}/api/timedtext?v={video_id}\\u0026lang=en"
+        return (
+            "<html><script>var ytInitialPlayerResponse = "
+            '{"captions":{"playerCaptionsTracklistRenderer":{"captionTracks":'
+            f'[{{"baseUrl":"{caption_url}","languageCode":"en"}}]}}}};'
+            "</script></html>"
+        )
+
+    def timedtext(self, video_id: str) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8" ?><transcript>'
+            f'<text start="0.0" dur="1.5">hello from {video_id}</text>'
+            '<text start="1.5" dur="2.0">it&amp;#39;s a test</text>'
+            "</transcript>"
+        )
+
+
+def _make_extractor(
+    base_url: str, concurrency: int, cache_path: Optional[str] = None
+) -> AlternativeTranscriptExtractor:
+    extractor = AlternativeTranscriptExtractor(
+        concurrency=concurrency,
+        requests_per_second=0,
+        base_url=base_url,
+        use_pytube=False,
+        cache_path=cache_path,
+    )
+    extractor.retry_delay = 0.01
+    extractor.max_retry_delay = 0.02
+    return extractor
+
+
+def test_concurrent_fetch_returns_parsed_transcripts():
+    with _StandIn() as stand_in:
+        extractor = _make_extractor(stand_in.base_url, concurrency=4)
+        results = asyncio.run(extractor.fetch_transcripts_async(CAPTIONED_IDS))
+
+    assert set(results) == set(CAPTIONED_IDS)
+    for video_id, transcript in results.items():
+        assert transcript == f"hello from {video_id} it's a test"
+    # One watch page plus one timedtext request per video
+    assert stand_in.requests == 2 * len(CAPTIONED_IDS)
+
+
+def test_concurrency_limit_is_respected_and_used():
+    with _StandIn(delay=0.1) as stand_in:
+        extractor = _make_extractor(stand_in.base_url, concurrency=3)
+        asyncio.run(extractor.fetch_transcripts_async(CAPTIONED_IDS))
+
+    assert stand_in.peak_in_flight <= 3
+    assert stand_in.peak_in_flight >= 2
+
+
+def test_missing_captions_retry_then_report_no_subtitles():
+    with _StandIn(delay=0) as stand_in:
+        extractor = _make_extractor(stand_in.base_url, concurrency=2)
+        results = asyncio.run(
+            extractor.fetch_transcripts_async(["missing01", CAPTIONED_IDS[0]])
+        )
+
+    assert results["missing01"] == "NO_SUBTITLES_AVAILABLE"
+    assert results[CAPTIONED_IDS[0]].startswith("hello from")
+    # Watch page requested once per attempt for the missing video
+    assert stand_in.requests == extractor.max_retries + 2
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    extractor = _make_extractor("http://127.0.0.1", concurrency=1)
+    extractor.retry_delay = 1
+    extractor.max_retry_delay = 4
+    for attempt in range(6):
+        delay = extractor._backoff_delay(attempt)
+        assert 0 <= delay <= min(4, 2**attempt)
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=20)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait("http://a.example/watch")
+    limiter.wait("http://b.example/watch")
+    elapsed = time.monotonic() - start
+    # Four enforced gaps of 50ms on host a, none for the first hit on host b
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_cache_serves_reruns_without_network(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite3")
+    video_ids = CAPTIONED_IDS[:3] + ["missing01"]
+    with _StandIn(delay=0) as stand_in:
+        first = _make_extractor(stand_in.base_url, 2, cache_path)
+        results = asyncio.run(first.fetch_transcripts_async(video_ids))
+        requests_after_first_run = stand_in.requests
+        assert first.cache.stats()["misses"] == len(video_ids)
+
+        second = _make_extractor(stand_in.base_url, 2, cache_path)
+        assert asyncio.run(second.fetch_transcripts_async(video_ids)) == results
+        assert second.get_transcript(CAPTIONED_IDS[0]) == results[CAPTIONED_IDS[0]]
+
+    assert stand_in.requests == requests_after_first_run
+    assert second.cache.stats() == {"hits": 4, "negative_hits": 1, "misses": 0}
+
+
+def test_cache_keeps_raw_xml_and_expires_negative_entries(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite3"), negative_ttl=0)
+    cache.put("abc", "en", "asr", "<transcript><text>auto</text></transcript>", "auto")
+    cache.put(
+        "abc", "en", "manual", "<transcript><text>hand</text></transcript>", "hand"
+    )
+    cache.put_negative("gone", "NO_SUBTITLES_AVAILABLE")
+
+    # Manual English tracks are preferred and expired negatives count as misses
+    assert cache.get("abc") == "hand"
+    assert cache.get("gone") is None
+    assert cache.purge_expired() == 1
+    raw = cache._conn.execute("SELECT raw_xml FROM caption_blobs").fetchall()
+    assert len(raw) == 2
+
+
+def test_catalog_imports_legacy_txt_once_and_dedups(tmp_path):
+    legacy = tmp_path / "youtube_urls.txt"
+    legacy.write_text(
+        "Title: First\nURL: https://www.youtube.com/watch?v=aaa\nTranscript: hi\n\n---\n\n"
+        "Title: Second\nURL: https://youtu.be/bbb\nTranscript: NO_SUBTITLES_AVAILABLE\n"
+        "\n---\n\nTitle: Third\nURL: https://www.youtube.com/watch?v=ccc\n",
+        encoding="utf-8",
+    )
+    catalog = VideoCatalog(str(tmp_path / "catalog.sqlite3"))
+    assert catalog.import_legacy_txt_once(str(legacy)) == 3
+    assert catalog.import_legacy_txt_once(str(legacy)) == 0
+
+    # Same video under another URL form is a duplicate
+    assert not catalog.add("Again", "https://youtu.be/aaa")
+    assert "https://www.youtube.com/watch?v=bbb" in catalog
+    assert len(catalog) == 3
+
+    missing = [
+        e["video_id"] for e in catalog.iter_entries(missing_transcripts_only=True)
+    ]
+    assert missing == ["bbb", "ccc"]
+    catalog.set_transcript("ccc", "done")
+    assert catalog.get_transcript("ccc") == "done"
+
+    exported = tmp_path / "export.txt"
+    assert catalog.export_txt(str(exported)) == 3
+    assert [e["title"] for e in catalog.iter_entries()] == ["First", "Second", "Third"]
+    assert "Transcript: done" in exported.read_text(encoding="utf-8")
+
+
+def test_catalog_is_written_while_iterating_and_from_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_catalog, "_PAGE_SIZE", 3)
+    catalog = VideoCatalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.add_many(
+        {"title": f"Video {i}", "url": f"https://youtu.be/v{i:02d}"} for i in range(10)
+    )
+
+    # Marking entries as failed while iterating neither repeats nor skips any
+    seen = []
+    for entry in catalog.iter_entries(missing_transcripts_only=True):
+        seen.append(entry["video_id"])
+        catalog.set_transcript(entry["video_id"], "ERROR_INVALID_URL")
+    assert seen == [f"v{i:02d}" for i in range(10)]
+
+    def save(i):
+        catalog.set_transcript(f"v{i:02d}", f"transcript {i}")
+        assert catalog.get_transcript(f"v{i:02d}") == f"transcript {i}"
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not list(catalog.iter_entries(missing_transcripts_only=True))
+    catalog.close()
+
+
+def test_saved_transcripts_keep_timestamped_segments(tmp_path):
+    with _StandIn(delay=0) as stand_in:
+        extractor = AlternativeTranscriptExtractor(
+            catalog_path=str(tmp_path / "catalog.sqlite3"),
+            legacy_txt_file=str(tmp_path / "missing.txt"),
+            requests_per_second=0,
+            base_url=stand_in.base_url,
+            use_pytube=False,
+            cache_path=str(tmp_path / "cache.sqlite3"),
+        )
+        extractor.catalog.add("One", f"https://youtu.be/{CAPTIONED_IDS[0]}")
+        extractor.update_json_with_transcripts(concurrent=True)
+
+    entry = next(extractor.catalog.iter_entries(with_transcripts=True))
+    assert entry["transcript"] == f"hello from {CAPTIONED_IDS[0]} it's a test"
+    assert entry["segments"] == [
+        {"start": 0.0, "duration": 1.5, "text": f"hello from {CAPTIONED_IDS[0]}"},
+        {"start": 1.5, "duration": 2.0, "text": "it's a test"},
+    ]
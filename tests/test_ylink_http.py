@@ -0,0 +1,150 @@
+"""
+Tests for the browserless link extraction backend, replaying recorded-style
+YouTube pages from tests/fixtures/ylink through a local HTTP server.
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ylink_extract import YouTubeExtractor
+from ylink_http import HttpEnumerator, extract_initial_data
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ylink")
+
+CONTINUATIONS = {
+    "TOKEN-PAGE-2": "playlist_continuation_2.json",
+    "TOKEN-PAGE-3": "playlist_continuation_3.json",
+}
+
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class _Replay:
+    """Serves fixture pages and records InnerTube continuation requests"""
+
+    def __init__(self):
+        self.posts = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body):
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                pages = {
+                    "/playlist": "playlist.html",
+                    "/results": "search.html",
+                    "/watch": "watch.html",
+                }
+                self._send(_fixture(pages[path]) if path in pages else None)
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers["Content-Length"])
+                payload = json.loads(self.rfile.read(length))
+                replay.posts.append(
+                    (parsed.path, parse_qs(parsed.query).get("key"), payload)
+                )
+                name = CONTINUATIONS.get(payload.get("continuation"))
+                self._send(_fixture(name) if name else None)
+
+        return Handler
+
+
+def test_playlist_follows_continuations_until_exhausted():
+    with _Replay() as replay:
+        backend = HttpEnumerator(base_url=replay.base_url)
+        results = backend.playlist("https://www.youtube.com/playlist?list=PLtest")
+
+    assert [r["url"] for r in results] == [
+        f"https://www.youtube.com/watch?v=pl{i:03d}" for i in range(1, 7)
+    ]
+    assert results[0]["title"] == "1. 1. Lecture 1"
+    # Two continuation pages, posted with the page's API key and client context
+    assert [p[0] for p in replay.posts] == ["/youtubei/v1/browse"] * 2
+    assert replay.posts[0][1] == ["test-key"]
+    assert replay.posts[0][2]["context"]["client"]["clientName"] == "WEB"
+
+
+def test_search_only_returns_video_results_up_to_limit():
+    with _Replay() as replay:
+        backend = HttpEnumerator(base_url=replay.base_url)
+        results = backend.search("some topic", 3)
+
+    assert [r["url"][-5:] for r in results] == ["sr001", "sr002", "sr003"]
+    # The first page had enough results, so no continuation was requested
+    assert replay.posts == []
+
+
+def test_video_title_and_initial_data_parsing():
+    with _Replay() as replay:
+        backend = HttpEnumerator(base_url=replay.base_url)
+        title = backend.video_title("https://www.youtube.com/watch?v=abc123")
+    assert title == "Watch page title"
+
+    data = extract_initial_data(_fixture("playlist.html").decode("utf-8"))
+    assert data["metadata"]["playlistMetadataRenderer"]["title"] == "Test playlist"
+    assert extract_initial_data("<html>no data</html>") is None
+
+
+class _FailingBackend:
+    name = "failing"
+
+    def playlist(self, playlist_url):
+        raise RuntimeError("layout changed")
+
+
+def test_extractor_falls_back_between_backends_and_cleans_results(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    with _Replay() as replay:
+        extractor = YouTubeExtractor(
+            backends=[_FailingBackend(), HttpEnumerator(base_url=replay.base_url)]
+        )
+        results = extractor.playlist_mode(
+            "https://www.youtube.com/playlist?list=PLtest"
+        )
+        extractor.close()
+
+    assert len(results) == 6
+    assert results[0] == {
+        "title": "1. Lecture 1",
+        "url": "https://www.youtube.com/watch?v=pl001",
+    }
+    extractor = YouTubeExtractor(backends=[])
+    assert len(list(extractor.catalog.iter_entries())) == 6
+    extractor.close()
@@ -0,0 +1,81 @@
+"""
+Tests for the incremental video ingest of youtuberag.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+import tiktoken
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lightrag import LightRAG, utils
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    initialize_pipeline_status,
+    initialize_share_data,
+)
+from lightrag.utils import EmbeddingFunc
+from video_catalog import VideoCatalog
+from youtuberag import ingest_new_videos, video_doc_id
+
+
+async def _llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    return "<|COMPLETE|>"
+
+
+async def _embed(texts):
+    return np.array([[len(t) % 7 + 1.0, 1.0, 0.5, 0.25] for t in texts])
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    # A byte-level encoding, so no tiktoken files need downloading
+    encoder = tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(utils, "ENCODER", encoder)
+    finalize_share_data()
+    initialize_share_data()
+    rag = LightRAG(
+        working_dir=str(tmp_path / "rag"),
+        llm_model_func=_llm,
+        embedding_func=EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+        auto_manage_storages_states=False,
+    )
+    asyncio.run(rag.initialize_storages())
+    asyncio.run(initialize_pipeline_status())
+    yield rag
+    asyncio.run(rag.finalize_storages())
+
+
+def test_unchanged_catalog_is_not_ingested_again(rag, tmp_path):
+    catalog = VideoCatalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.add("One", "https://youtu.be/video00001", "first transcript")
+    catalog.add("Two", "https://youtu.be/video00002", "second transcript")
+
+    stats = asyncio.run(ingest_new_videos(rag, catalog))
+    assert stats == {"new": 2, "changed": 0, "skipped": 0}
+
+    deleted = []
+
+    async def record_delete(doc_id):
+        deleted.append(doc_id)
+
+    rag.adelete_by_doc_id = record_delete
+    stats = asyncio.run(ingest_new_videos(rag, catalog))
+    assert stats == {"new": 0, "changed": 0, "skipped": 2}
+    assert deleted == []
+
+    # A changed transcript is still picked up
+    catalog.set_transcript("video00002", "second transcript, corrected")
+    stats = asyncio.run(ingest_new_videos(rag, catalog))
+    assert stats == {"new": 0, "changed": 1, "skipped": 1}
+    assert deleted == [video_doc_id("video00002")]
+    catalog.close()
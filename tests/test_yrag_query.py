@@ -0,0 +1,71 @@
+"""
+Tests for the warm LightRAG instance of the yrag_query chat session.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import tiktoken
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yrag_query
+from lightrag import utils
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+
+async def _llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    if kwargs.get("keyword_extraction"):
+        return '{"high_level_keywords": ["talks"], "low_level_keywords": ["speaker"]}'
+    return "an answer"
+
+
+async def _embed(texts):
+    return np.array([[len(t) % 7 + 1.0, 1.0, 0.5, 0.25] for t in texts])
+
+
+def test_consecutive_queries_reuse_the_loaded_storages(tmp_path, monkeypatch):
+    # A byte-level encoding, so no tiktoken files need downloading
+    encoder = tiktoken.Encoding(
+        name="test-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(utils, "ENCODER", encoder)
+    working_dir = tmp_path / "yrag"
+    working_dir.mkdir()
+    monkeypatch.setattr(yrag_query, "WORKING_DIR", str(working_dir))
+    monkeypatch.setattr(
+        yrag_query,
+        "openai_embed",
+        EmbeddingFunc(embedding_dim=4, max_token_size=64, func=_embed),
+    )
+    loads = []
+    load_existing_rag = yrag_query.load_existing_rag
+
+    async def counting_load(llm_model_func):
+        loads.append(1)
+        return await load_existing_rag(llm_model_func)
+
+    monkeypatch.setattr(yrag_query, "load_existing_rag", counting_load)
+    finalize_share_data()
+    initialize_share_data()
+
+    async def chat():
+        session = yrag_query.RagSession()
+        warm_rag = yrag_query.WarmRag()
+        warm_rag.llm = yrag_query.TimedLLM(_llm)
+        try:
+            await yrag_query.chat_with_rag("who spoke?", session, warm_rag)
+            await yrag_query.chat_with_rag("about what?", session, warm_rag)
+        finally:
+            await warm_rag.close()
+
+    asyncio.run(chat())
+    # The queries wrote the LLM and embedding caches, which is no reason to reload
+    assert any(name.startswith("embedding_cache") for name in os.listdir(working_dir))
+    assert len(loads) == 1
@@ -1,41 +1,112 @@
 import json
 import re
 import time
+import random
+import asyncio
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
 from pytube import YouTube
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, NamedTuple, Optional, Union
 from urllib.parse import parse_qs, urlparse
 import html
 import os
 import csv
 
+from transcript_cache import TranscriptCache
+from video_catalog import VideoCatalog, extract_video_id
+
+
+class CaptionTrack(NamedTuple):
+    """A downloaded caption track before parsing"""
+
+    language: str
+    track: str  # "manual" or "asr" (auto-generated)
+    xml: str
+
+
+class HostRateLimiter:
+    """Thread-safe limiter that spaces out requests to the same host"""
+
+    def __init__(self, requests_per_second: float = 5.0):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Block until a request to the host of `url` is allowed"""
+        if not self.min_interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that passes every request through a HostRateLimiter"""
+
+    def __init__(self, rate_limiter: Optional[HostRateLimiter] = None):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        return super().request(method, url, *args, **kwargs)
+
+
 class AlternativeTranscriptExtractor:
-    def __init__(self, txt_file="youtube_urls.txt"):
-        self.txt_file = txt_file
+    def __init__(
+        self,
+        catalog_path: str = "video_catalog.sqlite3",
+        legacy_txt_file: str = "youtube_urls.txt",
+        concurrency: int = 8,
+        requests_per_second: float = 5.0,
+        base_url: str = "https://www.youtube.com",
+        use_pytube: bool = True,
+        cache_path: Optional[str] = "transcript_cache.sqlite3",
+    ):
+        self.catalog_path = catalog_path
+        self.legacy_txt_file = legacy_txt_file
+        self._catalog: Optional[VideoCatalog] = None
         self.max_retries = 3
         self.retry_delay = 2
+        self.max_retry_delay = 30
+        self.request_timeout = 15
+        self.concurrency = max(1, concurrency)
+        self.base_url = base_url.rstrip("/")
+        self.use_pytube = use_pytube
+        self.cache = TranscriptCache(cache_path) if cache_path else None
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        self.session = requests.Session()
+        self.session = RateLimitedSession(HostRateLimiter(requests_per_second))
         self.session.headers.update({"User-Agent": self.user_agent})
+        # Size the connection pool to the concurrency limit so that parallel
+        # fetches reuse keep-alive connections instead of opening new ones
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency, pool_maxsize=self.concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def catalog(self) -> VideoCatalog:
+        """Video catalog, opened on first use and seeded from the legacy TXT file"""
+        if self._catalog is None:
+            self._catalog = VideoCatalog(self.catalog_path)
+            self._catalog.import_legacy_txt_once(self.legacy_txt_file)
+        return self._catalog
 
     def _extract_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL"""
-        try:
-            # Handle youtube.com URLs
-            if "youtube.com" in url:
-                query = urlparse(url).query
-                return parse_qs(query)["v"][0]
-            # Handle youtu.be URLs
-            elif "youtu.be" in url:
-                return urlparse(url).path.lstrip("/")
-            else:
-                return ""
-        except Exception:
-            return ""
+        return extract_video_id(url)
 
-    def _get_captions_from_pytube(self, video_id: str) -> str:
-        """Attempt to get captions using pytube"""
+    def _get_caption_track_from_pytube(self, video_id: str) -> Optional[CaptionTrack]:
+        """Attempt to get a caption track using pytube"""
         try:
             url = f"https://www.youtube.com/watch?v={video_id}"
             yt = YouTube(url)
@@ -45,27 +116,35 @@ class AlternativeTranscriptExtractor:
             
             if not caption_tracks:
                 print(f"  ⚠️ No captions available via pytube")
-                return ""
-            
-            # Try English captions first (both 'en' and 'a.en')
-            en_caption = caption_tracks.get('en') or caption_tracks.get('a.en')
+                return None
             
-            if en_caption:
-                caption_xml = en_caption.xml_captions
-                return self._parse_caption_xml(caption_xml)
+            # Try English captions first (both 'en' and 'a.en'), then the
+            # first available caption
+            candidates = [
+                (code, caption_tracks.get(code))
+                for code in ('en', 'a.en')
+                if caption_tracks.get(code)
+            ]
+            candidates += list(caption_tracks.items())
             
-            # If no English captions, try the first available caption
-            for lang_code, caption in caption_tracks.items():
+            for lang_code, caption in candidates:
                 try:
-                    caption_xml = caption.xml_captions
-                    return self._parse_caption_xml(caption_xml)
+                    track = "asr" if lang_code.startswith("a.") else "manual"
+                    return CaptionTrack(
+                        lang_code.split(".")[-1], track, caption.xml_captions
+                    )
                 except Exception:
                     continue
                 
-            return ""
+            return None
         except Exception as e:
             print(f"  ⚠️ Error in pytube extraction: {str(e)}")
-            return ""
+            return None
+
+    def _get_captions_from_pytube(self, video_id: str) -> str:
+        """Attempt to get captions using pytube"""
+        track = self._get_caption_track_from_pytube(video_id)
+        return self._parse_caption_xml(track.xml) if track else ""
 
     def _parse_caption_xml(self, caption_xml: str) -> str:
         """Parse caption XML and convert to plain text"""
@@ -82,15 +161,51 @@ class AlternativeTranscriptExtractor:
             print(f"  ⚠️ Error parsing caption XML: {str(e)}")
             return ""
 
-    def _get_captions_from_direct_request(self, video_id: str) -> str:
-        """Attempt to get captions using direct HTTP requests"""
+    def _parse_caption_segments(self, caption_xml: str) -> List[Dict]:
+        """Parse caption XML into [{"start", "duration", "text"}] segments"""
+        try:
+            root = ET.fromstring(caption_xml)
+        except Exception as e:
+            print(f"  ⚠️ Error parsing caption XML: {str(e)}")
+            return []
+        segments = []
+        for element in root.findall('.//text'):
+            if not element.text:
+                continue
+            text = ' '.join(html.unescape(element.text).split())
+            if text:
+                segments.append({
+                    "start": float(element.get("start", 0)),
+                    "duration": float(element.get("dur", 0)),
+                    "text": text,
+                })
+        return segments
+
+    def get_segments(self, video_id: str) -> Optional[List[Dict]]:
+        """Timestamped segments of the cached caption track, if one is cached"""
+        if self.cache is None:
+            return None
+        caption_xml = self.cache.get_raw_xml(video_id)
+        return self._parse_caption_segments(caption_xml) if caption_xml else None
+
+    def save_transcript(self, video_id: str, transcript: str) -> None:
+        """Store a fetched transcript and its timestamped segments in the catalog"""
+        segments = None
+        if not transcript.startswith(("ERROR_", "NO_")):
+            segments = self.get_segments(video_id)
+        self.catalog.set_transcript(video_id, transcript, segments)
+
+    def _get_caption_track_from_direct_request(
+        self, video_id: str
+    ) -> Optional[CaptionTrack]:
+        """Attempt to get a caption track using direct HTTP requests"""
         try:
             # First, get the video page to extract timedtext URL
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self.session.get(url)
+            url = f"{self.base_url}/watch?v={video_id}"
+            response = self.session.get(url, timeout=self.request_timeout)
             
             if response.status_code != 200:
-                return ""
+                return None
             
             # Try to find the caption track URL
             # Look for playerCaptionsTracklistRenderer
@@ -98,7 +213,7 @@ class AlternativeTranscriptExtractor:
             matches = re.search(pattern, response.text)
             
             if not matches:
-                return ""
+                return None
             
             caption_tracks_json = matches.group(1)
             # Replace backslashes and clean up the JSON
@@ -115,187 +230,263 @@ class AlternativeTranscriptExtractor:
                 base_url_pattern = r'"baseUrl":\s*"(.*?)"'
                 base_url_matches = re.search(base_url_pattern, caption_tracks_json)
                 if not base_url_matches:
-                    return ""
+                    return None
                 caption_url = base_url_matches.group(1)
             
             # Fetch the caption file
-            caption_response = self.session.get(caption_url)
+            caption_response = self.session.get(
+                caption_url, timeout=self.request_timeout
+            )
             if caption_response.status_code != 200:
-                return ""
+                return None
             
-            # Parse the XML
-            return self._parse_caption_xml(caption_response.text)
+            # The timedtext URL carries the language and, for auto-generated
+            # captions, kind=asr
+            caption_params = parse_qs(urlparse(caption_url).query)
+            language = caption_params.get("lang", [""])[0]
+            track = "asr" if caption_params.get("kind", [""])[0] == "asr" else "manual"
+            return CaptionTrack(language, track, caption_response.text)
             
         except Exception as e:
             print(f"  ⚠️ Error in direct request extraction: {str(e)}")
-            return ""
+            return None
 
-    def _load_txt_data(self) -> list:
-        """Load data from TXT file"""
-        try:
-            if not os.path.exists(self.txt_file):
-                print(f"Error: TXT file '{self.txt_file}' not found!")
-                return []
+    def _get_captions_from_direct_request(self, video_id: str) -> str:
+        """Attempt to get captions using direct HTTP requests"""
+        track = self._get_caption_track_from_direct_request(video_id)
+        return self._parse_caption_xml(track.xml) if track else ""
 
-            entries = []
-            current_entry = {}
-            
-            with open(self.txt_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                sections = content.split("\n---\n")
-                
-                for section in sections:
-                    if not section.strip():
-                        continue
-                    
-                    lines = section.strip().split("\n")
-                    current_entry = {}
-                    
-                    for line in lines:
-                        if line.startswith("Title: "):
-                            current_entry["title"] = line[7:]
-                        elif line.startswith("URL: "):
-                            current_entry["url"] = line[5:]
-                        elif line.startswith("Transcript: "):
-                            current_entry["transcript"] = line[12:]
-                    
-                    if current_entry:
-                        entries.append(current_entry)
-                        
-            return entries
-        except Exception as e:
-            print(f"Error loading TXT file: {e}")
-            return []
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (0-based) attempt"""
+        ceiling = min(self.max_retry_delay, self.retry_delay * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def _caption_sources(self, direct_first: bool = False) -> list:
+        """Caption track getters in the order they should be tried"""
+        sources = [self._get_caption_track_from_direct_request]
+        if self.use_pytube:
+            if direct_first:
+                sources.append(self._get_caption_track_from_pytube)
+            else:
+                sources.insert(0, self._get_caption_track_from_pytube)
+        return sources
+
+    def _fetch_and_cache(self, video_id: str, sources: list) -> str:
+        """Try each caption source in order and cache the first usable track"""
+        for get_track in sources:
+            track = get_track(video_id)
+            if not track:
+                continue
+            transcript = self._parse_caption_xml(track.xml)
+            if transcript:
+                if self.cache is not None:
+                    self.cache.put(
+                        video_id, track.language, track.track, track.xml, transcript
+                    )
+                return transcript
+        return ""
+
+    def _remember_failure(self, video_id: str, result: str) -> str:
+        """Record a NO_/ERROR_ result in the cache so reruns can skip the video"""
+        if self.cache is not None:
+            self.cache.put_negative(video_id, result)
+        return result
 
     def get_transcript(self, video_id: str) -> str:
-        """Get transcript using multiple methods"""
+        """Get transcript from the cache, falling back to multiple methods"""
+        if self.cache is not None:
+            cached = self.cache.get(video_id)
+            if cached is not None:
+                return cached
+
+        # Try pytube method first, then the direct request method
+        sources = self._caption_sources()
         for attempt in range(self.max_retries):
             try:
-                # Try pytube method first
-                transcript = self._get_captions_from_pytube(video_id)
-                if transcript:
-                    return transcript
-                
-                # If pytube fails, try direct request method
-                transcript = self._get_captions_from_direct_request(video_id)
+                transcript = self._fetch_and_cache(video_id, sources)
                 if transcript:
                     return transcript
-                
+
                 if attempt < self.max_retries - 1:
                     print(f"  ⚠️ Retry {attempt + 1}/{self.max_retries}")
-                    time.sleep(self.retry_delay)
+                    time.sleep(self._backoff_delay(attempt))
                 else:
-                    return "NO_SUBTITLES_AVAILABLE"
-                    
+                    return self._remember_failure(video_id, "NO_SUBTITLES_AVAILABLE")
+
             except Exception as e:
                 if attempt < self.max_retries - 1:
                     print(f"  ⚠️ Retry {attempt + 1}/{self.max_retries}")
-                    time.sleep(self.retry_delay)
+                    time.sleep(self._backoff_delay(attempt))
                 else:
-                    return f"ERROR_{str(e).replace(chr(10), ' ')}"
-        
+                    return self._remember_failure(
+                        video_id, f"ERROR_{str(e).replace(chr(10), ' ')}"
+                    )
+
         return "NO_SUBTITLES_AVAILABLE"
 
-    def update_json_with_transcripts(self):
-        """Update TXT file with transcripts for all videos"""
+    async def get_transcript_async(
+        self, video_id: str, semaphore: asyncio.Semaphore
+    ) -> str:
+        """Get transcript without blocking the event loop.
+
+        The cache is consulted first. On a miss the pooled, rate-limited direct
+        request method is tried before pytube. At most `self.concurrency`
+        fetches hold the semaphore at once, and retries back off without
+        holding it.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(video_id)
+            if cached is not None:
+                return cached
+
+        sources = self._caption_sources(direct_first=True)
+        for attempt in range(self.max_retries):
+            try:
+                async with semaphore:
+                    transcript = await asyncio.to_thread(
+                        self._fetch_and_cache, video_id, sources
+                    )
+                if transcript:
+                    return transcript
+
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                else:
+                    return self._remember_failure(video_id, "NO_SUBTITLES_AVAILABLE")
+
+            except Exception as e:
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                else:
+                    return self._remember_failure(
+                        video_id, f"ERROR_{str(e).replace(chr(10), ' ')}"
+                    )
+
+        return "NO_SUBTITLES_AVAILABLE"
+
+    async def fetch_transcripts_async(
+        self, video_ids: List[str], on_result=None
+    ) -> Dict[str, str]:
+        """Fetch transcripts for many videos concurrently.
+
+        Args:
+            video_ids: Video IDs to fetch, duplicates are fetched once
+            on_result: Optional callback(video_id, transcript) invoked as each
+                fetch completes
+
+        Returns:
+            Mapping of video ID to transcript (or NO_/ERROR_ marker)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        unique_ids = list(dict.fromkeys(video_ids))
+
+        async def fetch_one(video_id: str):
+            transcript = await self.get_transcript_async(video_id, semaphore)
+            if on_result is not None:
+                on_result(video_id, transcript)
+            return video_id, transcript
+
+        results = await asyncio.gather(*(fetch_one(vid) for vid in unique_ids))
+        return dict(results)
+
+    def update_json_with_transcripts(self, concurrent: bool = False):
+        """Fetch transcripts for every catalog entry that does not have one yet
+
+        Args:
+            concurrent: If True, fetch transcripts in parallel (bounded by
+                `self.concurrency`) instead of one video at a time
+        """
         try:
-            data = self._load_txt_data()
-            if not data:
+            catalog = self.catalog
+            total = len(catalog)
+            if not total:
+                print("No videos in the catalog!")
                 return
 
-            total = len(data)
-            success = 0
-            failed = 0
-            no_subs = 0
-            skipped = 0
+            stats = {"success": 0, "failed": 0, "no_subs": 0, "skipped": 0}
+            pending = []  # (title, video_id)
 
             print(f"\nProcessing {total} videos...")
             print("-" * 50)
 
-            for i, entry in enumerate(data, 1):
-                # Check if entry already has a valid transcript
-                has_valid_transcript = (
-                    'transcript' in entry and 
-                    isinstance(entry['transcript'], str) and 
-                    entry['transcript'] and 
-                    not entry['transcript'].startswith(("ERROR_", "NO_"))
-                )
-                
-                if has_valid_transcript:
-                    skipped += 1
-                    print(f"[{i}/{total}] Skipping (already has transcript): {entry['title'][:70]}")
+            # Only entries without a usable transcript are read from the catalog
+            for entry in catalog.iter_entries(missing_transcripts_only=True):
+                if not self._extract_video_id(entry['url']):
+                    print(f"  ❌ Failed: Could not extract video ID from URL: {entry['url']}")
+                    stats["failed"] += 1
+                    catalog.set_transcript(entry['video_id'], "ERROR_INVALID_URL")
                     continue
+                pending.append((entry['title'], entry['video_id']))
 
-                print(f"[{i}/{total}] Processing: {entry['title'][:70]}...")
-                
-                # Extract video ID
-                if 'url' in entry and entry['url']:
-                    video_id = self._extract_video_id(entry['url'])
-                    if not video_id:
-                        print(f"  ❌ Failed: Could not extract video ID from URL: {entry['url']}")
-                        failed += 1
-                        entry['transcript'] = "ERROR_INVALID_URL"
-                        continue
-                else:
-                    print(f"  ❌ Failed: No URL provided for video")
-                    failed += 1
-                    entry['transcript'] = "ERROR_NO_URL"
-                    continue
-                
-                # Get transcript
-                transcript = self.get_transcript(video_id)
-                
-                if transcript.startswith("ERROR_"):
-                    print(f"  ❌ Failed: {transcript[6:]}")
-                    failed += 1
-                elif transcript == "NO_SUBTITLES_AVAILABLE":
-                    print(f"  ⚠️ No subtitles available")
-                    no_subs += 1
-                else:
-                    word_count = len(transcript.split())
-                    print(f"  ✓ Success ({word_count} words)")
-                    success += 1
-                
-                entry['transcript'] = transcript
+            stats["skipped"] = total - len(pending) - stats["failed"]
+            if stats["skipped"]:
+                print(f"Skipping {stats['skipped']} videos that already have transcripts")
+
+            if concurrent and pending:
+                print(f"Fetching {len(pending)} transcripts with concurrency {self.concurrency}...")
+                titles = {video_id: title for title, video_id in pending}
+                done = 0
 
-            # Save the updated data back to the file
-            with open(self.txt_file, 'w', encoding='utf-8') as f:
-                for entry in data:
-                    f.write(f"Title: {entry.get('title', '')}\n")
-                    f.write(f"URL: {entry.get('url', '')}\n")
-                    f.write(f"Transcript: {entry.get('transcript', '')}\n")
-                    f.write("\n---\n\n")
+                def report(video_id: str, transcript: str):
+                    nonlocal done
+                    done += 1
+                    print(f"[{done}/{len(titles)}] {titles[video_id][:70]}")
+                    self._report_transcript_result(transcript, stats)
+                    self.save_transcript(video_id, transcript)
+
+                asyncio.run(
+                    self.fetch_transcripts_async(list(titles), on_result=report)
+                )
+            else:
+                for i, (title, video_id) in enumerate(pending, 1):
+                    print(f"[{i}/{len(pending)}] Processing: {title[:70]}...")
+                    transcript = self.get_transcript(video_id)
+                    self._report_transcript_result(transcript, stats)
+                    self.save_transcript(video_id, transcript)
 
             print("\nSummary:")
             print(f"Total videos: {total}")
-            print(f"Skipped (already had transcripts): {skipped}")
-            print(f"Successfully extracted: {success}")
-            print(f"No subtitles available: {no_subs}")
-            print(f"Failed to extract: {failed}")
+            print(f"Skipped (already had transcripts): {stats['skipped']}")
+            print(f"Successfully extracted: {stats['success']}")
+            print(f"No subtitles available: {stats['no_subs']}")
+            print(f"Failed to extract: {stats['failed']}")
+            if self.cache is not None:
+                cache_stats = self.cache.stats()
+                print(
+                    f"Transcript cache: {cache_stats['hits']} hits, "
+                    f"{cache_stats['negative_hits']} negative hits, "
+                    f"{cache_stats['misses']} misses"
+                )
 
         except Exception as e:
             print(f"Error updating transcripts: {e}")
 
+    def _report_transcript_result(self, transcript: str, stats: Dict[str, int]) -> None:
+        """Print the outcome of one fetch and update the summary counters"""
+        if transcript.startswith("ERROR_"):
+            print(f"  ❌ Failed: {transcript[6:]}")
+            stats["failed"] += 1
+        elif transcript == "NO_SUBTITLES_AVAILABLE":
+            print(f"  ⚠️ No subtitles available")
+            stats["no_subs"] += 1
+        else:
+            word_count = len(transcript.split())
+            print(f"  ✓ Success ({word_count} words)")
+            stats["success"] += 1
+
     def export_to_txt(self) -> None:
-        """Export data to TXT file in youtubeRag directory"""
+        """Export the catalog to a TXT file in youtubeRag directory"""
         try:
-            data = self._load_txt_data()
-
             # Create youtubeRag directory if it doesn't exist
-            output_dir = os.path.join(os.path.dirname(self.txt_file), 'youtubeRag')
+            output_dir = os.path.join(os.path.dirname(self.catalog_path), 'youtubeRag')
             os.makedirs(output_dir, exist_ok=True)
             
             # Create TXT file path in youtubeRag directory
-            txt_filename = os.path.basename(self.txt_file)
+            txt_filename = os.path.basename(self.legacy_txt_file)
             txt_file = os.path.join(output_dir, txt_filename)
             
-            # Write to TXT
-            with open(txt_file, 'w', encoding='utf-8') as f:
-                for entry in data:
-                    f.write(f"Title: {entry.get('title', '')}\n")
-                    f.write(f"URL: {entry.get('url', '')}\n")
-                    f.write(f"Transcript: {entry.get('transcript', '')}\n")
-                    f.write("\n---\n\n")
+            # Stream entries from the catalog into the TXT file
+            self.catalog.export_txt(txt_file)
             
             print(f"\nText file created: {txt_file}")
             
@@ -306,7 +497,7 @@ def main():
     # Make sure you have these libraries installed:
     # pip install pytube requests
     extractor = AlternativeTranscriptExtractor()
-    extractor.update_json_with_transcripts()
+    extractor.update_json_with_transcripts(concurrent=True)
     extractor.export_to_txt()
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TranscriptCache:
+    """Persistent SQLite cache for caption tracks and parsed transcripts.
+
+    Raw caption XML is stored once per content hash, and each
+    (video_id, language, track) entry points at its blob. Failed lookups are
+    recorded as negative entries that expire after a TTL, so reruns do not
+    hit the network for videos known to have no subtitles.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "transcript_cache.sqlite3",
+        negative_ttl: float = 7 * 24 * 3600,
+        error_ttl: float = 3600,
+    ):
+        self.db_path = db_path
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        # Fetches run in worker threads, so one connection is shared under a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS caption_blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    raw_xml TEXT NOT NULL,
+                    text TEXT NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    track TEXT NOT NULL,
+                    content_hash TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (video_id, language, track)
+                )"""
+            )
+
+    def get(self, video_id: str, language: Optional[str] = None) -> Optional[str]:
+        """Return the cached transcript or negative marker, or None on a miss.
+
+        Positive entries win over negative ones; among positive entries English
+        manual tracks are preferred, matching the order the fetchers use.
+        """
+        now = time.time()
+        query = (
+            "SELECT t.status, b.text FROM transcripts t "
+            "LEFT JOIN caption_blobs b ON b.content_hash = t.content_hash "
+            "WHERE t.video_id = ? AND (t.expires_at IS NULL OR t.expires_at > ?)"
+        )
+        params = [video_id, now]
+        if language is not None:
+            query += " AND t.language IN (?, '')"
+            params.append(language)
+        query += (
+            " ORDER BY t.content_hash IS NULL, t.language != 'en',"
+            " t.track != 'manual' LIMIT 1"
+        )
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            status, text = row
+            if text is not None:
+                self.hits += 1
+                return text
+            self.negative_hits += 1
+            return status
+
+    def get_raw_xml(self, video_id: str) -> Optional[str]:
+        """Return the raw caption XML of the preferred cached track, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.raw_xml FROM transcripts t "
+                "JOIN caption_blobs b ON b.content_hash = t.content_hash "
+                "WHERE t.video_id = ? "
+                "ORDER BY t.language != 'en', t.track != 'manual' LIMIT 1",
+                (video_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self, video_id: str, language: str, track: str, raw_xml: str, text: str
+    ) -> None:
+        """Store a fetched caption track and its parsed text"""
+        content_hash = hashlib.sha256(raw_xml.encode("utf-8")).hexdigest()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO caption_blobs VALUES (?, ?, ?)",
+                (content_hash, raw_xml, text),
+            )
+            # A real track supersedes any earlier negative result for the video
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE video_id = ? AND content_hash IS NULL",
+                (video_id,),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, 'OK', ?, NULL)",
+                (video_id, language, track, content_hash, time.time()),
+            )
+
+    def put_negative(self, video_id: str, status: str) -> None:
+        """Record a NO_/ERROR_ result that expires after the matching TTL"""
+        ttl = self.error_ttl if status.startswith("ERROR_") else self.negative_ttl
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, '', '', NULL, ?, ?, ?)",
+                (video_id, status, now, now + ttl),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired negative entries and return how many were removed"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM transcripts WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
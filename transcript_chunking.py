@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from lightrag.operate import chunking_by_token_size
+from lightrag.utils import encode_string_by_tiktoken
+
+# One caption segment per line: "[start-end] text", times in seconds
+_SEGMENT_LINE = re.compile(r"^\[(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)\] (.*)$")
+
+
+def format_timestamped_transcript(segments: List[Dict[str, Any]]) -> str:
+    """Render caption segments as "[start-end] text" lines"""
+    lines = []
+    for segment in segments:
+        start = float(segment["start"])
+        end = start + float(segment.get("duration", 0))
+        lines.append(f"[{start:.2f}-{end:.2f}] {segment['text']}")
+    return "\n".join(lines)
+
+
+def timestamp_url(url: str, seconds: float) -> str:
+    """Add a t= offset to a video URL"""
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}t={int(seconds)}s"
+
+
+@lru_cache(maxsize=65536)
+def _count_tokens(text: str, tiktoken_model: str) -> int:
+    # Segments repeat across re-chunking runs, so their counts are memoized
+    return len(encode_string_by_tiktoken(text, model_name=tiktoken_model))
+
+
+def _parse_document(content: str) -> Optional[tuple]:
+    """Split a video document into header fields and timestamped segments"""
+    header: Dict[str, str] = {}
+    segments = []
+    for line in content.splitlines():
+        match = _SEGMENT_LINE.match(line)
+        if match:
+            segments.append((float(match.group(1)), float(match.group(2)), line))
+        elif not segments:
+            for field in ("Title", "URL"):
+                if line.startswith(f"{field}: "):
+                    header[field] = line[len(field) + 2 :]
+    if not segments:
+        return None
+    return header, segments
+
+
+def chunking_by_segments(
+    content: str,
+    split_by_character: str | None = None,
+    split_by_character_only: bool = False,
+    overlap_token_size: int = 128,
+    max_token_size: int = 1024,
+    tiktoken_model: str = "gpt-4o",
+) -> List[Dict[str, Any]]:
+    """Chunking function for LightRAG that keeps caption segments whole.
+
+    Segments are packed into chunks of up to max_token_size tokens, and the
+    next chunk repeats whole trailing segments worth up to overlap_token_size
+    tokens. Each chunk repeats the video title and a URL with a t= offset, and
+    records start_seconds/end_seconds. Documents without timestamped segments
+    are chunked by chunking_by_token_size.
+    """
+    parsed = _parse_document(content)
+    if parsed is None:
+        return chunking_by_token_size(
+            content,
+            split_by_character,
+            split_by_character_only,
+            overlap_token_size,
+            max_token_size,
+            tiktoken_model,
+        )
+    header, segments = parsed
+
+    def render_header(start: float) -> str:
+        lines = []
+        if "Title" in header:
+            lines.append(f"Title: {header['Title']}")
+        if "URL" in header:
+            lines.append(f"URL: {timestamp_url(header['URL'], start)}")
+        return "\n".join(lines)
+
+    header_tokens = _count_tokens(render_header(0), tiktoken_model)
+    budget = max(max_token_size - header_tokens, 1)
+    counts = [_count_tokens(line, tiktoken_model) for _, _, line in segments]
+
+    results: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(segments):
+        # Always take at least one segment, even if it alone exceeds the budget
+        j, used = i, 0
+        while j < len(segments) and (j == i or used + counts[j] <= budget):
+            used += counts[j]
+            j += 1
+        start, end = segments[i][0], segments[j - 1][1]
+        body = "\n".join(line for _, _, line in segments[i:j])
+        chunk_header = render_header(start)
+        results.append(
+            {
+                "tokens": used + (header_tokens if chunk_header else 0),
+                "content": f"{chunk_header}\n{body}" if chunk_header else body,
+                "chunk_order_index": len(results),
+                "start_seconds": start,
+                "end_seconds": end,
+            }
+        )
+        if j >= len(segments):
+            break
+        # Step back over whole segments for the overlap, but always move forward
+        k, overlap = j, 0
+        while k - 1 > i and overlap + counts[k - 1] <= overlap_token_size:
+            overlap += counts[k - 1]
+            k -= 1
+        i = k
+    return results
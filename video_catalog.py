@@ -0,0 +1,286 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Rows read per query by iter_entries
+_PAGE_SIZE = 500
+
+
+def extract_video_id(url: str) -> str:
+    """Extract video ID from YouTube URL"""
+    try:
+        # Handle youtube.com URLs
+        if "youtube.com" in url:
+            query = urlparse(url).query
+            return parse_qs(query)["v"][0]
+        # Handle youtu.be URLs
+        elif "youtu.be" in url:
+            return urlparse(url).path.lstrip("/")
+        else:
+            return ""
+    except Exception:
+        return ""
+
+
+def parse_legacy_txt(txt_file: str) -> Iterator[Dict[str, str]]:
+    """Stream entries from the legacy Title/URL/Transcript text format"""
+    section = []
+    with open(txt_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line == "---":
+                entry = _parse_legacy_section(section)
+                if entry:
+                    yield entry
+                section = []
+            else:
+                section.append(line)
+    entry = _parse_legacy_section(section)
+    if entry:
+        yield entry
+
+
+def _parse_legacy_section(lines: list) -> Dict[str, str]:
+    entry = {}
+    for line in lines:
+        if line.startswith("Title: "):
+            entry["title"] = line[7:]
+        elif line.startswith("URL: "):
+            entry["url"] = line[5:]
+        elif line.startswith("Transcript: "):
+            entry["transcript"] = line[12:]
+    return entry
+
+
+class VideoCatalog:
+    """Append-only catalog of videos backed by SQLite.
+
+    Videos are indexed by video ID and URL, so duplicate checks are a single
+    index lookup and adding a video never rewrites existing rows. Transcripts
+    live in their own table and are only loaded when asked for. The connection
+    is shared by the threads of the transcript fetcher, so every use of it holds
+    a lock.
+    """
+
+    def __init__(self, db_path: str = "video_catalog.sqlite3"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS videos (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    video_id TEXT NOT NULL UNIQUE,
+                    url TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    added_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT PRIMARY KEY,
+                    transcript TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    segments TEXT
+                )"""
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            # Catalogs created before timestamped segments were kept lack the column
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")
+            }
+            if "segments" not in columns:
+                self._conn.execute("ALTER TABLE transcripts ADD COLUMN segments TEXT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def __contains__(self, url: str) -> bool:
+        key = extract_video_id(url) or url
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ? OR url = ?", (key, url)
+            ).fetchone()
+        return row is not None
+
+    def add(self, title: str, url: str, transcript: Optional[str] = None) -> bool:
+        """Add a video, returning False if it is already in the catalog"""
+        return (
+            self.add_many([{"title": title, "url": url, "transcript": transcript}]) == 1
+        )
+
+    def add_many(self, entries: Iterable[Dict[str, str]]) -> int:
+        """Add videos in one transaction and return how many were new"""
+        added = 0
+        now = time.time()
+        with self._lock, self._conn:
+            for entry in entries:
+                url = entry.get("url")
+                if not url:
+                    continue
+                # Non-video URLs (e.g. playlists) are keyed by the URL itself
+                video_id = extract_video_id(url) or url
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO videos (video_id, url, title, added_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (video_id, url, entry.get("title", ""), now),
+                )
+                if cursor.rowcount:
+                    added += 1
+                    if entry.get("transcript"):
+                        self._set_transcript(video_id, entry["transcript"], now)
+        return added
+
+    def iter_entries(
+        self, with_transcripts: bool = False, missing_transcripts_only: bool = False
+    ) -> Iterator[Dict[str, str]]:
+        """Stream catalog entries in insertion order.
+
+        Args:
+            with_transcripts: Include the transcript text of each entry, and its
+                timestamped segments when they were stored
+            missing_transcripts_only: Only yield entries without a transcript or
+                with a NO_/ERROR_ marker from a failed fetch
+        """
+        columns = "v.seq, v.video_id, v.title, v.url"
+        if with_transcripts or missing_transcripts_only:
+            columns += ", t.transcript"
+        if with_transcripts:
+            columns += ", t.segments"
+        query = (
+            f"SELECT {columns} FROM videos v "
+            "LEFT JOIN transcripts t ON t.video_id = v.video_id"
+        )
+        query += " WHERE v.seq > ?"
+        if missing_transcripts_only:
+            query += (
+                " AND (t.transcript IS NULL"
+                " OR t.transcript LIKE 'ERROR\\_%' ESCAPE '\\'"
+                " OR t.transcript LIKE 'NO\\_%' ESCAPE '\\')"
+            )
+        query += f" ORDER BY v.seq LIMIT {_PAGE_SIZE}"
+        # Read a page at a time, so memory stays flat and no cursor is left open
+        # while the caller iterates and writes to the catalog
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (last_seq,)).fetchall()
+            for row in rows:
+                entry = dict(row)
+                last_seq = entry.pop("seq")
+                if entry.get("transcript") is None:
+                    entry.pop("transcript", None)
+                if entry.get("segments") is None:
+                    entry.pop("segments", None)
+                else:
+                    entry["segments"] = json.loads(entry["segments"])
+                yield entry
+            if len(rows) < _PAGE_SIZE:
+                return
+
+    def get_transcript(self, video_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcript FROM transcripts WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_segments(self, video_id: str) -> Optional[List[Dict]]:
+        """Return the timestamped caption segments stored for a video"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segments FROM transcripts WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def set_transcript(
+        self, video_id: str, transcript: str, segments: Optional[List[Dict]] = None
+    ) -> None:
+        with self._lock, self._conn:
+            self._set_transcript(video_id, transcript, time.time(), segments)
+
+    def _set_transcript(
+        self,
+        video_id: str,
+        transcript: str,
+        now: float,
+        segments: Optional[List[Dict]] = None,
+    ) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO transcripts "
+            "(video_id, transcript, updated_at, segments) VALUES (?, ?, ?, ?)",
+            (video_id, transcript, now, json.dumps(segments) if segments else None),
+        )
+
+    def clear(self) -> None:
+        """Delete all videos and transcripts"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM videos")
+            self._conn.execute("DELETE FROM transcripts")
+
+    def import_legacy_txt(self, txt_file: str) -> int:
+        """Import a legacy youtube_urls.txt file and return how many videos were new"""
+        return self.add_many(parse_legacy_txt(txt_file))
+
+    def import_legacy_txt_once(self, txt_file: str = "youtube_urls.txt") -> int:
+        """Import the legacy text file the first time the catalog is opened"""
+        if not os.path.exists(txt_file):
+            return 0
+        key = f"legacy_import:{os.path.abspath(txt_file)}"
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        if row:
+            return 0
+        added = self.import_legacy_txt(txt_file)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(time.time()))
+            )
+        if added:
+            print(f"Imported {added} videos from legacy file {txt_file}")
+        return added
+
+    def export_txt(self, txt_file: str) -> int:
+        """Write the catalog in the legacy text format and return the entry count"""
+        count = 0
+        with open(txt_file, "w", encoding="utf-8") as f:
+            for entry in self.iter_entries(with_transcripts=True):
+                f.write(f"Title: {entry.get('title', '')}\n")
+                f.write(f"URL: {entry.get('url', '')}\n")
+                f.write(f"Transcript: {entry.get('transcript', '')}\n")
+                f.write("\n---\n\n")
+                count += 1
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    # One-shot import: python video_catalog.py [youtube_urls.txt] [video_catalog.sqlite3]
+    txt_file = sys.argv[1] if len(sys.argv) > 1 else "youtube_urls.txt"
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "video_catalog.sqlite3"
+    if not os.path.exists(txt_file):
+        print(f"Error: TXT file '{txt_file}' not found!")
+        sys.exit(1)
+    catalog = VideoCatalog(db_path)
+    added = catalog.import_legacy_txt(txt_file)
+    print(f"Imported {added} new videos into {db_path} ({len(catalog)} total)")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,27 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 import time
-import json
-import os
 import re
 from urllib.parse import parse_qs, urlparse, urlencode
 
-class YouTubeExtractor:
+from video_catalog import VideoCatalog
+from ylink_http import HttpEnumerator
+
+class SeleniumEnumerator:
+    """Headless Chrome enumeration backend, used as a fallback.
+
+    Chrome is only started the first time the backend is actually used.
+    """
+
+    name = "selenium"
+
     def __init__(self):
-        """Initialize the YouTubeExtractor with Chrome in headless mode"""
+        self.driver = None
+        self.wait = None
+
+    def _start(self):
+        if self.driver is not None:
+            return
         try:
             chrome_options = Options()
             chrome_options.add_argument("--headless")
@@ -29,12 +42,126 @@ class YouTubeExtractor:
             )
             
             self.wait = WebDriverWait(self.driver, 10)
-            self.urls_file = "youtube_urls.txt"  # Changed from .json to .txt
             
         except Exception as e:
             print(f"Error initializing Chrome driver: {e}")
             raise
 
+    def _collect(self, elements) -> list[dict]:
+        results = []
+        for element in elements:
+            try:
+                title_element = element.find_element(By.CSS_SELECTOR, "#video-title")
+                results.append({
+                    "title": title_element.get_attribute("title"),
+                    "url": title_element.get_attribute("href")
+                })
+            except Exception:
+                continue
+        return results
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        self._start()
+        self.driver.get("https://www.youtube.com/results?search_query=" + query)
+        time.sleep(2)
+        
+        videos = self.wait.until(EC.presence_of_all_elements_located(
+            (By.CSS_SELECTOR, "ytd-video-renderer")
+        ))
+        return self._collect(videos[:max_results])
+
+    def playlist(self, playlist_url: str) -> list[dict]:
+        self._start()
+        self.driver.get(playlist_url)
+        time.sleep(3)
+        
+        # Scroll to load all videos
+        last_height = self.driver.execute_script("return document.documentElement.scrollHeight")
+        while True:
+            self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+            time.sleep(2)
+            new_height = self.driver.execute_script("return document.documentElement.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
+
+        playlist_items = self.wait.until(EC.presence_of_all_elements_located(
+            (By.CSS_SELECTOR, "ytd-playlist-video-renderer")
+        ))
+        return self._collect(playlist_items)
+
+    def video_title(self, url: str) -> str:
+        self._start()
+        self.driver.get(url)
+        # Wait longer for dynamic content to load
+        time.sleep(3)
+
+        # Try multiple modern YouTube title selectors with explicit waits
+        selectors = [
+            "#title h1.ytd-video-primary-info-renderer",  # Modern layout
+            "#container h1.ytd-video-primary-info-renderer",  # Alternative modern
+            "h1.title.style-scope.ytd-video-primary-info-renderer"  # Full path
+        ]
+
+        for selector in selectors:
+            try:
+                element = self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                )
+                title = element.get_attribute('innerText')
+                if title and title.strip():
+                    return title
+            except:
+                continue
+
+        # Try JavaScript as fallback
+        return self.driver.execute_script(
+            'return document.querySelector("#title h1").innerText'
+        )
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+class YouTubeExtractor:
+    def __init__(self, on_results=None, backends=None):
+        """Initialize the YouTubeExtractor
+
+        Args:
+            on_results: Optional callback(results) invoked with every batch of
+                videos saved to the catalog, e.g. to stream them to the next stage
+            backends: Enumeration backends tried in order until one returns
+                results. Defaults to plain HTTP with headless Chrome as fallback
+        """
+        self.on_results = on_results
+        if backends is None:
+            backends = [HttpEnumerator(), SeleniumEnumerator()]
+        self.backends = backends
+        self.catalog = VideoCatalog("video_catalog.sqlite3")
+        self.catalog.import_legacy_txt_once("youtube_urls.txt")
+
+    def _enumerate(self, method: str, *args):
+        """Call method on each backend in turn and return the first non-empty result"""
+        for backend in self.backends:
+            try:
+                result = getattr(backend, method)(*args)
+                if result:
+                    return result
+                print(f"{backend.name} backend returned nothing, trying next")
+            except Exception as e:
+                print(f"{backend.name} backend failed: {e}")
+        return None
+
+    def _clean_results(self, results: list[dict]) -> list[dict]:
+        cleaned = []
+        for result in results:
+            title = self.clean_title(result.get("title") or "")
+            url = self.clean_url(result["url"]) if result.get("url") else ""
+            if title and url:
+                cleaned.append({"title": title, "url": url})
+        return cleaned
+
     def clean_url(self, url: str) -> str:
         """Clean YouTube URL by removing unnecessary parameters"""
         parsed = urlparse(url)
@@ -57,53 +184,22 @@ class YouTubeExtractor:
         return title
 
     def save_results_to_file(self, results: list[dict]) -> None:
-        """Save results to the URLs file"""
+        """Append new results to the video catalog"""
         try:
-            # Load existing URLs
-            existing_urls = self._load_urls()
-            
-            # Add new URLs if they don't exist
-            for result in results:
-                if not any(entry["url"] == result["url"] for entry in existing_urls):
-                    existing_urls.append(result)
-            
-            # Save back to file in text format
-            with open(self.urls_file, 'w', encoding='utf-8') as f:
-                for entry in existing_urls:
-                    f.write(f"Title: {entry['title']}\n")
-                    f.write(f"URL: {entry['url']}\n")
-                    if 'transcript' in entry:
-                        f.write(f"Transcript: {entry['transcript']}\n")
-                    f.write("\n---\n\n")  # Separator between entries
-            
-            print(f"Successfully saved {len(results)} new URLs")
+            # Duplicates are skipped by the catalog's video ID / URL index
+            added = self.catalog.add_many(results)
+            print(f"Successfully saved {added} new URLs")
+            if self.on_results is not None:
+                self.on_results(results)
         except Exception as e:
             print(f"Error saving URLs: {e}")
 
     def search_mode(self, query: str, max_results: int = 3) -> list[dict]:  # Changed default from 10 to 3
         """Search YouTube and return video information"""
         try:
-            self.driver.get("https://www.youtube.com/results?search_query=" + query)
-            time.sleep(2)
-            
-            videos = self.wait.until(EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "ytd-video-renderer")
-            ))
-            
-            results = []
-            for video in videos[:max_results]:  # This will now only process first 3 videos
-                try:
-                    title_element = video.find_element(By.CSS_SELECTOR, "#video-title")
-                    title = self.clean_title(title_element.get_attribute("title"))
-                    url = self.clean_url(title_element.get_attribute("href"))
-                    
-                    if title and url:
-                        results.append({
-                            "title": title,
-                            "url": url
-                        })
-                except Exception:
-                    continue
+            results = self._clean_results(
+                self._enumerate("search", query, max_results) or []
+            )[:max_results]
             
             # Save results to file
             if results:
@@ -118,37 +214,7 @@ class YouTubeExtractor:
     def playlist_mode(self, playlist_url: str) -> list[dict]:
         """Extract all video URLs from a YouTube playlist"""
         try:
-            self.driver.get(playlist_url)
-            time.sleep(3)
-            
-            # Scroll to load all videos
-            last_height = self.driver.execute_script("return document.documentElement.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
-                time.sleep(2)
-                new_height = self.driver.execute_script("return document.documentElement.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-
-            playlist_items = self.wait.until(EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "ytd-playlist-video-renderer")
-            ))
-            
-            results = []
-            for item in playlist_items:
-                try:
-                    title_element = item.find_element(By.CSS_SELECTOR, "#video-title")
-                    title = self.clean_title(title_element.get_attribute("title"))
-                    url = self.clean_url(title_element.get_attribute("href"))
-                    
-                    if title and url:
-                        results.append({
-                            "title": title,
-                            "url": url
-                        })
-                except Exception:
-                    continue
+            results = self._clean_results(self._enumerate("playlist", playlist_url) or [])
 
             # Save results to file
             if results:
@@ -170,38 +236,10 @@ class YouTubeExtractor:
             clean_url = self.clean_url(url)
             print(f"Processing URL: {clean_url}")
 
-            self.driver.get(clean_url)
-            # Wait longer for dynamic content to load
-            time.sleep(3)
-
-            # Try multiple modern YouTube title selectors with explicit waits
-            title = None
-            selectors = [
-                "#title h1.ytd-video-primary-info-renderer",  # Modern layout
-                "#container h1.ytd-video-primary-info-renderer",  # Alternative modern
-                "h1.title.style-scope.ytd-video-primary-info-renderer"  # Full path
-            ]
-
-            for selector in selectors:
-                try:
-                    element = self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    title = element.get_attribute('innerText')
-                    if title and title.strip():
-                        break
-                except:
-                    continue
-
+            title = self._enumerate("video_title", clean_url)
             if not title or not title.strip():
-                # Try JavaScript as fallback
-                try:
-                    title = self.driver.execute_script(
-                        'return document.querySelector("#title h1").innerText'
-                    )
-                except:
-                    print("Could not extract video title!")
-                    return
+                print("Could not extract video title!")
+                return
 
             title = self.clean_title(title.strip())
             if not title:
@@ -229,60 +267,31 @@ class YouTubeExtractor:
             return False
 
     def _load_urls(self) -> list:
-        """Load saved URLs from file"""
+        """Load saved URLs from the catalog"""
         try:
-            if os.path.exists(self.urls_file):
-                urls = []
-                current_entry = {}
-                
-                with open(self.urls_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    entries = content.split("\n---\n")
-                    
-                    for entry in entries:
-                        if not entry.strip():
-                            continue
-                        
-                        lines = entry.strip().split("\n")
-                        current_entry = {}
-                        
-                        for line in lines:
-                            if line.startswith("Title: "):
-                                current_entry["title"] = line[7:]
-                            elif line.startswith("URL: "):
-                                current_entry["url"] = line[5:]
-                            elif line.startswith("Transcript: "):
-                                current_entry["transcript"] = line[12:]
-                        
-                        if current_entry:
-                            urls.append(current_entry)
-                return urls
-            return []
+            return list(self.catalog.iter_entries())
         except Exception as e:
             print(f"Error loading URLs: {e}")
             return []
 
-    def _save_urls(self, urls: list) -> None:
-        """Save URLs to file"""
-        with open(self.urls_file, 'w') as f:
-            json.dump(urls, f, indent=2)
-
     def clear_all_data(self) -> None:
         """Clear all saved URLs and titles"""
         try:
-            with open(self.urls_file, 'w') as f:
-                json.dump([], f)
+            self.catalog.clear()
             print("Successfully cleared all saved data!")
         except Exception as e:
             print(f"Error clearing data: {e}")
 
     def close(self):
-        """Close the browser"""
-        self.driver.quit()
+        """Close the backends and the catalog"""
+        for backend in self.backends:
+            if hasattr(backend, "close"):
+                backend.close()
+        self.catalog.close()
 
-def main():
+def main(on_results=None):
     print("\033[2J\033[H", end="")  # Clear screen
-    extractor = YouTubeExtractor()
+    extractor = YouTubeExtractor(on_results)
     
     try:
         while True:
@@ -0,0 +1,196 @@
+import html as html_lib
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+import requests
+
+WATCH_URL = "https://www.youtube.com/watch?v="
+
+# Fallback client context if the page does not expose its ytcfg
+DEFAULT_CLIENT = {"clientName": "WEB", "clientVersion": "2.20240101.00.00", "hl": "en"}
+
+_JSON_START_PATTERNS = {
+    name: re.compile(rf"(?:var\s+{name}|window\[\"{name}\"\])\s*=\s*(?={{)")
+    for name in ("ytInitialData", "ytInitialPlayerResponse")
+}
+_YTCFG_PATTERN = re.compile(r"ytcfg\.set\s*\(\s*(?={)")
+
+
+def _extract_json_object(html: str, pattern: re.Pattern) -> Optional[dict]:
+    """Decode the JSON object that follows the first match of pattern"""
+    decoder = json.JSONDecoder()
+    for match in pattern.finditer(html):
+        try:
+            obj, _ = decoder.raw_decode(html, match.end())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict):
+            return obj
+    return None
+
+
+def extract_initial_data(html: str) -> Optional[dict]:
+    """Extract the ytInitialData JSON embedded in a YouTube page"""
+    return _extract_json_object(html, _JSON_START_PATTERNS["ytInitialData"])
+
+
+def extract_player_response(html: str) -> Optional[dict]:
+    """Extract the ytInitialPlayerResponse JSON embedded in a watch page"""
+    return _extract_json_object(html, _JSON_START_PATTERNS["ytInitialPlayerResponse"])
+
+
+def extract_ytcfg(html: str) -> dict:
+    """Merge every ytcfg.set({...}) call on the page into one dict"""
+    config = {}
+    decoder = json.JSONDecoder()
+    for match in _YTCFG_PATTERN.finditer(html):
+        try:
+            obj, _ = decoder.raw_decode(html, match.end())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict):
+            config.update(obj)
+    return config
+
+
+def iter_key(obj, key: str) -> Iterator[dict]:
+    """Yield every value stored under key anywhere in obj, in document order"""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k == key:
+                yield v
+            else:
+                yield from iter_key(v, key)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from iter_key(item, key)
+
+
+def renderer_text(value) -> str:
+    """Flatten a YouTube text object ({"runs": [...]} or {"simpleText": ...})"""
+    if not isinstance(value, dict):
+        return ""
+    if "simpleText" in value:
+        return value["simpleText"]
+    return "".join(run.get("text", "") for run in value.get("runs", []))
+
+
+def continuation_token(obj) -> Optional[str]:
+    """Return the first continuation token in obj, if any"""
+    for renderer in iter_key(obj, "continuationItemRenderer"):
+        for command in iter_key(renderer, "continuationCommand"):
+            token = command.get("token")
+            if token:
+                return token
+    return None
+
+
+class HttpEnumerator:
+    """Browserless playlist/search enumeration backend.
+
+    Parses the ytInitialData JSON embedded in YouTube pages and follows
+    continuation tokens through the InnerTube API, so large playlists are
+    listed with a handful of HTTP requests instead of a scrolling browser.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        base_url: str = "https://www.youtube.com",
+        max_pages: int = 200,
+        request_timeout: float = 15,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_pages = max_pages
+        self.request_timeout = request_timeout
+        self.session = session or requests.Session()
+        self.session.headers.setdefault(
+            "User-Agent",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        )
+        self.session.headers.setdefault("Accept-Language", "en-US,en;q=0.9")
+        # Skip the EU cookie consent interstitial
+        self.session.cookies.set("CONSENT", "YES+1", domain=".youtube.com")
+
+    def _get_page(self, path: str) -> str:
+        response = self.session.get(self.base_url + path, timeout=self.request_timeout)
+        response.raise_for_status()
+        return response.text
+
+    def _follow_continuations(
+        self, endpoint: str, data: dict, ytcfg: dict, renderer_key: str, limit: int
+    ) -> List[Dict[str, str]]:
+        """Collect renderers from the page and every continuation after it"""
+        api_key = ytcfg.get("INNERTUBE_API_KEY")
+        context = ytcfg.get("INNERTUBE_CONTEXT") or {"client": DEFAULT_CLIENT}
+        results: List[Dict[str, str]] = []
+        seen = set()
+        seen_tokens = set()
+
+        for _ in range(self.max_pages):
+            for renderer in iter_key(data, renderer_key):
+                video_id = renderer.get("videoId")
+                title = renderer_text(renderer.get("title"))
+                if not video_id or not title or video_id in seen:
+                    continue
+                seen.add(video_id)
+                results.append({"title": title, "url": WATCH_URL + video_id})
+                if len(results) >= limit:
+                    return results
+
+            token = continuation_token(data)
+            if not token or token in seen_tokens:
+                break
+            seen_tokens.add(token)
+            url = f"{self.base_url}/youtubei/v1/{endpoint}"
+            if api_key:
+                url += f"?key={api_key}"
+            response = self.session.post(
+                url,
+                json={"context": context, "continuation": token},
+                timeout=self.request_timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+        return results
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """Return the top search results as {"title", "url"} entries"""
+        html = self._get_page(f"/results?search_query={quote_plus(query)}")
+        data = extract_initial_data(html)
+        if data is None:
+            raise ValueError("ytInitialData not found on search page")
+        return self._follow_continuations(
+            "search", data, extract_ytcfg(html), "videoRenderer", max_results
+        )
+
+    def playlist(self, playlist_url: str) -> List[Dict[str, str]]:
+        """Return every video in a playlist as {"title", "url"} entries"""
+        list_id = parse_qs(urlparse(playlist_url).query).get("list", [""])[0]
+        if not list_id:
+            raise ValueError(f"No playlist id in {playlist_url}")
+        html = self._get_page(f"/playlist?list={list_id}")
+        data = extract_initial_data(html)
+        if data is None:
+            raise ValueError("ytInitialData not found on playlist page")
+        return self._follow_continuations(
+            "browse", data, extract_ytcfg(html), "playlistVideoRenderer", float("inf")
+        )
+
+    def video_title(self, url: str) -> Optional[str]:
+        """Return the title of a video from its watch page"""
+        video_id = parse_qs(urlparse(url).query).get("v", [""])[0]
+        if not video_id:
+            raise ValueError(f"No video id in {url}")
+        html = self._get_page(f"/watch?v={video_id}")
+        player = extract_player_response(html) or {}
+        title = player.get("videoDetails", {}).get("title")
+        if title:
+            return title
+        match = re.search(r'<meta\s+name="title"\s+content="([^"]*)"', html)
+        return html_lib.unescape(match.group(1)) if match else None
@@ -1,30 +1,38 @@
 import os
+import sys
 import asyncio
 import shutil
+from typing import Optional, Tuple
 from lightrag import LightRAG, QueryParam
 from lightrag.llm.openai import gpt_4o_mini_complete, openai_embed
 from lightrag.kg.shared_storage import initialize_pipeline_status
+from lightrag.utils import compute_mdhash_id
+from transcript_chunking import chunking_by_segments, format_timestamped_transcript
+from video_catalog import VideoCatalog
 
 WORKING_DIR = "./yrag"
+CATALOG_PATH = "video_catalog.sqlite3"
 
-# Delete working directory if it exists
-if os.path.exists(WORKING_DIR):
-    try:
-        shutil.rmtree(WORKING_DIR)
-        print(f"Cleaned up existing {WORKING_DIR} directory")
-    except Exception as e:
-        print(f"Error cleaning up directory: {e}")
 
-# Create fresh working directory
-os.makedirs(WORKING_DIR, exist_ok=True)
+def reset_working_dir():
+    """Delete the working directory so the next ingest starts from scratch"""
+    if os.path.exists(WORKING_DIR):
+        try:
+            shutil.rmtree(WORKING_DIR)
+            print(f"Cleaned up existing {WORKING_DIR} directory")
+        except Exception as e:
+            print(f"Error cleaning up directory: {e}")
 
 
 async def initialize_rag():
+    os.makedirs(WORKING_DIR, exist_ok=True)
     rag = LightRAG(
         working_dir=WORKING_DIR,
         embedding_func=openai_embed,
         llm_model_func=gpt_4o_mini_complete,
         # llm_model_func=gpt_4o_complete
+        # Keeps caption segments whole and records their start/end seconds
+        chunking_func=chunking_by_segments,
     )
 
     await rag.initialize_storages()
@@ -33,20 +41,127 @@ async def initialize_rag():
     return rag
 
 
-def main():
-    # Initialize RAG instance
-    rag = asyncio.run(initialize_rag())
+def video_doc_id(video_id: str) -> str:
+    """Stable document ID for a video, independent of its transcript text"""
+    return compute_mdhash_id(video_id, prefix="doc-")
 
-    with open("./youtube_urls.txt", "r", encoding="utf-8") as f:
-        rag.insert(f.read())
 
-    # Perform mix search
-    print(
-        rag.query(
-            "give summary of transcript", param=QueryParam(mode="mix")
+def format_video_document(entry: dict) -> str:
+    if entry.get("segments"):
+        return (
+            f"Title: {entry.get('title', '')}\n"
+            f"URL: {entry.get('url', '')}\n"
+            f"Transcript:\n{format_timestamped_transcript(entry['segments'])}\n"
         )
+    return (
+        f"Title: {entry.get('title', '')}\n"
+        f"URL: {entry.get('url', '')}\n"
+        f"Transcript: {entry.get('transcript', '')}\n"
     )
 
 
+def video_document(entry: dict) -> Optional[Tuple[str, str, str]]:
+    """Return (doc_id, content, url) for a catalog entry with a usable transcript"""
+    transcript = entry.get("transcript")
+    if not transcript or transcript.startswith(("ERROR_", "NO_")):
+        return None
+    return video_doc_id(entry["video_id"]), format_video_document(entry), entry["url"]
+
+
+def load_video_documents(catalog: VideoCatalog) -> dict:
+    """Map doc ID -> (content, url) for every video with a usable transcript"""
+    documents = {}
+    for entry in catalog.iter_entries(with_transcripts=True):
+        document = video_document(entry)
+        if document is not None:
+            documents[document[0]] = document[1:]
+    return documents
+
+
+async def ingest_documents(rag: LightRAG, documents: dict) -> dict:
+    """Enqueue and process only documents that are new or whose text changed
+
+    Args:
+        documents: Mapping of doc ID -> (content, url)
+    """
+    new_ids = await rag.doc_status.filter_keys(set(documents))
+
+    # Known documents are re-ingested only when their text changed. Doc status
+    # records do not keep the text, it is compared against full_docs
+    changed_ids = set()
+    existing_ids = [doc_id for doc_id in documents if doc_id not in new_ids]
+    if existing_ids:
+        full_docs = await rag.full_docs.get_by_ids(existing_ids)
+        for doc_id, full_doc in zip(existing_ids, full_docs):
+            if full_doc:
+                content = full_doc["content"]
+            else:
+                # Statuses written before full_docs was filled at enqueue
+                status = await rag.doc_status.get_by_id(doc_id)
+                content = status.get("content") if status else None
+            if content != documents[doc_id][0]:
+                changed_ids.add(doc_id)
+    for doc_id in changed_ids:
+        await rag.adelete_by_doc_id(doc_id)
+        # adelete_by_doc_id leaves the status behind when no chunks were stored
+        await rag.doc_status.delete([doc_id])
+        await rag.full_docs.delete([doc_id])
+
+    to_ingest = sorted(new_ids | changed_ids)
+    stats = {
+        "new": len(new_ids),
+        "changed": len(changed_ids),
+        "skipped": len(documents) - len(to_ingest),
+    }
+    if to_ingest:
+        await rag.apipeline_enqueue_documents(
+            [documents[doc_id][0] for doc_id in to_ingest],
+            ids=to_ingest,
+            file_paths=[documents[doc_id][1] for doc_id in to_ingest],
+        )
+    # Also picks up documents left pending or failed by an earlier run
+    await rag.apipeline_process_enqueue_documents()
+    return stats
+
+
+async def ingest_new_videos(rag: LightRAG, catalog: VideoCatalog) -> dict:
+    """Ingest every catalog video that is new or whose transcript changed"""
+    return await ingest_documents(rag, load_video_documents(catalog))
+
+
+async def ingest_and_query():
+    # Initialize RAG instance
+    rag = await initialize_rag()
+    try:
+        catalog = VideoCatalog(CATALOG_PATH)
+        catalog.import_legacy_txt_once("youtube_urls.txt")
+        try:
+            stats = await ingest_new_videos(rag, catalog)
+        finally:
+            catalog.close()
+        print(
+            f"Ingested {stats['new']} new and {stats['changed']} changed videos, "
+            f"skipped {stats['skipped']} already ingested"
+        )
+
+        # Perform mix search
+        print(
+            await rag.aquery(
+                "give summary of transcript", param=QueryParam(mode="mix")
+            )
+        )
+    finally:
+        # Writes out the LLM cache of a deferred flush before the loop ends
+        await rag.finalize_storages()
+
+
+def main():
+    # python youtuberag.py --rebuild wipes ./yrag and ingests every video again
+    if "--rebuild" in sys.argv[1:]:
+        reset_working_dir()
+
+    asyncio.run(ingest_and_query())
+
+
 if __name__ == "__main__":
     main()
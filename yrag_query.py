@@ -1,16 +1,20 @@
 import os
+import time
 import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from lightrag import LightRAG, QueryParam
 from lightrag.llm.openai import gpt_4o_mini_complete, openai_embed
 from lightrag.kg.shared_storage import initialize_pipeline_status
 
 WORKING_DIR = "./yrag"
+# Prefixes of working directory files that queries write
+QUERY_WRITTEN_FILES = ("kv_store_llm_response_cache", "embedding_cache")
 
 class RagSession:
     def __init__(self):
         self.conversation_history: List[Dict[str, str]] = []
+        self.last_timing: Dict[str, float] = {}
     
     def add_to_history(self, role: str, content: str):
         self.conversation_history.append({"role": role, "content": content})
@@ -18,7 +22,7 @@ class RagSession:
         if len(self.conversation_history) > 6:
             self.conversation_history = self.conversation_history[-6:]
 
-async def load_existing_rag():
+async def load_existing_rag(llm_model_func=gpt_4o_mini_complete):
     """Load existing RAG database without reinitializing"""
     if not os.path.exists(WORKING_DIR):
         raise Exception(f"RAG database not found in {WORKING_DIR}")
@@ -26,7 +30,7 @@ async def load_existing_rag():
     rag = LightRAG(
         working_dir=WORKING_DIR,
         embedding_func=openai_embed,
-        llm_model_func=gpt_4o_mini_complete,
+        llm_model_func=llm_model_func,
     )
 
     # Initialize storages without recreating
@@ -35,15 +39,79 @@ async def load_existing_rag():
 
     return rag
 
-async def chat_with_rag(query: str, session: RagSession) -> str:
+def snapshot_working_dir() -> Dict[str, Tuple[int, int]]:
+    """Map storage file name -> (mtime_ns, size) for change detection"""
+    snapshot = {}
+    if not os.path.exists(WORKING_DIR):
+        return snapshot
+    for entry in os.scandir(WORKING_DIR):
+        # Queries write the LLM response and embedding caches themselves
+        # (SQLite adds -wal/-shm files); that alone does not make the
+        # loaded data stale
+        if not entry.is_file() or entry.name.startswith(QUERY_WRITTEN_FILES):
+            continue
+        stat = entry.stat()
+        snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+class TimedLLM:
+    """Wraps the LLM function and records time spent generating answers.
+
+    Keyword extraction calls are part of retrieval, so only the other
+    calls count as generation time.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.generation_time = 0.0
+
+    async def __call__(self, prompt, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.func(prompt, *args, **kwargs)
+        finally:
+            if not kwargs.get("keyword_extraction"):
+                self.generation_time += time.perf_counter() - start
+
+class WarmRag:
+    """Holds one LightRAG instance for the whole chat session.
+
+    Storages are loaded once and only reloaded when files in the working
+    directory change on disk, e.g. after youtuberag.py ingested new videos.
+    """
+
+    def __init__(self):
+        self.rag: Optional[LightRAG] = None
+        self.llm = TimedLLM(gpt_4o_mini_complete)
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+    async def get(self) -> LightRAG:
+        snapshot = snapshot_working_dir()
+        if self.rag is not None and snapshot != self._snapshot:
+            await self.close()
+        if self.rag is None:
+            self.rag = await load_existing_rag(self.llm)
+            # Loading may create missing storage files, so snapshot afterwards
+            self._snapshot = snapshot_working_dir()
+        return self.rag
+
+    async def close(self):
+        if self.rag is not None:
+            await self.rag.finalize_storages()
+            self.rag = None
+
+async def chat_with_rag(query: str, session: RagSession, warm_rag: WarmRag) -> str:
     """
     Chat with the RAG system while maintaining conversation history
     
     Args:
         query: The question or query to ask
         session: RagSession instance maintaining conversation history
+        warm_rag: WarmRag holding the loaded LightRAG instance
     """
-    rag = await load_existing_rag()
+    start = time.perf_counter()
+    rag = await warm_rag.get()
+    load = time.perf_counter() - start
     
     param = QueryParam(
         mode="mix",  # Always use mix mode as it combines KG and vector retrieval
@@ -51,7 +119,17 @@ async def chat_with_rag(query: str, session: RagSession) -> str:
         history_turns=3  # Consider last 3 conversation turns for context
     )
     
+    warm_rag.llm.generation_time = 0.0
+    start = time.perf_counter()
     response = await rag.aquery(query, param=param)
+    total = time.perf_counter() - start
+    generation = warm_rag.llm.generation_time
+    session.last_timing = {
+        "retrieval": total - generation,
+        "generation": generation,
+        "total": total,
+        "load": load,
+    }
     
     # Update conversation history
     session.add_to_history("user", query)
@@ -62,33 +140,45 @@ async def chat_with_rag(query: str, session: RagSession) -> str:
 async def interactive_chat():
     """Run an interactive chat session with the RAG system"""
     session = RagSession()
+    warm_rag = WarmRag()
     
     print("\nWelcome to YouTubeRAG Chat!")
     print("Type your query Or Type 'exit' or 'quit' to go to main menu")
     print("----------------------------------------")
     
-    while True:
-        try:
-            # Get user input
-            query = input("\nYou: ").strip()
+    try:
+        while True:
+            try:
+                # Get user input
+                query = input("\nYou: ").strip()
             
-            # Check for exit command
-            if query.lower() in ['exit', 'quit']:
-                print("\nRouting to Main Menu!")
-                break
+                # Check for exit command
+                if query.lower() in ['exit', 'quit']:
+                    print("\nRouting to Main Menu!")
+                    break
             
-            if not query:
-                print("Please enter a question!")
-                continue
+                if not query:
+                    print("Please enter a question!")
+                    continue
             
-            # Get response from RAG
-            print("\nAssistant: ", end='', flush=True)
-            response = await chat_with_rag(query, session)
-            print(response)
+                # Get response from RAG
+                print("\nAssistant: ", end='', flush=True)
+                response = await chat_with_rag(query, session, warm_rag)
+                print(response)
+                timing = session.last_timing
+                print(
+                    f"\n(load {timing['load']:.2f}s, "
+                    f"retrieval {timing['retrieval']:.2f}s, "
+                    f"generation {timing['generation']:.2f}s, "
+                    f"total {timing['total']:.2f}s)"
+                )
             
-        except Exception as e:
-            print(f"\nError: {e}")
-            print("Please try again.")
+            except Exception as e:
+                print(f"\nError: {e}")
+                print("Please try again.")
+    finally:
+        # Also on Ctrl+C, so the LLM cache of a deferred flush is written
+        await warm_rag.close()
 
 if __name__ == "__main__":
     asyncio.run(interactive_chat())
\ No newline at end of file